@@ -1,21 +1,18 @@
-import uuid
 import psycopg2
 from psycopg2.extras import DictCursor
-import json
-from datetime import datetime
 import logging
-import bcrypt
 from singleton_decorator import singleton
 from typing import List, Optional, Dict
+from Database import DatabaseConnection
+from utils import generate_id
+from Metrics import instrumented
+from Audit import get_audit_writer
+from Passwords import get_hasher
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 @singleton
+@instrumented
 class AdministratorCatalog:
     def __init__(self):
         self.db = DatabaseConnection()
@@ -23,15 +20,12 @@ class AdministratorCatalog:
     def create_administrator(self, email: str, password: str, name: str) -> 'Administrator':
         """Create a new administrator."""
         try:
-            with self.db.get_connection() as conn:
+            # Hash the password before borrowing a connection
+            hashed_password = get_hasher().hash(password).decode('utf-8')
+
+            with self.db.connection() as conn:
                 with conn.cursor() as cur:
-                    user_id = str(uuid.uuid4())
-                    
-                    # Hash the password
-                    hashed_password = bcrypt.hashpw(
-                        password.encode('utf-8'), 
-                        bcrypt.gensalt()
-                    ).decode('utf-8')
+                    user_id = generate_id()
                     
                     # Insert administrator
                     cur.execute("""
@@ -42,21 +36,11 @@ class AdministratorCatalog:
                     """, (user_id, email, hashed_password, name))
                     
                     # Create audit log
-                    cur.execute("""
-                        INSERT INTO audit_logs (
-                            log_id, timestamp, table_name, action_type, 
-                            target_table, record_id, new_value
-                        ) VALUES (%s, %s, 'administrators', 'INSERT', 'administrators', %s, %s::jsonb)
-                    """, (
-                        str(uuid.uuid4()),
-                        datetime.now(),
-                        user_id,
-                        json.dumps({
-                            'user_id': user_id,
-                            'email': email,
-                            'name': name
-                        })
-                    ))
+                    get_audit_writer().record(cur, 'administrators', 'INSERT', user_id, new_value={
+                        'user_id': user_id,
+                        'email': email,
+                        'name': name
+                    })
                     
                     conn.commit()
                     return Administrator(user_id, email, name)
@@ -73,7 +57,7 @@ class AdministratorCatalog:
     def get_administrator(self, user_id: str) -> Optional['Administrator']:
         """Retrieve an administrator by their ID."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor(cursor_factory=DictCursor) as cur:
                     cur.execute("""
                         SELECT user_id, email, name
@@ -97,7 +81,7 @@ class AdministratorCatalog:
     def get_administrator_by_email(self, email: str) -> Optional['Administrator']:
         """Retrieve an administrator by their email."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor(cursor_factory=DictCursor) as cur:
                     cur.execute("""
                         SELECT user_id, email, name
@@ -121,7 +105,7 @@ class AdministratorCatalog:
     def update_administrator(self, user_id: str, **kwargs) -> bool:
         """Update administrator information."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor() as cur:
                     # Get current state for audit log
                     cur.execute("""
@@ -159,18 +143,11 @@ class AdministratorCatalog:
                     cur.execute(query, update_values)
                     
                     # Create audit log
-                    cur.execute("""
-                        INSERT INTO audit_logs (
-                            log_id, timestamp, table_name, action_type, 
-                            target_table, record_id, old_value, new_value
-                        ) VALUES (%s, %s, 'administrators', 'UPDATE', 'administrators', %s, %s::jsonb, %s::jsonb)
-                    """, (
-                        str(uuid.uuid4()),
-                        datetime.now(),
-                        user_id,
-                        json.dumps(dict(zip(['email', 'name'], old_data))),
-                        json.dumps(kwargs)
-                    ))
+                    get_audit_writer().record(
+                        cur, 'administrators', 'UPDATE', user_id,
+                        old_value=dict(zip(['email', 'name'], old_data)),
+                        new_value=kwargs
+                    )
                     
                     conn.commit()
                     return True
@@ -187,7 +164,7 @@ class AdministratorCatalog:
     def delete_administrator(self, user_id: str) -> bool:
         """Delete an administrator."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor() as cur:
                     # Get current state for audit log
                     cur.execute("""
@@ -207,17 +184,10 @@ class AdministratorCatalog:
                     """, (user_id,))
                     
                     # Create audit log
-                    cur.execute("""
-                        INSERT INTO audit_logs (
-                            log_id, timestamp, table_name, action_type, 
-                            target_table, record_id, old_value
-                        ) VALUES (%s, %s, 'administrators', 'DELETE', 'administrators', %s, %s::jsonb)
-                    """, (
-                        str(uuid.uuid4()),
-                        datetime.now(),
-                        user_id,
-                        json.dumps(dict(zip(['email', 'name'], old_data)))
-                    ))
+                    get_audit_writer().record(
+                        cur, 'administrators', 'DELETE', user_id,
+                        old_value=dict(zip(['email', 'name'], old_data))
+                    )
                     
                     conn.commit()
                     return True
@@ -229,7 +199,7 @@ class AdministratorCatalog:
     def authenticate_administrator(self, email: str, password: str) -> Optional['Administrator']:
         """Authenticate an administrator using email and password."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor(cursor_factory=DictCursor) as cur:
                     cur.execute("""
                         SELECT user_id, email, name, hashed_password
@@ -238,16 +208,16 @@ class AdministratorCatalog:
                     """, (email,))
                     
                     result = cur.fetchone()
-                    if result and bcrypt.checkpw(
-                        password.encode('utf-8'),
-                        result['hashed_password'].encode('utf-8')
-                    ):
-                        return Administrator(
-                            result['user_id'],
-                            result['email'],
-                            result['name']
-                        )
-                    return None
+
+            # Verify outside the connection block so the pooled connection is
+            # not held for the duration of the bcrypt check
+            if result and get_hasher().check(password, result['hashed_password']):
+                return Administrator(
+                    result['user_id'],
+                    result['email'],
+                    result['name']
+                )
+            return None
                     
         except Exception as e:
             logger.error(f"Error authenticating administrator: {e}")
@@ -266,7 +236,7 @@ class Administrator:
     def update_offering(self, offering_id: str, **kwargs) -> bool:
         """Update an offering's information."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor() as cur:
                     # Get current state for audit log
                     cur.execute("""
@@ -304,23 +274,15 @@ class Administrator:
                     cur.execute(query, update_values)
                     
                     # Create audit log
-                    cur.execute("""
-                        INSERT INTO audit_logs (
-                            log_id, timestamp, table_name, action_type, 
-                            target_table, record_id, old_value, new_value,
-                            actor_id
-                        ) VALUES (%s, %s, 'offerings', 'UPDATE', 'offerings', %s, %s::jsonb, %s::jsonb, %s)
-                    """, (
-                        str(uuid.uuid4()),
-                        datetime.now(),
-                        offering_id,
-                        json.dumps(dict(zip(
+                    get_audit_writer().record(
+                        cur, 'offerings', 'UPDATE', offering_id,
+                        old_value=dict(zip(
                             ['lesson_type', 'mode', 'capacity', 'duration'],
                             old_data
-                        ))),
-                        json.dumps(kwargs),
-                        self.user_id
-                    ))
+                        )),
+                        new_value=kwargs,
+                        actor_id=self.user_id
+                    )
                     
                     conn.commit()
                     return True
@@ -332,7 +294,7 @@ class Administrator:
     def delete_offering(self, offering_id: str) -> bool:
         """Delete an offering."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor() as cur:
                     # Get current state for audit log
                     cur.execute("""
@@ -352,21 +314,14 @@ class Administrator:
                     """, (offering_id,))
                     
                     # Create audit log
-                    cur.execute("""
-                        INSERT INTO audit_logs (
-                            log_id, timestamp, table_name, action_type, 
-                            target_table, record_id, old_value, actor_id
-                        ) VALUES (%s, %s, 'offerings', 'DELETE', 'offerings', %s, %s::jsonb, %s)
-                    """, (
-                        str(uuid.uuid4()),
-                        datetime.now(),
-                        offering_id,
-                        json.dumps(dict(zip(
+                    get_audit_writer().record(
+                        cur, 'offerings', 'DELETE', offering_id,
+                        old_value=dict(zip(
                             ['lesson_type', 'mode', 'capacity', 'duration'],
                             old_data
-                        ))),
-                        self.user_id
-                    ))
+                        )),
+                        actor_id=self.user_id
+                    )
                     
                     conn.commit()
                     return True
@@ -376,6 +331,11 @@ class Administrator:
             raise
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
     # Example usage
     try:
         admin_catalog = AdministratorCatalog()
@@ -398,7 +358,7 @@ if __name__ == "__main__":
         # Update an offering
         if authenticated_admin:
             success = authenticated_admin.update_offering(
-                str(uuid.uuid4()),  # In real usage, this would be a valid offering ID
+                generate_id(),  # In real usage, this would be a valid offering ID
                 capacity=20,
                 duration=60
             )
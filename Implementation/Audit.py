@@ -0,0 +1,230 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from psycopg2.extras import execute_values
+from Database import DatabaseConnection
+from utils import generate_id
+
+logger = logging.getLogger(__name__)
+
+STRICT = 'strict'  # audit row is written by the caller's cursor, in the caller's transaction
+ASYNC = 'async'    # audit row is queued after commit and written in batches by a worker thread
+
+_INSERT_AUDIT_LOGS = """
+    INSERT INTO audit_logs (
+        log_id, timestamp, table_name, actor_id, action_type,
+        target_table, record_id, old_value, new_value
+    ) VALUES %s
+"""
+_ROW_TEMPLATE = "(%s, %s, %s, %s, %s, %s, %s, %s::jsonb, %s::jsonb)"
+_STOP = object()
+
+def _to_json(value):
+    return None if value is None else json.dumps(value, default=str)
+
+def _serialise(entry):
+    *columns, old_value, new_value = entry
+    return (*columns, _to_json(old_value), _to_json(new_value))
+
+class AuditLogWriter:
+    """Writes audit_logs rows either inline (strict) or through a bounded batching queue (async).
+
+    In async mode a record is queued only once the connection() block that
+    produced it commits, so rolled-back changes are never audited. When the
+    queue is full for longer than ``enqueue_timeout`` seconds the record is
+    written synchronously instead of being dropped. A batch that still fails
+    after ``max_attempts`` is kept and retried, ahead of newer records, once
+    ``retry_interval`` seconds have passed. Queued records are flushed on
+    close(), which also runs at interpreter exit.
+
+    The catalogs share the writer returned by get_audit_writer(); pick the
+    mode with configure_audit() or the AUDIT_MODE environment variable.
+    """
+
+    def __init__(self, mode=STRICT, max_queue_size=10000, batch_size=500, flush_interval=0.5,
+                 enqueue_timeout=0.05, max_attempts=3, retry_interval=5.0):
+        if mode not in (STRICT, ASYNC):
+            raise ValueError(f"Unknown audit mode: {mode}")
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.max_attempts = max_attempts
+        self.retry_interval = retry_interval
+        self.db = DatabaseConnection()
+
+        self._retry = []  # records whose batch ran out of attempts, oldest first
+        self._retry_at = 0.0
+        self._retry_lock = threading.Lock()
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            'enqueued': 0,
+            'written': 0,
+            'batches': 0,
+            'failed': 0,
+            'overflow_writes': 0,
+            'last_flush_seconds': 0.0,
+            'max_flush_seconds': 0.0,
+            'total_flush_seconds': 0.0,
+        }
+        self._worker = None
+        if self.mode == ASYNC:
+            self._worker = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+            self._worker.start()
+            atexit.register(self.close)
+
+    def record(self, cur, table_name, action_type, record_id, old_value=None, new_value=None,
+               actor_id=None, target_table=None):
+        """Audit one change made through ``cur``.
+
+        ``old_value`` and ``new_value`` are plain dicts; they are serialised to
+        JSON by whichever path ends up writing the row.
+        """
+        entry = (
+            generate_id(),
+            datetime.now(),
+            table_name,
+            actor_id,
+            action_type,
+            target_table or table_name,
+            record_id,
+            old_value,
+            new_value,
+        )
+        if self.mode == STRICT:
+            execute_values(cur, _INSERT_AUDIT_LOGS, [_serialise(entry)], template=_ROW_TEMPLATE)
+        else:
+            self.db.after_commit(cur.connection, lambda: self._enqueue(entry))
+
+    def _enqueue(self, entry):
+        try:
+            self._queue.put(entry, timeout=self.enqueue_timeout)
+        except queue.Full:
+            logger.warning("Audit queue full; writing audit record synchronously")
+            self._write_or_keep([entry])
+            with self._metrics_lock:
+                self._metrics['overflow_writes'] += 1
+            return
+        with self._metrics_lock:
+            self._metrics['enqueued'] += 1
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._retry and time.monotonic() >= self._retry_at:
+                    self._write_or_keep([])
+                continue
+            batch = [] if first is _STOP else [first]
+            stopping = first is _STOP
+            while len(batch) < self.batch_size and not stopping:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                else:
+                    batch.append(entry)
+            if batch:
+                self._write_or_keep(batch)
+            for _ in range(len(batch) + (1 if stopping else 0)):
+                self._queue.task_done()
+            if stopping:
+                return
+
+    def _write_or_keep(self, batch):
+        # Records kept from a failed batch go first, so audit rows keep their order.
+        with self._retry_lock:
+            batch, self._retry = self._retry + batch, []
+            if batch and not self._write(batch):
+                logger.error(f"Keeping {len(batch)} audit records to retry in {self.retry_interval:.0f}s")
+                self._retry = batch
+                self._retry_at = time.monotonic() + self.retry_interval
+
+    def _write(self, batch):
+        """Write ``batch`` in one statement, up to max_attempts times; returns whether it succeeded."""
+        rows = [_serialise(entry) for entry in batch]
+        for attempt in range(1, self.max_attempts + 1):
+            started = time.perf_counter()
+            try:
+                with self.db.connection() as conn:
+                    with conn.cursor() as cur:
+                        execute_values(cur, _INSERT_AUDIT_LOGS, rows, template=_ROW_TEMPLATE,
+                                       page_size=self.batch_size)
+            except Exception as e:
+                logger.error(f"Error writing {len(rows)} audit records (attempt {attempt}): {e}")
+                continue
+            elapsed = time.perf_counter() - started
+            with self._metrics_lock:
+                self._metrics['written'] += len(rows)
+                self._metrics['batches'] += 1
+                self._metrics['last_flush_seconds'] = elapsed
+                self._metrics['max_flush_seconds'] = max(self._metrics['max_flush_seconds'], elapsed)
+                self._metrics['total_flush_seconds'] += elapsed
+            return True
+        with self._metrics_lock:
+            self._metrics['failed'] += len(rows)
+        return False
+
+    def flush(self):
+        """Block until every queued record has been written, retrying kept records once more."""
+        if self._worker is not None:
+            self._queue.join()
+        if self._retry:
+            self._write_or_keep([])
+
+    def close(self):
+        """Flush the queue and stop the worker thread.
+
+        Records that still cannot be written are logged in full, so they can
+        be restored by hand.
+        """
+        if self._worker is None or not self._worker.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._worker.join()
+        self.flush()
+        if self._retry:
+            logger.error(f"Could not write {len(self._retry)} audit records: "
+                         f"{json.dumps([_serialise(entry) for entry in self._retry], default=str)}")
+
+    def metrics(self):
+        """Return queue depth, throughput counters and flush latency."""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        batches = metrics['batches']
+        metrics['avg_flush_seconds'] = metrics['total_flush_seconds'] / batches if batches else 0.0
+        metrics['mode'] = self.mode
+        metrics['queue_depth'] = self._queue.qsize()
+        metrics['pending_retry'] = len(self._retry)
+        metrics['max_queue_size'] = self._queue.maxsize
+        return metrics
+
+_default_writer = None
+_default_lock = threading.Lock()
+
+def configure_audit(**kwargs) -> AuditLogWriter:
+    """Replace the process-wide audit writer, e.g. configure_audit(mode='async', batch_size=1000)."""
+    global _default_writer
+    with _default_lock:
+        previous, _default_writer = _default_writer, AuditLogWriter(**kwargs)
+    if previous:
+        previous.close()
+    return _default_writer
+
+def get_audit_writer() -> AuditLogWriter:
+    """Return the process-wide audit writer, created in AUDIT_MODE (default strict) on first use."""
+    global _default_writer
+    with _default_lock:
+        if _default_writer is None:
+            _default_writer = AuditLogWriter(mode=os.environ.get('AUDIT_MODE') or STRICT)
+        return _default_writer
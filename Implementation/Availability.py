@@ -0,0 +1,202 @@
+"""Schedule availability as one 48-bit mask per day.
+
+Bit i of a day's mask stands for the 30-minute slot starting i * 30 minutes
+after midnight; a set bit means the slot is reserved. Generating a day's
+time slots also writes its schedule_availability row, so a day without one
+has no slots and nothing on it is free. One schedule-week is seven rows of
+48 bits instead of 336 time_slots rows, and checking or reserving a range is
+a mask AND/OR per day instead of a scan over slots.
+"""
+from datetime import datetime, time, timedelta
+from sqlalchemy import text
+from Models import TimeSlot
+
+SLOT_LENGTH = timedelta(minutes=30)
+SLOTS_PER_DAY = 48
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+
+# A day is reserved only if it has slots and none of the slots it adds is taken
+# yet, checked and set in one statement so two concurrent reservations cannot
+# both succeed.
+_RESERVE_DAY = text("""
+    UPDATE schedule_availability
+    SET reserved = reserved | CAST(:bits AS bit(48))
+    WHERE schedule_id = :schedule_id AND day = :day
+      AND (reserved & CAST(:bits AS bit(48))) = CAST(0 AS bit(48))
+""")
+
+_RELEASE_DAY = text("""
+    UPDATE schedule_availability
+    SET reserved = reserved & ~CAST(:bits AS bit(48))
+    WHERE schedule_id = :schedule_id AND day = :day
+""")
+
+# The time_slots rows follow the masks, for readers such as Export.
+_MARK_SLOTS = text("""
+    UPDATE time_slots
+    SET is_reserved = :is_reserved
+    WHERE schedule_id = :schedule_id AND start_time >= :start AND start_time < :end
+""")
+
+def to_bits(mask):
+    """The BIT(48) string for ``mask``; its first character is slot 0."""
+    return format(mask, '048b')[::-1]
+
+def from_bits(bits):
+    """The mask stored in a BIT(48) string."""
+    return int(bits[::-1], 2)
+
+def popcount(mask):
+    return bin(mask).count('1')
+
+def _slot(moment):
+    slot, rest = divmod(moment - datetime.combine(moment.date(), time()), SLOT_LENGTH)
+    if rest:
+        raise ValueError(f"{moment} is not on a 30-minute boundary.")
+    return slot
+
+def day_masks(start, end):
+    """Split [start, end) into {day: mask of the slots it covers on that day}."""
+    if end <= start:
+        raise ValueError("The end of a time range must be after its start.")
+    first, last = _slot(start), _slot(end)
+    masks = {}
+    day = start.date()
+    while day <= end.date():
+        low = first if day == start.date() else 0
+        high = last if day == end.date() else SLOTS_PER_DAY
+        if high > low:
+            masks[day] = (1 << high) - (1 << low)
+        day += timedelta(days=1)
+    return masks
+
+class Availability:
+    """Reserved slots of one schedule, held as {day: mask}.
+
+    Only days that have time slots are in ``days``; the others are never free.
+    Changes made here stay in memory; ScheduleCatalog.reserve and release
+    write through to the database.
+    """
+
+    def __init__(self, schedule_id, days=None):
+        self.schedule_id = schedule_id
+        self.days = dict(days or {})
+
+    @classmethod
+    def from_rows(cls, schedule_id, rows):
+        """Build from schedule_availability rows (anything with ``day`` and ``reserved``)."""
+        return cls(schedule_id, {row.day: from_bits(row.reserved) for row in rows})
+
+    def is_free(self, start, end):
+        """Whether every slot in [start, end) exists and none is reserved."""
+        return not any(self.days.get(day, FULL_DAY) & mask for day, mask in day_masks(start, end).items())
+
+    def reserve(self, start, end):
+        """Reserve every slot in [start, end); raises ValueError if one already is or does not exist."""
+        masks = day_masks(start, end)
+        if any(self.days.get(day, FULL_DAY) & mask for day, mask in masks.items()):
+            raise ValueError("The schedule is not free for the whole time range.")
+        for day, mask in masks.items():
+            self.days[day] = self.days.get(day, 0) | mask
+
+    def release(self, start, end):
+        """Free every slot in [start, end)."""
+        for day, mask in day_masks(start, end).items():
+            if day in self.days:
+                self.days[day] &= ~mask
+
+    def count_reserved(self, start, end):
+        return sum(popcount(self.days.get(day, 0) & mask) for day, mask in day_masks(start, end).items())
+
+    def count_free(self, start, end):
+        return sum(popcount(mask & ~self.days.get(day, FULL_DAY)) for day, mask in day_masks(start, end).items())
+
+    def time_slots(self, start, end):
+        """TimeSlot objects for every existing slot in [start, end), for callers that expect slot rows.
+
+        They are built from the masks and not added to any session.
+        """
+        slots = []
+        for day, mask in day_masks(start, end).items():
+            if day not in self.days:
+                continue
+            reserved = self.days[day]
+            midnight = datetime.combine(day, time())
+            for i in range(SLOTS_PER_DAY):
+                if mask >> i & 1:
+                    slot_start = midnight + i * SLOT_LENGTH
+                    slots.append(TimeSlot(
+                        schedule_id=self.schedule_id,
+                        start_time=slot_start,
+                        end_time=slot_start + SLOT_LENGTH,
+                        is_reserved=bool(reserved >> i & 1)
+                    ))
+        return slots
+
+    def __repr__(self):
+        return f"Availability(schedule_id={self.schedule_id}, days={len(self.days)})"
+
+def reserve_range(session, schedule_id, start, end):
+    """Reserve [start, end) of a schedule in the database, without committing.
+
+    Returns False as soon as one day has no slots or a slot that is already
+    reserved; the caller must then roll back, since earlier days of a
+    multi-day range were already written.
+    """
+    for day, mask in day_masks(start, end).items():
+        result = session.execute(_RESERVE_DAY, {'schedule_id': schedule_id, 'day': day, 'bits': to_bits(mask)})
+        if result.rowcount != 1:
+            return False
+    session.execute(_MARK_SLOTS, {'schedule_id': schedule_id, 'start': start, 'end': end, 'is_reserved': True})
+    return True
+
+def release_range(session, schedule_id, start, end):
+    """Free [start, end) of a schedule in the database, without committing."""
+    for day, mask in day_masks(start, end).items():
+        session.execute(_RELEASE_DAY, {'schedule_id': schedule_id, 'day': day, 'bits': to_bits(mask)})
+    session.execute(_MARK_SLOTS, {'schedule_id': schedule_id, 'start': start, 'end': end, 'is_reserved': False})
+
+def common_free_windows(availabilities, duration, start, end, limit):
+    """The earliest windows of ``duration`` inside [start, end) free in every one of ``availabilities``.
+
+    All schedules are laid out on one integer, SLOTS_PER_DAY bits per day
+    from midnight of ``start``'s day. Each schedule's free slots are the
+    unreserved bits of the days it has; AND-ing them gives the common free
+    slots, and AND-ing those with shifted copies of themselves marks the
+    slots where a long enough run starts, in log2(duration / 30 minutes) steps.
+    ``start`` and ``end`` are rounded inwards to slot boundaries. Returns up
+    to ``limit`` (start, end) pairs, earliest first; windows starting 30
+    minutes apart may overlap.
+    """
+    length, rest = divmod(duration, SLOT_LENGTH)
+    if rest or length < 1:
+        raise ValueError("The duration must be a positive multiple of 30 minutes.")
+    origin = datetime.combine(start.date(), time())
+    first = -((origin - start) // SLOT_LENGTH)
+    last = (end - origin) // SLOT_LENGTH
+    if last - first < length or limit <= 0:
+        return []
+
+    runs = (1 << last) - (1 << first)
+    for availability in availabilities:
+        free = 0
+        for day, mask in availability.days.items():
+            offset = (day - origin.date()).days
+            if offset >= 0:
+                free |= (FULL_DAY & ~mask) << (offset * SLOTS_PER_DAY)
+        runs &= free
+
+    # Bit i of runs is set while slots i .. i + covered - 1 are all free.
+    covered = 1
+    while covered < length:
+        step = min(covered, length - covered)
+        runs &= runs >> step
+        covered += step
+
+    windows = []
+    while runs and len(windows) < limit:
+        lowest = runs & -runs
+        window_start = origin + (lowest.bit_length() - 1) * SLOT_LENGTH
+        windows.append((window_start, window_start + duration))
+        runs ^= lowest
+    return windows
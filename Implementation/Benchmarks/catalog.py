@@ -0,0 +1,237 @@
+"""Time the catalog hot paths against a seeded database and save the results as JSON.
+
+Run from the Implementation directory against a scratch database:
+
+    python Benchmarks/catalog.py --scale 10 --iterations 500 --output results.json
+    python Benchmarks/catalog.py --scale 10 --compare results.json
+
+--scale multiplies the seeded volume (per unit: 5 branches, 10 instructors,
+100 clients, 20 offerings, 50 public offerings). Every seeded row carries a
+run tag and is deleted afterwards, bookings, benchmark administrators and
+the audit_logs rows written for them included.
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+from Audit import get_audit_writer  # noqa: E402
+from Database import batch, current_session  # noqa: E402
+from Models import (Province, City, Branch, Client, Instructor, Offering, PublicOffering,  # noqa: E402
+                    Booking, Schedule, ScheduleDay, TimeSlot)
+from Users import UserCatalog  # noqa: E402
+from Bookings import BookingCatalog  # noqa: E402
+from Offerings import OfferingCatalog  # noqa: E402
+from Scheduling import ScheduleCatalog, SLOT_LENGTH  # noqa: E402
+from Location import LocationCatalog  # noqa: E402
+from Admins import AdministratorCatalog  # noqa: E402
+from Passwords import configure_hasher  # noqa: E402
+from utils import generate_id  # noqa: E402
+from common import measure, print_table, write_results, print_comparison  # noqa: E402
+
+# A cheap bcrypt cost keeps the admin benchmarks about the database round
+# trips; Benchmarks/password_hashing.py measures hashing on its own.
+ADMIN_BCRYPT_ROUNDS = 4
+# Schedules find_common_free_windows picks from, five at a time.
+ROSTER_SIZE = 20
+
+
+class Seed:
+    """Creates a tagged data set for one run and removes it again."""
+
+    def __init__(self, session, scale, rng):
+        self.session = session
+        self.tag = generate_id()[-8:]  # the leading digits are a timestamp
+        self.rng = rng
+        self.scale = scale
+        self.provinces, self.cities, self.branches = [], [], []
+        self.clients, self.instructors, self.offerings, self.public_offerings = [], [], [], []
+        self.schedules = []
+        self.admin_ids = []
+
+    def _add(self, rows):
+        self.session.add_all(rows)
+        self.session.flush()
+        return rows
+
+    def create(self):
+        tag, rng, scale = self.tag, self.rng, self.scale
+        self.provinces = self._add([
+            Province(location_id=generate_id(), name=f"bench-{tag}-province-{i}") for i in range(max(1, scale // 10))
+        ])
+        self.cities = self._add([
+            City(location_id=generate_id(), name=f"bench-{tag}-city-{i}",
+                 parent_location_id=rng.choice(self.provinces).location_id)
+            for i in range(scale)
+        ])
+        self.branches = self._add([
+            Branch(location_id=generate_id(), name=f"bench-{tag}-branch-{i}",
+                   parent_location_id=rng.choice(self.cities).location_id)
+            for i in range(5 * scale)
+        ])
+        self.instructors = self._add([
+            Instructor(user_id=generate_id(), email=f"bench-{tag}-instructor-{i}@example.com",
+                       hashed_password='x', name=f"Instructor {i}", specialization='swimming',
+                       phone='555-0100')
+            for i in range(10 * scale)
+        ])
+        self.clients = self._add([
+            Client(user_id=generate_id(), email=f"bench-{tag}-client-{i}@example.com",
+                   hashed_password='x', name=f"Client {i}", age=30)
+            for i in range(100 * scale)
+        ])
+        self.offerings = self._add([
+            Offering(offering_id=generate_id(), instructor_id=rng.choice(self.instructors).user_id,
+                     lesson_type=rng.choice(['swimming', 'yoga', 'judo']),
+                     mode=rng.choice(['group', 'private']), capacity=20)
+            for _ in range(20 * scale)
+        ])
+        first_day = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        public_offerings = []
+        for _ in range(50 * scale):
+            start = first_day + timedelta(days=rng.randrange(60), hours=rng.randrange(12))
+            public_offerings.append(PublicOffering(
+                public_offering_id=generate_id(), offering_id=rng.choice(self.offerings).offering_id,
+                branch_id=rng.choice(self.branches).location_id, start_time=start,
+                end_time=start + timedelta(hours=1), max_clients=1_000_000,
+            ))
+        self.public_offerings = self._add(public_offerings)
+        self.session.commit()
+
+    def add_schedules(self, count):
+        schedules = self._add([
+            Schedule(schedule_id=generate_id(), schedule_owner_id=generate_id(),
+                     schedule_owner_type='benchmark')
+            for _ in range(count)
+        ])
+        self.session.commit()
+        self.schedules.extend(schedules)
+        return schedules
+
+    def drop(self):
+        session = self.session
+        session.rollback()
+        public_offering_ids = [p.public_offering_id for p in self.public_offerings]
+        schedule_ids = [s.schedule_id for s in self.schedules]
+        for model, column, ids in [
+            (Booking, Booking.public_offering_id, public_offering_ids),
+            (PublicOffering, PublicOffering.public_offering_id, public_offering_ids),
+            (Offering, Offering.offering_id, [o.offering_id for o in self.offerings]),
+            (TimeSlot, TimeSlot.schedule_id, schedule_ids),
+            (ScheduleDay, ScheduleDay.schedule_id, schedule_ids),
+            (Schedule, Schedule.schedule_id, schedule_ids),
+            (Branch, Branch.location_id, [b.location_id for b in self.branches]),
+            (City, City.location_id, [c.location_id for c in self.cities]),
+            (Province, Province.location_id, [p.location_id for p in self.provinces]),
+            (Client, Client.user_id, [c.user_id for c in self.clients]),
+            (Instructor, Instructor.user_id, [i.user_id for i in self.instructors]),
+        ]:
+            session.query(model).filter(column.in_(ids)).delete(synchronize_session=False)
+        session.commit()
+        admins = AdministratorCatalog()
+        for user_id in self.admin_ids:
+            admins.delete_administrator(user_id)
+        # The timed admin calls and the deletes above are audited; in async
+        # mode their rows may still be queued.
+        get_audit_writer().flush()
+        if self.admin_ids:
+            session.execute(text("DELETE FROM audit_logs WHERE record_id = ANY(CAST(:ids AS uuid[]))"),
+                            {'ids': self.admin_ids})
+            session.commit()
+
+
+def run(seed, iterations, rng):
+    session = seed.session
+    users, bookings, offerings = UserCatalog(), BookingCatalog(), OfferingCatalog()
+    locations, schedules, admins = LocationCatalog(), ScheduleCatalog(), AdministratorCatalog()
+    client_ids = [c.user_id for c in seed.clients]
+    public_offering_ids = [p.public_offering_id for p in seed.public_offerings]
+    branches = [(b.location_id, b.name) for b in seed.branches]
+    province_ids = [p.location_id for p in seed.provinces]
+    results = {}
+
+    results['UserCatalog.get_user_by_id'] = measure(
+        lambda: users.get_user_by_id(rng.choice(client_ids)), iterations, setup=session.expunge_all)
+    results['BookingCatalog.add_booking'] = measure(
+        lambda: bookings.add_booking(client_ids[0], rng.choice(public_offering_ids), [rng.choice(client_ids)]),
+        iterations)
+    results['OfferingCatalog.get_all_public_offerings'] = measure(
+        offerings.get_all_public_offerings, max(1, iterations // 10), warmup=1, setup=session.expunge_all)
+
+    fresh = iter(seed.add_schedules(iterations + 5))
+    results['ScheduleCatalog.generate_time_slots'] = measure(
+        lambda: schedules.generate_time_slots(next(fresh)), iterations)
+
+    # A roster of busy schedules: a third of the weekday slots reserved at random.
+    roster = [s.schedule_id for s in seed.add_schedules(ROSTER_SIZE)]
+    week = datetime(2025, 1, 6)
+    schedules.generate_time_slots_bulk(roster, start_date=week, days=7)
+    with batch():
+        for schedule_id in roster:
+            for slot in rng.sample(range(5 * 48), 5 * 16):
+                start = week + slot * SLOT_LENGTH
+                schedules.reserve(schedule_id, start, start + SLOT_LENGTH)
+    results['ScheduleCatalog.find_common_free_windows'] = measure(
+        lambda: schedules.find_common_free_windows(rng.sample(roster, 5), timedelta(hours=1),
+                                                   week, week + timedelta(days=7)),
+        iterations)
+
+    results['LocationCatalog.get_branch'] = measure(
+        lambda: locations.get_branch(rng.choice(branches)[0]), iterations, setup=session.expunge_all)
+    results['LocationCatalog.get_branch_by_name'] = measure(
+        lambda: locations.get_branch_by_name(rng.choice(branches)[1]), iterations, setup=session.expunge_all)
+    results['LocationCatalog.get_branches_under'] = measure(
+        lambda: locations.get_branches_under(rng.choice(province_ids)), iterations, setup=session.expunge_all)
+
+    counter = iter(range(10 * iterations))
+
+    def create_administrator():
+        admin = admins.create_administrator(f"bench-{seed.tag}-admin-{next(counter)}@example.com",
+                                            'benchmark', 'Benchmark Admin')
+        seed.admin_ids.append(admin.user_id)
+
+    results['AdministratorCatalog.create_administrator'] = measure(create_administrator, iterations)
+    admin_ids = list(seed.admin_ids)
+    results['AdministratorCatalog.get_administrator'] = measure(
+        lambda: admins.get_administrator(rng.choice(admin_ids)), iterations)
+    results['AdministratorCatalog.update_administrator'] = measure(
+        lambda: admins.update_administrator(rng.choice(admin_ids), name=f"Admin {rng.randrange(10**6)}"),
+        iterations)
+    results['AdministratorCatalog.authenticate_administrator'] = measure(
+        lambda: admins.authenticate_administrator(f"bench-{seed.tag}-admin-0@example.com", 'benchmark'),
+        iterations)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=342, help="random seed for data and access patterns")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    configure_hasher(rounds=ADMIN_BCRYPT_ROUNDS)
+    rng = random.Random(args.seed)
+    seed = Seed(current_session(), args.scale, rng)
+    seed.create()
+    try:
+        results = run(seed, args.iterations, rng)
+    finally:
+        seed.drop()
+
+    print_table(results)
+    if args.output:
+        write_results(args.output, results, scale=args.scale, iterations=args.iterations,
+                      seed=args.seed, admin_bcrypt_rounds=ADMIN_BCRYPT_ROUNDS)
+    if args.compare:
+        print_comparison(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
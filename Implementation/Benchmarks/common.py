@@ -0,0 +1,93 @@
+"""Timing, reporting and result files shared by the benchmark scripts."""
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def percentile(sorted_samples, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, round(fraction * len(sorted_samples)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def measure(fn, iterations, warmup=5, setup=None):
+    """Call ``fn`` ``iterations`` times and summarise the latencies in milliseconds.
+
+    ``setup`` runs untimed before every call (warm-up included), e.g. to
+    clear the session so each call pays for its own queries.
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    samples.sort()
+    total_seconds = sum(samples) / 1000.0
+    return {
+        'iterations': iterations,
+        'p50_ms': percentile(samples, 0.50),
+        'p95_ms': percentile(samples, 0.95),
+        'p99_ms': percentile(samples, 0.99),
+        'mean_ms': total_seconds * 1000.0 / iterations if iterations else 0.0,
+        'max_ms': samples[-1] if samples else 0.0,
+        'ops_per_s': iterations / total_seconds if total_seconds else 0.0,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results):
+    print(f"{'benchmark':<40} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>10}")
+    for name, r in results.items():
+        print(f"{name:<40} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['ops_per_s']:>10.1f}")
+
+
+def write_results(path, results, **parameters):
+    """Save results with enough context (revision, parameters, host) to compare runs later."""
+    document = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': parameters,
+        },
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+
+
+def print_comparison(baseline_path, results):
+    """Print the p50/p95 change of each benchmark against an earlier result file."""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    print(f"\ncompared with {baseline_path} (revision {baseline['meta'].get('revision')}):")
+    print(f"{'benchmark':<40} {'p50 change':>11} {'p95 change':>11}")
+    for name, r in results.items():
+        before = baseline['results'].get(name)
+        if not before:
+            print(f"{name:<40} {'new':>11}")
+            continue
+        changes = [
+            f"{(r[key] - before[key]) / before[key] * 100:+10.1f}%" if before[key] else f"{'n/a':>11}"
+            for key in ('p50_ms', 'p95_ms')
+        ]
+        print(f"{name:<40} {changes[0]:>11} {changes[1]:>11}")
@@ -0,0 +1,267 @@
+"""Generate a deterministic synthetic data set and bulk-load it with COPY.
+
+Run from the Implementation directory against a scratch database created
+from Persistence/DDL-342-project.sql:
+
+    python Benchmarks/dataset.py --scale 10 --seed 342 --truncate
+
+The same --scale, --seed and --start-date always produce the same rows and
+ids, so benchmark and capacity runs can start from identical data. Per unit
+of scale the data set holds:
+
+    1 province, 10 cities, 100 branches, 1,000 instructors,
+    2,000 offerings, 10,000 public offerings, 20,000 clients
+    (about a fifth of them minors with a guardian) and about 89,000 bookings,
+
+plus one schedule per branch and instructor filled with 30-minute time
+slots for --slot-days days (48 slots per schedule per day). Bookings are
+drawn until 100,000 per unit are placed or the attempts run out; half the
+offerings are private, so the public offerings only have about 90,000
+seats per unit and nearly all of them end up taken (88,822 bookings at
+--scale 1 and 914,956 at --scale 10 with the default seed).
+"""
+import argparse
+import csv
+import io
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import bcrypt  # noqa: E402
+from Database import DatabaseConnection, SessionLocal  # noqa: E402
+from Scheduling import ScheduleCatalog  # noqa: E402
+from utils import uuid7  # noqa: E402
+
+PER_SCALE = {
+    'provinces': 1,
+    'cities': 10,
+    'branches': 100,
+    'instructors': 1_000,
+    'offerings': 2_000,
+    'public_offerings': 10_000,
+    'clients': 20_000,
+    'bookings': 100_000,  # attempted; capped by the seats of the public offerings
+}
+COPY_CHUNK_ROWS = 50_000
+MINOR_SHARE = 0.2
+LESSON_TYPES = ['swimming', 'yoga', 'judo', 'boxing', 'pilates', 'spinning', 'climbing', 'dance']
+MODES = ['group', 'private']
+DEFAULT_START_DATE = datetime(2025, 1, 6)
+# bcrypt salts are random; a fixed one keeps the data set byte-for-byte reproducible.
+# Every generated user logs in with the password "password".
+PASSWORD_SALT = b'$2b$04$gymmydatasetsaltseed..'
+
+# Parents before children so foreign keys always resolve.
+COLUMNS = {
+    'provinces': ['location_id', 'name'],
+    'cities': ['location_id', 'name', 'parent_location_id'],
+    'schedules': ['schedule_id', 'schedule_owner_id', 'schedule_owner_type'],
+    'branches': ['location_id', 'name', 'schedule_id', 'parent_location_id'],
+    'instructors': ['user_id', 'email', 'hashed_password', 'name', 'specialization', 'phone', 'schedule_id'],
+    'clients': ['user_id', 'email', 'hashed_password', 'name', 'age', 'guardian_id'],
+    'offerings': ['offering_id', 'instructor_id', 'lesson_type', 'mode', 'capacity'],
+    'public_offerings': ['public_offering_id', 'offering_id', 'branch_id', 'start_time', 'end_time',
+                         'max_clients', 'seats_taken'],
+    'bookings': ['booking_id', 'booked_by_client_id', 'public_offering_id', 'booked_for_client_id'],
+}
+
+
+def _rng(seed, table):
+    # One stream per table, so changing the volume of one table leaves the others unchanged.
+    return random.Random(f"{seed}:{table}")
+
+
+class _Ids:
+    """Time-ordered ids (the UUIDv7 layout utils.generate_id uses), one millisecond apart.
+
+    The random part comes from the table's stream, so the ids are reproducible.
+    """
+
+    def __init__(self, rng, start_date):
+        self.rng = rng
+        self.unix_ts_ms = int(start_date.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+    def __call__(self):
+        self.unix_ts_ms += 1
+        return str(uuid7(self.unix_ts_ms, self.rng.getrandbits(74)))
+
+
+class Dataset:
+    """Builds the Models.py entity graph as plain row tuples, table by table."""
+
+    def __init__(self, scale, seed, start_date=DEFAULT_START_DATE, slot_days=7):
+        if scale < 1:
+            raise ValueError("scale must be at least 1.")
+        self.seed = seed
+        self.start_date = start_date
+        self.slot_days = slot_days
+        self.counts = {table: n * scale for table, n in PER_SCALE.items()}
+        self.hashed_password = bcrypt.hashpw(b'password', PASSWORD_SALT).decode('utf-8')
+        self.tables = {}
+
+    def build(self):
+        for table in COLUMNS:
+            started = time.perf_counter()
+            self.tables[table] = getattr(self, f"_{table}")()
+            print(f"generated {len(self.tables[table]):>10,} {table:<17} {time.perf_counter() - started:7.2f}s")
+        return self
+
+    def _ids_from(self, rng):
+        return _Ids(rng, self.start_date)
+
+    def _ids(self, table, column=0):
+        return [row[column] for row in self.tables[table]]
+
+    def _provinces(self):
+        new_id = self._ids_from(_rng(self.seed, 'provinces'))
+        return [(new_id(), f"Province {i}") for i in range(self.counts['provinces'])]
+
+    def _cities(self):
+        rng = _rng(self.seed, 'cities')
+        new_id = self._ids_from(rng)
+        provinces = self._ids('provinces')
+        return [(new_id(), f"City {i}", rng.choice(provinces)) for i in range(self.counts['cities'])]
+
+    def _schedules(self):
+        # Branch and instructor ids are drawn from their own streams so the
+        # schedules can be created before their owners.
+        new_id = self._ids_from(_rng(self.seed, 'schedules'))
+        new_branch_id = self._ids_from(_rng(self.seed, 'branches'))
+        new_instructor_id = self._ids_from(_rng(self.seed, 'instructors'))
+        self._branch_ids = [new_branch_id() for _ in range(self.counts['branches'])]
+        self._instructor_ids = [new_instructor_id() for _ in range(self.counts['instructors'])]
+        return (
+            [(new_id(), owner, 'branch') for owner in self._branch_ids]
+            + [(new_id(), owner, 'instructor') for owner in self._instructor_ids]
+        )
+
+    def _branches(self):
+        rng = _rng(self.seed, 'branches:rows')
+        cities = self._ids('cities')
+        schedules = self._ids('schedules')
+        return [(branch_id, f"Branch {i}", schedules[i], rng.choice(cities))
+                for i, branch_id in enumerate(self._branch_ids)]
+
+    def _instructors(self):
+        rng = _rng(self.seed, 'instructors:rows')
+        schedules = self._ids('schedules')[len(self._branch_ids):]
+        return [
+            (user_id, f"instructor{i}@gymmy.test", self.hashed_password, f"Instructor {i}",
+             rng.choice(LESSON_TYPES), f"555-{rng.randrange(10_000):04d}", schedules[i])
+            for i, user_id in enumerate(self._instructor_ids)
+        ]
+
+    def _clients(self):
+        rng = _rng(self.seed, 'clients')
+        new_id = self._ids_from(rng)
+        rows, adults = [], []
+        for i in range(self.counts['clients']):
+            user_id = new_id()
+            if adults and rng.random() < MINOR_SHARE:
+                age, guardian_id = rng.randrange(6, 18), rng.choice(adults)
+            else:
+                age, guardian_id = rng.randrange(18, 80), None
+                adults.append(user_id)
+            rows.append((user_id, f"client{i}@gymmy.test", self.hashed_password, f"Client {i}",
+                         age, guardian_id))
+        return rows
+
+    def _offerings(self):
+        rng = _rng(self.seed, 'offerings')
+        new_id = self._ids_from(rng)
+        instructors = self.tables['instructors']
+        rows = []
+        for _ in range(self.counts['offerings']):
+            instructor = rng.choice(instructors)
+            mode = rng.choice(MODES)
+            capacity = 1 if mode == 'private' else rng.randrange(5, 31)
+            rows.append((new_id(), instructor[0], instructor[4], mode, capacity))
+        return rows
+
+    def _public_offerings(self):
+        rng = _rng(self.seed, 'public_offerings')
+        new_id = self._ids_from(rng)
+        offerings, branches = self.tables['offerings'], self._branch_ids
+        rows = []
+        for _ in range(self.counts['public_offerings']):
+            offering = rng.choice(offerings)
+            start = self.start_date + timedelta(days=rng.randrange(max(1, self.slot_days)),
+                                                hours=rng.randrange(6, 21), minutes=30 * rng.randrange(2))
+            # seats_taken starts at 0 and is filled in by _bookings
+            rows.append([new_id(), offering[0], rng.choice(branches), start,
+                         start + timedelta(hours=1), offering[4], 0])
+        return rows
+
+    def _bookings(self):
+        rng = _rng(self.seed, 'bookings')
+        new_id = self._ids_from(rng)
+        clients = self.tables['clients']
+        public_offerings = self.tables['public_offerings']
+        rows = []
+        attempts = 0
+        while len(rows) < self.counts['bookings'] and attempts < 3 * self.counts['bookings']:
+            attempts += 1
+            public_offering = rng.choice(public_offerings)
+            if public_offering[6] >= public_offering[5]:
+                continue  # full; keep seats_taken within max_clients
+            client = rng.choice(clients)
+            # Minors are booked by their guardian.
+            booked_by = client[5] or client[0]
+            public_offering[6] += 1
+            rows.append((new_id(), booked_by, public_offering[0], client[0]))
+        return rows
+
+
+def _copy(cur, table, columns, rows):
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    for offset in range(0, len(rows), COPY_CHUNK_ROWS):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows[offset:offset + COPY_CHUNK_ROWS])
+        buffer.seek(0)
+        cur.copy_expert(statement, buffer)
+
+
+def load(dataset, truncate=False):
+    """COPY every table in one transaction, then fill the schedules with time slots."""
+    with DatabaseConnection().connection() as conn:
+        with conn.cursor() as cur:
+            if truncate:
+                cur.execute("TRUNCATE " + ', '.join(['time_slots', *reversed(COLUMNS)]) + " CASCADE")
+            for table, columns in COLUMNS.items():
+                started = time.perf_counter()
+                _copy(cur, table, columns, dataset.tables[table])
+                print(f"loaded    {len(dataset.tables[table]):>10,} {table:<17} {time.perf_counter() - started:7.2f}s")
+
+    started = time.perf_counter()
+    session = SessionLocal()
+    try:
+        slots = ScheduleCatalog(session).generate_time_slots_bulk(
+            dataset._ids('schedules'), start_date=dataset.start_date, days=dataset.slot_days)
+    finally:
+        session.close()
+    print(f"loaded    {slots:>10,} {'time_slots':<17} {time.perf_counter() - started:7.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=342)
+    parser.add_argument('--start-date', type=datetime.fromisoformat, default=DEFAULT_START_DATE,
+                        help="first day of public offerings and time slots (default 2025-01-06)")
+    parser.add_argument('--slot-days', type=int, default=7)
+    parser.add_argument('--truncate', action='store_true',
+                        help="empty every table first (destroys existing data)")
+    parser.add_argument('--dry-run', action='store_true', help="generate the rows without loading them")
+    args = parser.parse_args()
+
+    dataset = Dataset(args.scale, args.seed, args.start_date, args.slot_days).build()
+    if not args.dry_run:
+        load(dataset, truncate=args.truncate)
+
+
+if __name__ == "__main__":
+    main()
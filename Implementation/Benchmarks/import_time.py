@@ -0,0 +1,71 @@
+"""Measure how long a fresh interpreter takes to import the application modules.
+
+No database is needed; importing must not connect to one:
+
+    python Benchmarks/import_time.py --runs 10
+    python Benchmarks/import_time.py --modules System Main --top 15
+
+Each run starts a new interpreter, so nothing is cached between runs apart
+from the .pyc files. The slowest imports reported by ``python -X importtime``
+are listed for the last module.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+IMPLEMENTATION = Path(__file__).resolve().parent.parent
+
+# Importing a module must leave the engine uncreated and psycopg2 unloaded.
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+import Database
+print(elapsed, Database._engine is None, 'psycopg2' in sys.modules)
+"""
+
+
+def time_import(module):
+    output = subprocess.run([sys.executable, '-c', PROBE.format(module=module)], cwd=IMPLEMENTATION,
+                            capture_output=True, text=True, check=True).stdout.split()
+    return float(output[0]), output[1] == 'True', output[2] == 'True'
+
+
+def slowest_imports(module, top):
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=IMPLEMENTATION, capture_output=True, text=True, check=True).stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        entries.append((int(cumulative), name))
+    return sorted(entries, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modules', nargs='+', default=['Database', 'Models', 'System', 'Main'])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'module':<12} {'median ms':>10} {'min ms':>8} {'engine created':>15} {'psycopg2 loaded':>16}")
+    for module in args.modules:
+        samples = [time_import(module) for _ in range(args.runs)]
+        seconds = [s[0] * 1000 for s in samples]
+        engine_created = not all(s[1] for s in samples)
+        psycopg2_loaded = any(s[2] for s in samples)
+        print(f"{module:<12} {statistics.median(seconds):>10.1f} {min(seconds):>8.1f} "
+              f"{str(engine_created):>15} {str(psycopg2_loaded):>16}")
+
+    print(f"\nslowest imports under {args.modules[-1]} (cumulative):")
+    for microseconds, name in slowest_imports(args.modules[-1], args.top):
+        print(f"{microseconds / 1000:>9.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
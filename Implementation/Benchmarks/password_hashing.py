@@ -0,0 +1,62 @@
+"""Measure registration (hash) and login (verify) throughput against worker count.
+
+No database is needed; this isolates the bcrypt cost that System.register_*
+and AdministratorCatalog.authenticate_administrator pay per request:
+
+    python Benchmarks/password_hashing.py --operations 64 --mode thread
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Passwords import PasswordHasher, THREAD, PROCESS, DEFAULT_ROUNDS  # noqa: E402
+
+
+def worker_counts(cores):
+    counts, n = [], 1
+    while n < cores:
+        counts.append(n)
+        n *= 2
+    return counts + [cores]
+
+
+def throughput(hasher, operations):
+    passwords = [f"password-{i}" for i in range(operations)]
+
+    started = time.perf_counter()
+    hashes = hasher.hash_many(passwords)
+    hash_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    futures = [hasher.submit_check(p, h) for p, h in zip(passwords, hashes)]
+    assert all(f.result() for f in futures)
+    check_seconds = time.perf_counter() - started
+
+    return operations / hash_seconds, operations / check_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--operations', type=int, default=64)
+    parser.add_argument('--mode', choices=[THREAD, PROCESS], default=THREAD)
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    print(f"cores: {cores}  mode: {args.mode}  bcrypt rounds: {args.rounds}")
+    print(f"{'workers':>8} {'registrations/s':>16} {'logins/s':>10}")
+    for workers in worker_counts(cores):
+        hasher = PasswordHasher(mode=args.mode, max_workers=workers, rounds=args.rounds)
+        try:
+            registrations, logins = throughput(hasher, args.operations)
+        finally:
+            hasher.shutdown()
+        print(f"{workers:>8} {registrations:>16.1f} {logins:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
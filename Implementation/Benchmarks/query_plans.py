@@ -0,0 +1,168 @@
+"""Fail when a catalog read path falls back to a sequential scan on a large table.
+
+Run from the Implementation directory against a database seeded with
+Benchmarks/dataset.py (large enough that the planner prefers indexes):
+
+    python Benchmarks/dataset.py --scale 5 --truncate
+    python Benchmarks/query_plans.py --min-rows 10000
+
+Every check calls a real catalog method while capturing the SQL it sends,
+then runs EXPLAIN on each statement with the same parameters. A check fails
+when any plan contains a Seq Scan on a table holding at least --min-rows
+rows. The exit status is non-zero when a check fails, so this can gate a
+schema or query change.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Database import DatabaseConnection, current_session  # noqa: E402
+from Metrics import capture_statements  # noqa: E402
+from Models import Booking, Branch, City, Offering, PublicOffering, Schedule  # noqa: E402
+from Users import UserCatalog  # noqa: E402
+from Bookings import BookingCatalog  # noqa: E402
+from Offerings import OfferingCatalog  # noqa: E402
+from Scheduling import ScheduleCatalog  # noqa: E402
+from Location import LocationCatalog  # noqa: E402
+from Instructors import Instructor  # noqa: E402
+from Loading import (PUBLIC_OFFERING_DETAIL, BOOKING_WITH_CLIENT_AND_OFFERING,  # noqa: E402
+                     SCHEDULE_WITH_TIME_SLOTS)
+
+
+def sample_keys(session):
+    """Pick existing ids for the checks to look up."""
+    booking = session.query(Booking).first()
+    public_offering = session.query(PublicOffering).filter(PublicOffering.branch_id.isnot(None)).first()
+    offering = session.query(Offering).filter(Offering.instructor_id.isnot(None)).first()
+    branch = session.query(Branch).first()
+    if not (booking and public_offering and offering and branch):
+        raise SystemExit("The database is empty; seed it with Benchmarks/dataset.py first.")
+    city = session.get(City, branch.parent_location_id)
+    client = booking.booked_for_client
+    keys = {
+        'booking_id': booking.booking_id,
+        'client_id': booking.booked_for_client_id,
+        'booked_by_id': booking.booked_by_client_id,
+        'client_email': client.email,
+        'public_offering_id': public_offering.public_offering_id,
+        'offering_id': offering.offering_id,
+        'instructor_id': offering.instructor_id,
+        'lesson_type': offering.lesson_type,
+        'mode': offering.mode,
+        'branch_id': branch.location_id,
+        'city_id': city.location_id,
+        'province_id': city.parent_location_id,
+        'schedule_owner_id': session.query(Schedule.schedule_owner_id).limit(1).scalar(),
+        'schedule_id': branch.schedule_id,
+    }
+    session.expunge_all()
+    return keys
+
+
+def checks(k):
+    users, bookings, offerings = UserCatalog(), BookingCatalog(), OfferingCatalog()
+    schedules, locations = ScheduleCatalog(), LocationCatalog()
+    instructor = Instructor(k['instructor_id'], None, None, None, None, None)
+    return [
+        ('UserCatalog.get_user_by_id', lambda: users.get_user_by_id(k['client_id'])),
+        ('UserCatalog.get_user_by_email', lambda: users.get_user_by_email(k['client_email'])),
+        ('BookingCatalog.get_booking_by_id',
+         lambda: bookings.get_booking_by_id(k['booking_id'], load=BOOKING_WITH_CLIENT_AND_OFFERING)),
+        ('BookingCatalog.get_all_bookings_for_client', lambda: bookings.get_all_bookings_for_client(k['client_id'])),
+        ('BookingCatalog.get_all_bookings_by_client', lambda: bookings.get_all_bookings_by_client(k['booked_by_id'])),
+        ('BookingCatalog.get_bookings_for_client_page', lambda: bookings.get_bookings_for_client_page(k['client_id'])),
+        ('BookingCatalog.get_bookings_by_client_page', lambda: bookings.get_bookings_by_client_page(k['booked_by_id'])),
+        ('BookingCatalog.get_bookings_for_public_offering',
+         lambda: bookings.get_bookings_for_public_offering(k['public_offering_id'])),
+        ('OfferingCatalog.get_offering', lambda: offerings.get_offering(k['offering_id'])),
+        ('OfferingCatalog.get_offerings_by_instructor', lambda: offerings.get_offerings_by_instructor(k['instructor_id'])),
+        ('OfferingCatalog.get_public_offering',
+         lambda: offerings.get_public_offering(k['public_offering_id'], load=PUBLIC_OFFERING_DETAIL)),
+        ('OfferingCatalog.get_public_offerings_in_location',
+         lambda: offerings.get_public_offerings_in_location(k['city_id'])),
+        ('OfferingCatalog.search_public_offerings(branch)',
+         lambda: offerings.search_public_offerings(branch_id=k['branch_id'])),
+        ('OfferingCatalog.search_public_offerings(city)',
+         lambda: offerings.search_public_offerings(city_id=k['city_id'])),
+        ('OfferingCatalog.search_public_offerings(instructor)',
+         lambda: offerings.search_public_offerings(instructor_id=k['instructor_id'])),
+        ('ScheduleCatalog.get_schedule',
+         lambda: schedules.get_schedule(k['schedule_id'], load=SCHEDULE_WITH_TIME_SLOTS)),
+        ('ScheduleCatalog.get_schedules_by_owner', lambda: schedules.get_schedules_by_owner(k['schedule_owner_id'])),
+        ('ScheduleCatalog.get_schedules_by_owner_page',
+         lambda: schedules.get_schedules_by_owner_page(k['schedule_owner_id'])),
+        ('ScheduleCatalog.find_common_free_windows',
+         lambda: schedules.find_common_free_windows([k['schedule_id']], timedelta(hours=1),
+                                                    datetime.now(), datetime.now() + timedelta(days=7))),
+        ('LocationCatalog.get_cities_in_province', lambda: locations.get_cities_in_province(k['province_id'])),
+        ('LocationCatalog.get_branches_in_city', lambda: locations.get_branches_in_city(k['city_id'])),
+        ('LocationCatalog.get_branches_in_province', lambda: locations.get_branches_in_province(k['province_id'])),
+        ('LocationCatalog.get_branches_under', lambda: locations.get_branches_under(k['city_id'])),
+        ('Instructor.get_public_offerings', instructor.get_public_offerings),
+        ('Instructor.get_bookings', instructor.get_bookings),
+    ]
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from plan_nodes(child)
+
+
+def table_sizes(cur):
+    cur.execute("SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace")
+    return dict(cur.fetchall())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--min-rows', type=int, default=10_000,
+                        help="tables with at least this many rows must not be sequentially scanned")
+    parser.add_argument('--show-plans', action='store_true')
+    args = parser.parse_args()
+
+    session = current_session()
+    keys = sample_keys(session)
+    db = DatabaseConnection()
+    with db.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE")
+            sizes = table_sizes(cur)
+    large = {table for table, rows in sizes.items() if rows >= args.min_rows}
+    print(f"large tables (>= {args.min_rows} rows): {', '.join(sorted(large)) or 'none'}")
+
+    failures = 0
+    all_checks = checks(keys)
+    for name, call in all_checks:
+        session.expunge_all()
+        with capture_statements() as captured:
+            call()
+        problems = []
+        with db.connection() as conn:
+            with conn.cursor() as cur:
+                for _, statement, parameters in captured:
+                    if not statement.lstrip().upper().startswith('SELECT'):
+                        continue
+                    cur.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+                    plan = cur.fetchone()[0][0]['Plan']
+                    if args.show_plans:
+                        print(json.dumps(plan, indent=2))
+                    problems.extend(
+                        node['Relation Name'] for node in plan_nodes(plan)
+                        if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in large
+                    )
+        status = 'FAIL' if problems else 'ok'
+        failures += bool(problems)
+        detail = f"  seq scan on {', '.join(sorted(set(problems)))}" if problems else ''
+        print(f"{status:<5} {name:<55} {len(captured):>2} statements{detail}")
+
+    print(f"\n{failures} of {len(all_checks)} checks fell back to a sequential scan")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare per-object time-slot generation with the set-based bulk path.
+
+Run from the Implementation directory against a scratch database:
+
+    python Benchmarks/time_slots.py --schedules 200
+
+Temporary schedules are created for the run and deleted afterwards.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Database import SessionLocal  # noqa: E402
+from Models import Schedule, ScheduleDay, TimeSlot  # noqa: E402
+from Scheduling import ScheduleCatalog  # noqa: E402
+from utils import generate_id  # noqa: E402
+
+
+def create_schedules(session, count):
+    schedules = [
+        Schedule(schedule_id=generate_id(), schedule_owner_id=generate_id(),
+                 schedule_owner_type='benchmark')
+        for _ in range(count)
+    ]
+    session.add_all(schedules)
+    session.commit()
+    return schedules
+
+
+def drop_schedules(session, schedules):
+    ids = [s.schedule_id for s in schedules]
+    session.query(TimeSlot).filter(TimeSlot.schedule_id.in_(ids)).delete(synchronize_session=False)
+    session.query(ScheduleDay).filter(ScheduleDay.schedule_id.in_(ids)).delete(synchronize_session=False)
+    session.query(Schedule).filter(Schedule.schedule_id.in_(ids)).delete(synchronize_session=False)
+    session.commit()
+
+
+def time_loop(catalog, schedules):
+    started = time.perf_counter()
+    for schedule in schedules:
+        catalog.generate_time_slots(schedule)
+    return time.perf_counter() - started
+
+
+def time_bulk(catalog, schedules):
+    started = time.perf_counter()
+    # generate_time_slots covers eight whole days from today's midnight, the
+    # same slots as this bulk horizon.
+    inserted = catalog.generate_time_slots_bulk(schedules, days=8)
+    return time.perf_counter() - started, inserted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--schedules', type=int, default=100)
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    catalog = ScheduleCatalog(session)
+
+    loop_schedules = create_schedules(session, args.schedules)
+    bulk_schedules = create_schedules(session, args.schedules)
+    try:
+        loop_seconds = time_loop(catalog, loop_schedules)
+        bulk_seconds, inserted = time_bulk(catalog, bulk_schedules)
+        rerun_seconds, reinserted = time_bulk(catalog, bulk_schedules)
+    finally:
+        drop_schedules(session, loop_schedules + bulk_schedules)
+        session.close()
+
+    print(f"schedules:            {args.schedules}")
+    print(f"loop (ORM per slot):  {loop_seconds:8.3f}s")
+    print(f"bulk (INSERT SELECT): {bulk_seconds:8.3f}s  ({inserted} slots)")
+    print(f"bulk re-run:          {rerun_seconds:8.3f}s  ({reinserted} new slots)")
+    if bulk_seconds:
+        print(f"speed-up:             {loop_seconds / bulk_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,125 @@
+import logging
 from singleton_decorator import singleton
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from Database import SessionLocal
-from Models import Booking
-from utils import generate_id
+from Database import SessionBound
+from Metrics import instrumented
+from Models import Booking, PublicOffering
+from utils import generate_id, is_valid_id
+from Pagination import keyset_page, DEFAULT_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
 
 @singleton
-class BookingCatalog:
+@instrumented
+class BookingCatalog(SessionBound):
     def __init__(self, session: Session = None):
-        self.session = session or SessionLocal()
+        super().__init__(session)
 
-    def add_booking(self, booked_by_client_id, public_offering_id, booked_for_client_ids):
-        """Add a new booking to the database."""
-        booking_id = generate_id()
-        for client_id in booked_for_client_ids:
-            booking = Booking(
-                booking_id=booking_id,
-                booked_by_client_id=booked_by_client_id,
-                public_offering_id=public_offering_id,
-                booked_for_client_id=client_id
+    def _change_seats_taken(self, public_offering_id, seats):
+        """Move the seat counter by ``seats`` if it stays within 0..max_clients.
+
+        A single conditional UPDATE only locks the offering's own row, so a
+        full offering fails fast without counting bookings. Returns whether
+        the counter moved.
+        """
+        result = self.session.execute(
+            update(PublicOffering)
+            .where(
+                PublicOffering.public_offering_id == public_offering_id,
+                PublicOffering.seats_taken + seats <= PublicOffering.max_clients,
+                PublicOffering.seats_taken + seats >= 0,
             )
-            self.session.add(booking)
-        self.session.commit()
+            .values(seats_taken=PublicOffering.seats_taken + seats)
+            .execution_options(synchronize_session='fetch')
+        )
+        return result.rowcount == 1
+
+    def add_booking(self, booked_by_client_id, public_offering_id, booked_for_client_ids):
+        """Add a new booking to the database, reserving one seat per client.
+
+        Raises ValueError when the public offering does not exist or does not
+        have enough free seats left.
+        """
+        if not booked_for_client_ids:
+            raise ValueError("A booking needs at least one client.")
+        if not is_valid_id(public_offering_id):
+            raise ValueError("Public offering is full or does not exist.")
+        try:
+            if not self._change_seats_taken(public_offering_id, len(booked_for_client_ids)):
+                raise ValueError("Public offering is full or does not exist.")
+            bookings = [
+                Booking(
+                    booking_id=generate_id(),
+                    booked_by_client_id=booked_by_client_id,
+                    public_offering_id=public_offering_id,
+                    booked_for_client_id=client_id
+                )
+                for client_id in booked_for_client_ids
+            ]
+            self.session.add_all(bookings)
+            self._commit()
+        except Exception:
+            self._rollback()
+            raise
+        return bookings
 
-    def get_booking_by_id(self, booking_id):
-        """Retrieve a booking by ID."""
-        return self.session.query(Booking).filter_by(booking_id=booking_id).first()
+    def get_booking_by_id(self, booking_id, load=()):
+        """Retrieve a booking by ID.
+
+        ``load`` is a loading profile from Loading, e.g. BOOKING_WITH_CLIENT_AND_OFFERING.
+        """
+        if not is_valid_id(booking_id):
+            return None
+        return self.session.query(Booking).options(*load).filter_by(booking_id=booking_id).first()
 
     def remove_booking(self, booking_id):
-        """Remove a booking by ID."""
+        """Remove a booking by ID and release its seat.
+
+        The booking is removed even when the seat counter is already at 0; that
+        means the counter was out of step with the bookings, which is logged.
+        """
         booking = self.get_booking_by_id(booking_id)
         if booking:
-            self.session.delete(booking)
-            self.session.commit()
+            try:
+                if not self._change_seats_taken(booking.public_offering_id, -1):
+                    logger.warning(f"Seat counter of public offering {booking.public_offering_id} was already 0 "
+                                   f"when removing booking {booking_id}; it is out of step with its bookings")
+                self.session.delete(booking)
+                self._commit()
+            except Exception:
+                self._rollback()
+                raise
 
-    def get_all_bookings_for_client(self, client_id):
+    def get_all_bookings_for_client(self, client_id, load=()):
         """Retrieve all bookings for a specific client."""
-        return self.session.query(Booking).filter_by(booked_for_client_id=client_id).all()
+        if not is_valid_id(client_id):
+            return []
+        return self.session.query(Booking).options(*load).filter_by(booked_for_client_id=client_id).all()
 
-    def get_all_bookings_by_client(self, client_id):
+    def get_all_bookings_by_client(self, client_id, load=()):
         """Retrieve all bookings created by a specific client."""
-        return self.session.query(Booking).filter_by(booked_by_client_id=client_id).all()
+        if not is_valid_id(client_id):
+            return []
+        return self.session.query(Booking).options(*load).filter_by(booked_by_client_id=client_id).all()
+
+    def get_bookings_for_public_offering(self, public_offering_id, load=()):
+        """Retrieve all bookings of a public offering."""
+        if not is_valid_id(public_offering_id):
+            return []
+        return (self.session.query(Booking).options(*load)
+                .filter_by(public_offering_id=public_offering_id).all())
+
+    def get_bookings_for_client_page(self, client_id, page_size=DEFAULT_PAGE_SIZE, token=None, load=()):
+        """Retrieve one page of bookings for a client and the token for the next page."""
+        if not is_valid_id(client_id):
+            return [], None
+        query = self.session.query(Booking).options(*load).filter_by(booked_for_client_id=client_id)
+        return keyset_page(query, [Booking.booking_id], token, page_size)
+
+    def get_bookings_by_client_page(self, client_id, page_size=DEFAULT_PAGE_SIZE, token=None, load=()):
+        """Retrieve one page of bookings created by a client and the token for the next page."""
+        if not is_valid_id(client_id):
+            return [], None
+        query = self.session.query(Booking).options(*load).filter_by(booked_by_client_id=client_id)
+        return keyset_page(query, [Booking.booking_id], token, page_size)
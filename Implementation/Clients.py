@@ -1,16 +1,11 @@
-import uuid
 import psycopg2
 from psycopg2.extras import DictCursor
-import json
-from datetime import datetime
 import logging
 from typing import Optional, Dict, Any
+from Database import DatabaseConnection
+from utils import generate_id
+from Audit import get_audit_writer
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 class Administrator:
@@ -25,9 +20,9 @@ class Administrator:
     def create_offering(self, lesson_type: str, mode: str, capacity: int, duration: int) -> str:
         """Create a new offering."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor() as cur:
-                    offering_id = str(uuid.uuid4())
+                    offering_id = generate_id()
                     
                     # Insert offering
                     cur.execute("""
@@ -37,24 +32,17 @@ class Administrator:
                     """, (offering_id, lesson_type, mode, capacity, duration))
                     
                     # Create audit log
-                    cur.execute("""
-                        INSERT INTO audit_logs (
-                            log_id, timestamp, table_name, actor_id, action_type, 
-                            target_table, record_id, new_value
-                        ) VALUES (%s, %s, 'offerings', %s, 'INSERT', 'offerings', %s, %s::jsonb)
-                    """, (
-                        str(uuid.uuid4()),
-                        datetime.now(),
-                        self.user_id,
-                        offering_id,
-                        json.dumps({
+                    get_audit_writer().record(
+                        cur, 'offerings', 'INSERT', offering_id,
+                        new_value={
                             'offering_id': offering_id,
                             'lesson_type': lesson_type,
                             'mode': mode,
                             'capacity': capacity,
                             'duration': duration
-                        })
-                    ))
+                        },
+                        actor_id=self.user_id
+                    )
                     
                     conn.commit()
                     return offering_id
@@ -66,45 +54,36 @@ class Administrator:
     def delete_user(self, user_id: str) -> bool:
         """Delete a user from the system."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor() as cur:
-                    # Try to delete from each user type table
-                    for table in ['clients', 'instructors', 'administrators']:
-                        # Get current data for audit log
-                        cur.execute(f"""
-                            SELECT *
-                            FROM {table}
-                            WHERE user_id = %s
-                        """, (user_id,))
-                        
-                        old_data = cur.fetchone()
-                        if old_data:
-                            # Create audit log
-                            cur.execute("""
-                                INSERT INTO audit_logs (
-                                    log_id, timestamp, table_name, actor_id, action_type, 
-                                    target_table, record_id, old_value
-                                ) VALUES (%s, %s, %s, %s, 'DELETE', %s, %s, %s::jsonb)
-                            """, (
-                                str(uuid.uuid4()),
-                                datetime.now(),
-                                table,
-                                self.user_id,
-                                table,
-                                user_id,
-                                json.dumps(dict(zip([col.name for col in cur.description], old_data)))
-                            ))
-                            
-                            # Delete the user
-                            cur.execute(f"""
-                                DELETE FROM {table}
-                                WHERE user_id = %s
-                            """, (user_id,))
-                            
-                            conn.commit()
-                            return True
-                    
-                    return False
+                    # Delete from whichever user type table holds the id in a
+                    # single statement, returning the old row for the audit log
+                    cur.execute("""
+                        WITH c AS (
+                            DELETE FROM clients WHERE user_id = %(user_id)s
+                            RETURNING 'clients' AS table_name, row_to_json(clients.*) AS old_value
+                        ), i AS (
+                            DELETE FROM instructors WHERE user_id = %(user_id)s
+                            RETURNING 'instructors' AS table_name, row_to_json(instructors.*) AS old_value
+                        ), a AS (
+                            DELETE FROM administrators WHERE user_id = %(user_id)s
+                            RETURNING 'administrators' AS table_name, row_to_json(administrators.*) AS old_value
+                        )
+                        SELECT * FROM c
+                        UNION ALL SELECT * FROM i
+                        UNION ALL SELECT * FROM a
+                    """, {'user_id': user_id})
+
+                    deleted = cur.fetchone()
+                    if not deleted:
+                        return False
+
+                    table, old_value = deleted
+                    # Create audit log
+                    get_audit_writer().record(cur, table, 'DELETE', user_id, old_value=old_value, actor_id=self.user_id)
+
+                    conn.commit()
+                    return True
                     
         except Exception as e:
             logger.error(f"Error deleting user: {e}")
@@ -113,7 +92,7 @@ class Administrator:
     def edit_user(self, user_id: str, table: str, updates: Dict[str, Any]) -> bool:
         """Edit user information."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor() as cur:
                     # Get current data for audit log
                     cur.execute(f"""
@@ -125,6 +104,7 @@ class Administrator:
                     old_data = cur.fetchone()
                     if not old_data:
                         return False
+                    old_value = dict(zip([col.name for col in cur.description], old_data))
 
                     # Build UPDATE query dynamically
                     set_clause = ', '.join(f"{key} = %s" for key in updates.keys())
@@ -138,21 +118,12 @@ class Administrator:
                     cur.execute(query, list(updates.values()) + [user_id])
                     
                     # Create audit log
-                    cur.execute("""
-                        INSERT INTO audit_logs (
-                            log_id, timestamp, table_name, actor_id, action_type, 
-                            target_table, record_id, old_value, new_value
-                        ) VALUES (%s, %s, %s, %s, 'UPDATE', %s, %s, %s::jsonb, %s::jsonb)
-                    """, (
-                        str(uuid.uuid4()),
-                        datetime.now(),
-                        table,
-                        self.user_id,
-                        table,
-                        user_id,
-                        json.dumps(dict(zip([col.name for col in cur.description], old_data))),
-                        json.dumps(updates)
-                    ))
+                    get_audit_writer().record(
+                        cur, table, 'UPDATE', user_id,
+                        old_value=old_value,
+                        new_value=updates,
+                        actor_id=self.user_id
+                    )
                     
                     conn.commit()
                     return True
@@ -164,7 +135,7 @@ class Administrator:
     def delete_booking(self, booking_id: Dict[str, str]) -> bool:
         """Delete a booking."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor() as cur:
                     # Get current data for audit log
                     cur.execute("""
@@ -176,26 +147,27 @@ class Administrator:
                     old_data = cur.fetchone()
                     if not old_data:
                         return False
+                    old_value = dict(zip([col.name for col in cur.description], old_data))
 
                     # Delete booking
                     cur.execute("""
                         DELETE FROM bookings
                         WHERE booked_by_client_id = %s AND public_offering_id = %s
                     """, (booking_id['booked_by_client_id'], booking_id['public_offering_id']))
+
+                    # Release the seats held by the deleted rows
+                    cur.execute("""
+                        UPDATE public_offerings
+                        SET seats_taken = seats_taken - %s
+                        WHERE public_offering_id = %s
+                    """, (cur.rowcount, booking_id['public_offering_id']))
                     
                     # Create audit log
-                    cur.execute("""
-                        INSERT INTO audit_logs (
-                            log_id, timestamp, table_name, actor_id, action_type, 
-                            target_table, record_id, old_value
-                        ) VALUES (%s, %s, 'bookings', %s, 'DELETE', 'bookings', %s, %s::jsonb)
-                    """, (
-                        str(uuid.uuid4()),
-                        datetime.now(),
-                        self.user_id,
-                        booking_id['public_offering_id'],
-                        json.dumps(dict(zip([col.name for col in cur.description], old_data)))
-                    ))
+                    get_audit_writer().record(
+                        cur, 'bookings', 'DELETE', booking_id['public_offering_id'],
+                        old_value=old_value,
+                        actor_id=self.user_id
+                    )
                     
                     conn.commit()
                     return True
@@ -207,7 +179,7 @@ class Administrator:
     def delete_offering(self, offering_id: str) -> bool:
         """Delete an offering."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor() as cur:
                     # Get current data for audit log
                     cur.execute("""
@@ -219,6 +191,7 @@ class Administrator:
                     old_data = cur.fetchone()
                     if not old_data:
                         return False
+                    old_value = dict(zip([col.name for col in cur.description], old_data))
 
                     # Delete offering
                     cur.execute("""
@@ -227,18 +200,11 @@ class Administrator:
                     """, (offering_id,))
                     
                     # Create audit log
-                    cur.execute("""
-                        INSERT INTO audit_logs (
-                            log_id, timestamp, table_name, actor_id, action_type, 
-                            target_table, record_id, old_value
-                        ) VALUES (%s, %s, 'offerings', %s, 'DELETE', 'offerings', %s, %s::jsonb)
-                    """, (
-                        str(uuid.uuid4()),
-                        datetime.now(),
-                        self.user_id,
-                        offering_id,
-                        json.dumps(dict(zip([col.name for col in cur.description], old_data)))
-                    ))
+                    get_audit_writer().record(
+                        cur, 'offerings', 'DELETE', offering_id,
+                        old_value=old_value,
+                        actor_id=self.user_id
+                    )
                     
                     conn.commit()
                     return True
@@ -250,7 +216,7 @@ class Administrator:
     def edit_offering(self, offering_id: str, updates: Dict[str, Any]) -> bool:
         """Edit offering information."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor() as cur:
                     # Get current data for audit log
                     cur.execute("""
@@ -262,6 +228,7 @@ class Administrator:
                     old_data = cur.fetchone()
                     if not old_data:
                         return False
+                    old_value = dict(zip([col.name for col in cur.description], old_data))
 
                     # Build UPDATE query dynamically
                     set_clause = ', '.join(f"{key} = %s" for key in updates.keys())
@@ -275,19 +242,12 @@ class Administrator:
                     cur.execute(query, list(updates.values()) + [offering_id])
                     
                     # Create audit log
-                    cur.execute("""
-                        INSERT INTO audit_logs (
-                            log_id, timestamp, table_name, actor_id, action_type, 
-                            target_table, record_id, old_value, new_value
-                        ) VALUES (%s, %s, 'offerings', %s, 'UPDATE', 'offerings', %s, %s::jsonb, %s::jsonb)
-                    """, (
-                        str(uuid.uuid4()),
-                        datetime.now(),
-                        self.user_id,
-                        offering_id,
-                        json.dumps(dict(zip([col.name for col in cur.description], old_data))),
-                        json.dumps(updates)
-                    ))
+                    get_audit_writer().record(
+                        cur, 'offerings', 'UPDATE', offering_id,
+                        old_value=old_value,
+                        new_value=updates,
+                        actor_id=self.user_id
+                    )
                     
                     conn.commit()
                     return True
@@ -300,11 +260,16 @@ class Administrator:
         return f"Administrator(user_id={self.user_id}, email='{self.email}', name='{self.name}')"
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
     # Example usage
     try:
         # Create an administrator instance
         admin = Administrator(
-            user_id=str(uuid.uuid4()),
+            user_id=generate_id(),
             email="admin@example.com",
             name="Admin User"
         )
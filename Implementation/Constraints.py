@@ -0,0 +1,97 @@
+import heapq
+from collections import namedtuple
+from itertools import groupby
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from Database import current_session
+from Models import Booking, PublicOffering
+
+STREAM_BATCH_SIZE = 5000
+
+# key identifies the row (public offering or booking) the interval came from
+Interval = namedtuple('Interval', ['key', 'start', 'end'])
+# group is the branch id or client id the two overlapping intervals share
+Violation = namedtuple('Violation', ['group', 'first', 'second'])
+
+def find_overlaps(intervals):
+    """Return every pair of overlapping intervals as (earlier, later) tuples.
+
+    Intervals are half-open, so one ending exactly when another starts is not
+    a conflict. A sweep over the intervals sorted by start keeps the ones still
+    open in a heap ordered by end time, which makes the search
+    O(n log n + k) for n intervals and k overlapping pairs.
+    """
+    overlaps = []
+    active = []  # (end, sequence, interval); sequence breaks ties between equal ends
+    for sequence, interval in enumerate(sorted(intervals, key=lambda i: (i.start, i.end))):
+        while active and active[0][0] <= interval.start:
+            heapq.heappop(active)
+        for _, _, other in active:
+            overlaps.append((other, interval))
+        heapq.heappush(active, (interval.end, sequence, interval))
+    return overlaps
+
+class ConstraintValidator:
+    """Checks the OCL overlap constraints against the rows stored in the database."""
+
+    def __init__(self, session: Session = None):
+        self.session = session or current_session()
+
+    def _violations(self, statement):
+        """Stream (group, key, start, end) rows ordered by group and sweep each group."""
+        rows = self.session.execute(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+        violations = []
+        for group, group_rows in groupby(rows, key=lambda row: row[0]):
+            intervals = [Interval(key, start, end) for _, key, start, end in group_rows]
+            violations.extend(Violation(group, first, second) for first, second in find_overlaps(intervals))
+        return violations
+
+    def offering_conflicts(self, branch_id=None, start=None, end=None):
+        """Return every pair of public offerings that overlap at the same branch.
+
+        Optionally limited to one branch and to offerings intersecting [start, end).
+        """
+        statement = (
+            select(PublicOffering.branch_id, PublicOffering.public_offering_id,
+                   PublicOffering.start_time, PublicOffering.end_time)
+            .where(PublicOffering.branch_id.isnot(None),
+                   PublicOffering.start_time.isnot(None),
+                   PublicOffering.end_time.isnot(None))
+            .order_by(PublicOffering.branch_id, PublicOffering.start_time)
+        )
+        if branch_id is not None:
+            statement = statement.where(PublicOffering.branch_id == branch_id)
+        if start is not None:
+            statement = statement.where(PublicOffering.end_time > start)
+        if end is not None:
+            statement = statement.where(PublicOffering.start_time < end)
+        return self._violations(statement)
+
+    def booking_conflicts(self, client_id=None, start=None, end=None):
+        """Return every pair of bookings that overlap for the same client.
+
+        Optionally limited to one client and to bookings intersecting [start, end).
+        """
+        statement = (
+            select(Booking.booked_for_client_id, Booking.booking_id,
+                   PublicOffering.start_time, PublicOffering.end_time)
+            .join(PublicOffering, Booking.public_offering_id == PublicOffering.public_offering_id)
+            .where(Booking.booked_for_client_id.isnot(None),
+                   PublicOffering.start_time.isnot(None),
+                   PublicOffering.end_time.isnot(None))
+            .order_by(Booking.booked_for_client_id, PublicOffering.start_time)
+        )
+        if client_id is not None:
+            statement = statement.where(Booking.booked_for_client_id == client_id)
+        if start is not None:
+            statement = statement.where(PublicOffering.end_time > start)
+        if end is not None:
+            statement = statement.where(PublicOffering.start_time < end)
+        return self._violations(statement)
+
+    def audit(self, start=None, end=None):
+        """Run both overlap constraints over the whole database."""
+        return {
+            'unique_offering_per_location': self.offering_conflicts(start=start, end=end),
+            'no_overlapping_bookings': self.booking_conflicts(start=start, end=end),
+        }
@@ -0,0 +1,237 @@
+"""Streaming export of bookings, public offerings and time slots.
+
+Rows are read through a server-side cursor in fixed-size batches and written
+as they arrive, so memory use does not grow with the size of the export:
+
+    python Export.py bookings --format csv --output bookings.csv \\
+        --start 2024-09-01 --end 2024-12-31 --branch <branch_id> --checkpoint bookings.ckpt
+
+With --checkpoint, progress is recorded every few batches. Re-running the same
+command after an interruption truncates the output back to the last checkpoint
+and carries on from there; if the output is gone or shorter than the
+checkpoint, the export starts again from the beginning.
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from sqlalchemy import select, tuple_
+from Database import SessionLocal
+from Models import Booking, PublicOffering, Offering, TimeSlot, Branch
+from Pagination import encode_token, decode_token
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 5000
+CHECKPOINT_EVERY_BATCHES = 10
+
+def _bookings(start, end, branch_id):
+    statement = (
+        select(Booking.booking_id, Booking.booked_by_client_id, Booking.booked_for_client_id,
+               Booking.public_offering_id, PublicOffering.branch_id,
+               PublicOffering.start_time, PublicOffering.end_time)
+        .join(PublicOffering, Booking.public_offering_id == PublicOffering.public_offering_id)
+    )
+    return _filtered(statement, PublicOffering.start_time, start, end,
+                     PublicOffering.branch_id, branch_id), [Booking.booking_id]
+
+def _public_offerings(start, end, branch_id):
+    statement = (
+        select(PublicOffering.public_offering_id, PublicOffering.offering_id,
+               Offering.instructor_id, Offering.lesson_type, Offering.mode,
+               PublicOffering.branch_id, PublicOffering.start_time, PublicOffering.end_time,
+               PublicOffering.max_clients, PublicOffering.seats_taken)
+        .join(Offering, PublicOffering.offering_id == Offering.offering_id)
+    )
+    return _filtered(statement, PublicOffering.start_time, start, end,
+                     PublicOffering.branch_id, branch_id), [PublicOffering.public_offering_id]
+
+def _time_slots(start, end, branch_id):
+    statement = select(TimeSlot.schedule_id, TimeSlot.start_time, TimeSlot.end_time, TimeSlot.is_reserved)
+    branch_schedule = None
+    if branch_id is not None:
+        branch_schedule = select(Branch.schedule_id).where(Branch.location_id == branch_id).scalar_subquery()
+    return _filtered(statement, TimeSlot.start_time, start, end,
+                     TimeSlot.schedule_id, branch_schedule), [TimeSlot.schedule_id, TimeSlot.start_time]
+
+def _filtered(statement, time_column, start, end, branch_column, branch_value):
+    if start is not None:
+        statement = statement.where(time_column >= start)
+    if end is not None:
+        statement = statement.where(time_column < end)
+    if branch_value is not None:
+        statement = statement.where(branch_column == branch_value)
+    return statement
+
+EXPORTS = {
+    'bookings': _bookings,
+    'public_offerings': _public_offerings,
+    'time_slots': _time_slots,
+}
+
+def _open_text(path, resume, newline=None):
+    # Text goes through a binary handle whose tell() is a byte offset;
+    # tell() on a text stream is an opaque cookie that truncate() cannot use.
+    binary = open(path, 'ab' if resume else 'wb')
+    return binary, io.TextIOWrapper(binary, encoding='utf-8', newline=newline)
+
+class _CsvWriter:
+    def __init__(self, path, columns, resume):
+        self.binary, self.file = _open_text(path, resume, newline='')
+        self.writer = csv.writer(self.file)
+        if not resume:
+            self.writer.writerow(columns)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def checkpoint(self):
+        self.file.flush()
+        os.fsync(self.binary.fileno())
+        return self.binary.tell()
+
+    def close(self):
+        self.file.close()
+
+class _NdjsonWriter:
+    def __init__(self, path, columns, resume):
+        self.columns = columns
+        self.binary, self.file = _open_text(path, resume)
+
+    def write(self, rows):
+        self.file.writelines(
+            json.dumps(dict(zip(self.columns, row)), default=str) + '\n' for row in rows
+        )
+
+    checkpoint = _CsvWriter.checkpoint
+    close = _CsvWriter.close
+
+class _ParquetWriter:
+    def __init__(self, path, columns, resume):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise RuntimeError("Parquet export requires the 'pyarrow' package.") from e
+        if resume:
+            raise ValueError("Parquet exports cannot be resumed; start again without the checkpoint.")
+        self.pyarrow = pyarrow
+        self.path = path
+        self.columns = columns
+        self.writer = None
+        self.parquet = pyarrow.parquet
+
+    def write(self, rows):
+        table = self.pyarrow.Table.from_pylist([dict(zip(self.columns, row)) for row in rows])
+        if self.writer is None:
+            self.writer = self.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def checkpoint(self):
+        return None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+WRITERS = {'csv': _CsvWriter, 'ndjson': _NdjsonWriter, 'parquet': _ParquetWriter}
+
+def _load_checkpoint(path, job):
+    if path is None or not Path(path).exists():
+        return None
+    with open(path, 'r') as f:
+        state = json.load(f)
+    if state.get('job') != job:
+        raise ValueError(f"Checkpoint {path} belongs to a different export: {state.get('job')}")
+    return state
+
+def _can_resume(output, offset):
+    """Whether ``output`` still holds everything written up to the checkpoint."""
+    try:
+        return os.path.getsize(output) >= offset
+    except FileNotFoundError:
+        return False
+
+def _save_checkpoint(path, state):
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+def export(table, fmt, output, start=None, end=None, branch_id=None, checkpoint=None,
+           batch_size=EXPORT_BATCH_SIZE, session=None):
+    """Stream one table to ``output`` in constant memory; returns the total rows written."""
+    if table not in EXPORTS:
+        raise ValueError(f"Unknown export: {table}")
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown format: {fmt}")
+
+    job = {
+        'table': table, 'format': fmt, 'output': str(output), 'branch_id': branch_id,
+        'start': start.isoformat() if start else None, 'end': end.isoformat() if end else None,
+    }
+    state = _load_checkpoint(checkpoint, job)
+    if state and not _can_resume(output, state['offset']):
+        logger.warning(f"{output} is missing or shorter than checkpoint {checkpoint}; starting the export again")
+        state = None
+    statement, key_columns = EXPORTS[table](start, end, branch_id)
+    rows_written = 0
+    if state:
+        # Anything written after the last checkpoint is rewritten, never duplicated.
+        with open(output, 'r+b') as f:
+            f.truncate(state['offset'])
+        statement = statement.where(tuple_(*key_columns) > tuple_(*decode_token(state['last_key'], len(key_columns))))
+        rows_written = state['rows']
+        logger.info(f"Resuming {table} export after {rows_written} rows")
+
+    columns = list(statement.selected_columns.keys())
+    key_positions = [columns.index(column.key) for column in key_columns]
+    statement = statement.order_by(*key_columns).execution_options(yield_per=batch_size)
+
+    own_session = session is None
+    session = session or SessionLocal()
+    writer = WRITERS[fmt](output, columns, resume=state is not None)
+    try:
+        result = session.execute(statement)
+        for batch_number, batch in enumerate(result.partitions(), start=1):
+            writer.write(batch)
+            rows_written += len(batch)
+            if checkpoint and batch_number % CHECKPOINT_EVERY_BATCHES == 0:
+                offset = writer.checkpoint()
+                if offset is not None:
+                    last_key = encode_token([batch[-1][i] for i in key_positions])
+                    _save_checkpoint(checkpoint, dict(job=job, last_key=last_key,
+                                                      rows=rows_written, offset=offset))
+    finally:
+        writer.close()
+        if own_session:
+            session.close()
+
+    if checkpoint and Path(checkpoint).exists():
+        os.remove(checkpoint)
+    return rows_written
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream bookings, public offerings or time slots to a file.")
+    parser.add_argument('table', choices=sorted(EXPORTS))
+    parser.add_argument('--format', choices=sorted(WRITERS), default='csv')
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--start', type=datetime.fromisoformat, help="inclusive, e.g. 2024-09-01")
+    parser.add_argument('--end', type=datetime.fromisoformat, help="exclusive, e.g. 2025-01-01")
+    parser.add_argument('--branch', help="branch location_id")
+    parser.add_argument('--checkpoint', help="progress file used to resume an interrupted export")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    rows = export(args.table, args.format, args.output, start=args.start, end=args.end,
+                  branch_id=args.branch, checkpoint=args.checkpoint)
+    logger.info(f"Exported {rows} {args.table} rows to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+"""Bulk imports from CSV or JSON files.
+
+    python Imports.py locations branches.csv --slot-days 7
+    python Imports.py clients clients.csv
+
+A locations file lists one province/city/branch path per row; CSV needs a
+header with ``province``, ``city`` and, optionally, ``branch`` columns:
+
+    province,city,branch
+    Quebec,Montreal,Downtown
+    Quebec,Laval,
+
+JSON takes the same rows as a list of objects, or a nested document:
+
+    {"provinces": [{"name": "Quebec", "cities": [{"name": "Montreal", "branches": ["Downtown"]}]}]}
+
+Rows are validated and deduplicated in memory, and every level is matched
+against the database in one query. Only the missing locations are inserted:
+each table in a single executemany statement, all in one transaction, with
+a schedule and initial time slots for every new branch. Invalid rows are
+reported and skipped; they never abort the rest of the import.
+
+A clients file has ``email``, ``password``, ``name``, ``age`` and, for
+minors, ``guardian_email`` columns. The guardian may be an existing client
+or another adult row in the same file. Email uniqueness is checked with one
+query over every user table, and passwords are hashed in parallel on the
+shared hashing pool before the rows are inserted in one statement.
+"""
+import argparse
+import csv
+import json
+import logging
+from collections import namedtuple
+from pathlib import Path
+from sqlalchemy import insert, tuple_, select, literal, union_all, null
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from Database import SessionBound, batch
+from Models import Province, City, Branch, Schedule, Client, Instructor, Administrator
+from Passwords import get_hasher
+from Scheduling import ScheduleCatalog
+from Location import LocationCatalog
+from utils import generate_id
+
+logger = logging.getLogger(__name__)
+
+NAME_MAX_LENGTH = 255
+ADULT_AGE = 18
+
+# row is the 1-based data row (or JSON record) the error refers to
+RowError = namedtuple('RowError', ['row', 'message'])
+ImportReport = namedtuple('ImportReport', ['created', 'existing', 'errors'])
+
+def read_records(path):
+    """Read a CSV or JSON file into a list of dicts; the format follows the extension."""
+    path = Path(path)
+    if path.suffix.lower() == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+def _clean(value):
+    return ' '.join(str(value).split()) if value is not None else ''
+
+def _flatten_locations(document):
+    """One row per branch of a nested document; entries that are not objects are kept for _validate to reject."""
+    if isinstance(document, list):
+        return document
+    if not isinstance(document, dict):
+        return [document]
+    rows = []
+    for province in document.get('provinces') or []:
+        if not isinstance(province, dict):
+            rows.append(province)
+            continue
+        for city in province.get('cities') or [{}]:
+            if not isinstance(city, dict):
+                rows.append(city)
+                continue
+            for branch in city.get('branches') or [None]:
+                rows.append({'province': province.get('name'), 'city': city.get('name'), 'branch': branch})
+    return rows
+
+def _not_an_object(number, record):
+    if isinstance(record, dict):
+        return None
+    return RowError(number, f"Expected an object, got {type(record).__name__}.")
+
+class LocationImporter(SessionBound):
+    def __init__(self, session: Session = None, slot_days: int = 7):
+        super().__init__(session)
+        self.slot_days = slot_days
+
+    def _validate(self, records):
+        """Return the distinct (province, city, branch) paths and the errors; branch may be ''."""
+        errors = []
+        paths = {}
+        city_province = {}
+        for number, record in enumerate(_flatten_locations(records), start=1):
+            error = _not_an_object(number, record)
+            if error:
+                errors.append(error)
+                continue
+            if any(not isinstance(record.get(key), (str, type(None))) for key in ('province', 'city', 'branch')):
+                errors.append(RowError(number, "Province, city and branch names must be text."))
+                continue
+            province, city, branch = (_clean(record.get(key)) for key in ('province', 'city', 'branch'))
+            if not province:
+                errors.append(RowError(number, "Missing province name."))
+                continue
+            if branch and not city:
+                errors.append(RowError(number, f"Branch {branch!r} has no city."))
+                continue
+            too_long = next((name for name in (province, city, branch) if len(name) > NAME_MAX_LENGTH), None)
+            if too_long:
+                errors.append(RowError(number, f"Name longer than {NAME_MAX_LENGTH} characters: {too_long[:40]!r}..."))
+                continue
+            # City names are unique across the country, so one city cannot sit in two provinces.
+            if city and city_province.setdefault(city, province) != province:
+                errors.append(RowError(
+                    number, f"City {city!r} is already listed under province {city_province[city]!r}."))
+                continue
+            paths.setdefault((province, city, branch), number)
+        return paths, errors
+
+    def import_records(self, records, dry_run=False):
+        """Import already-parsed records; returns an ImportReport."""
+        paths, errors = self._validate(records)
+        province_names = sorted({p for p, _, _ in paths})
+        city_rows = {}  # city -> (province, first row naming it)
+        for (p, c, _), n in sorted(paths.items(), key=lambda item: item[1]):
+            if c:
+                city_rows.setdefault(c, (p, n))
+        branch_keys = sorted({(c, b) for _, c, b in paths if b})
+
+        with batch(self.session):
+            session = self.session
+            # One lookup per level resolves everything that already exists.
+            provinces = dict(session.query(Province.name, Province.location_id)
+                             .filter(Province.name.in_(province_names)).all()) if province_names else {}
+            existing_cities = {
+                name: (location_id, parent_id)
+                for name, location_id, parent_id in session.query(City.name, City.location_id, City.parent_location_id)
+                .filter(City.name.in_(list(city_rows))).all()
+            } if city_rows else {}
+
+            new_provinces = [{'location_id': generate_id(), 'name': name}
+                             for name in province_names if name not in provinces]
+            provinces.update((row['name'], row['location_id']) for row in new_provinces)
+
+            cities, new_cities = {}, []
+            for name, (province, number) in city_rows.items():
+                if name in existing_cities:
+                    location_id, parent_id = existing_cities[name]
+                    if parent_id != provinces[province]:
+                        errors.append(RowError(number, f"City {name!r} already exists in another province."))
+                        continue
+                    cities[name] = location_id
+                else:
+                    cities[name] = generate_id()
+                    new_cities.append({'location_id': cities[name], 'name': name,
+                                       'parent_location_id': provinces[province]})
+
+            # Every other row under a rejected city is dropped with it; the city's first row carries its error.
+            for (_, city, branch), number in paths.items():
+                if not city or city in cities or number == city_rows[city][1]:
+                    continue
+                what = f"Branch {branch!r}" if branch else "Row"
+                errors.append(RowError(
+                    number, f"{what} skipped: city {city!r} was rejected on row {city_rows[city][1]}."))
+            branch_keys = [(c, b) for c, b in branch_keys if c in cities]
+            errors.sort()
+            existing_branches = set()
+            if branch_keys:
+                existing_branches = set(
+                    session.query(Branch.parent_location_id, Branch.name)
+                    .filter(tuple_(Branch.parent_location_id, Branch.name)
+                            .in_([(cities[c], b) for c, b in branch_keys]))
+                    .all()
+                )
+            new_schedules, new_branches = [], []
+            for city, name in branch_keys:
+                if (cities[city], name) in existing_branches:
+                    continue
+                branch_id, schedule_id = generate_id(), generate_id()
+                new_schedules.append({'schedule_id': schedule_id, 'schedule_owner_id': branch_id,
+                                      'schedule_owner_type': 'branch'})
+                new_branches.append({'location_id': branch_id, 'name': name, 'schedule_id': schedule_id,
+                                     'parent_location_id': cities[city]})
+
+            created = {'provinces': len(new_provinces), 'cities': len(new_cities),
+                       'branches': len(new_branches), 'time_slots': 0}
+            existing = {'provinces': len(province_names) - len(new_provinces),
+                        'cities': len(cities) - len(new_cities),
+                        'branches': len(existing_branches)}
+            if dry_run:
+                return ImportReport(created, existing, errors)
+
+            for model, rows in ((Province, new_provinces), (City, new_cities),
+                                (Schedule, new_schedules), (Branch, new_branches)):
+                if rows:
+                    session.execute(insert(model), rows)
+            created['time_slots'] = ScheduleCatalog(session).generate_time_slots_bulk(
+                [row['schedule_id'] for row in new_schedules], days=self.slot_days)
+            self._commit()
+            self._after_commit(LocationCatalog().cache.invalidate)
+
+        logger.info(f"Imported locations: created {created}, already present {existing}, {len(errors)} rejected rows")
+        return ImportReport(created, existing, errors)
+
+    def import_file(self, path, dry_run=False):
+        return self.import_records(read_records(path), dry_run=dry_run)
+
+class ClientImporter(SessionBound):
+    def __init__(self, session: Session = None):
+        super().__init__(session)
+
+    def _validate(self, records):
+        """Return the well-formed rows, keyed by email, and the errors.
+
+        Emails are kept as written: registration, login and the unique
+        constraints all compare them case-sensitively.
+        """
+        errors = []
+        rows = {}
+        for number, record in enumerate(records, start=1):
+            error = _not_an_object(number, record)
+            if error:
+                errors.append(error)
+                continue
+            email = _clean(record.get('email'))
+            name = _clean(record.get('name'))
+            password = record.get('password') or ''
+            guardian_email = _clean(record.get('guardian_email')) or None
+            if '@' not in email or len(email) > NAME_MAX_LENGTH:
+                errors.append(RowError(number, f"Invalid email {email!r}."))
+                continue
+            if email in rows:
+                errors.append(RowError(number, f"Email {email} already appears on row {rows[email]['row']}."))
+                continue
+            if not name or len(name) > NAME_MAX_LENGTH:
+                errors.append(RowError(number, "Missing or too long name."))
+                continue
+            if not password:
+                errors.append(RowError(number, "Missing password."))
+                continue
+            try:
+                age = int(record.get('age'))
+            except (TypeError, ValueError):
+                errors.append(RowError(number, f"Invalid age {record.get('age')!r}."))
+                continue
+            if not 0 < age < 150:
+                errors.append(RowError(number, f"Invalid age {age}."))
+                continue
+            if age < ADULT_AGE and not guardian_email:
+                errors.append(RowError(number, "A client under 18 needs a guardian_email."))
+                continue
+            rows[email] = {'row': number, 'email': email, 'name': name, 'password': password,
+                           'age': age, 'guardian_email': guardian_email}
+        return rows, errors
+
+    def _existing_users(self, emails):
+        """Map email -> (user type, user_id, age) for every user table in one query."""
+        if not emails:
+            return {}
+        selects = [
+            select(model.email, literal(user_type), model.user_id,
+                   model.age if model is Client else null())
+            .where(model.email.in_(emails))
+            for user_type, model in (('client', Client), ('instructor', Instructor),
+                                     ('administrator', Administrator))
+        ]
+        return {email: (user_type, user_id, age)
+                for email, user_type, user_id, age in self.session.execute(union_all(*selects))}
+
+    def import_records(self, records, dry_run=False):
+        """Register every valid client in ``records``; returns an ImportReport."""
+        rows, errors = self._validate(records)
+        guardian_emails = {row['guardian_email'] for row in rows.values() if row['guardian_email']}
+        existing = self._existing_users(sorted(set(rows) | guardian_emails))
+
+        accepted = {}
+        already_registered = {'clients': sum(email in existing for email in rows)}
+        for email, row in rows.items():
+            if email in existing:
+                errors.append(RowError(row['row'], f"Email {email} is already registered."))
+            else:
+                accepted[email] = row
+
+        # Guardians resolve to an existing adult client or to an adult row of this file.
+        # Rejecting a row strands the rows that name it as guardian, wherever they
+        # appear in the file, so repeat until a pass rejects nothing.
+        rejected = True
+        while rejected:
+            rejected = False
+            for email, row in list(accepted.items()):
+                guardian_email = row['guardian_email']
+                if not guardian_email:
+                    continue
+                if guardian_email in accepted:
+                    guardian_age = accepted[guardian_email]['age']
+                elif guardian_email in existing and existing[guardian_email][0] == 'client':
+                    guardian_age = existing[guardian_email][2]
+                elif guardian_email in rows:
+                    errors.append(RowError(row['row'], f"Guardian {guardian_email} could not be imported."))
+                    del accepted[email]
+                    rejected = True
+                    continue
+                else:
+                    errors.append(RowError(row['row'], f"Guardian {guardian_email} is not a registered client."))
+                    del accepted[email]
+                    rejected = True
+                    continue
+                if guardian_age is None or guardian_age < ADULT_AGE:
+                    errors.append(RowError(row['row'], f"Guardian {guardian_email} is not an adult."))
+                    del accepted[email]
+                    rejected = True
+
+        if dry_run or not accepted:
+            errors.sort()
+            return ImportReport({'clients': len(accepted)}, already_registered, errors)
+
+        hashes = get_hasher().hash_many([row['password'] for row in accepted.values()])
+        for row, hashed in zip(accepted.values(), hashes):
+            row['user_id'] = generate_id()
+            row['hashed_password'] = hashed.decode('utf-8')
+        for row in accepted.values():
+            guardian_email = row['guardian_email']
+            if guardian_email:
+                row['guardian_id'] = (accepted[guardian_email]['user_id'] if guardian_email in accepted
+                                      else existing[guardian_email][1])
+            else:
+                row['guardian_id'] = None
+        # Adults first, so a guardian is always inserted before the minors it covers.
+        ordered = sorted(accepted.values(), key=lambda row: row['age'] < ADULT_AGE)
+        client_rows = [{key: row[key] for key in ('user_id', 'email', 'hashed_password', 'name', 'age', 'guardian_id')}
+                       for row in ordered]
+
+        try:
+            with batch(self.session):
+                self.session.execute(insert(Client), client_rows)
+                self._commit()
+            created = len(client_rows)
+        except IntegrityError:
+            # Someone registered one of these emails since the check; insert row by row instead.
+            created = self._insert_one_by_one(ordered, client_rows, errors)
+
+        errors.sort()
+        logger.info(f"Imported {created} clients, {len(errors)} rejected rows")
+        return ImportReport({'clients': created}, already_registered, errors)
+
+    def _insert_one_by_one(self, ordered, client_rows, errors):
+        created = 0
+        failed = set()
+        with batch(self.session):
+            for row, client_row in zip(ordered, client_rows):
+                if row['guardian_email'] in failed:
+                    errors.append(RowError(row['row'], f"Guardian {row['guardian_email']} could not be imported."))
+                    failed.add(row['email'])
+                    continue
+                try:
+                    with self.session.begin_nested():
+                        self.session.execute(insert(Client), [client_row])
+                    created += 1
+                except IntegrityError as e:
+                    errors.append(RowError(row['row'], f"Could not insert: {e.orig}"))
+                    failed.add(row['email'])
+            self._commit()
+        return created
+
+    def import_file(self, path, dry_run=False):
+        return self.import_records(read_records(path), dry_run=dry_run)
+
+def _print_report(report):
+    for table, count in report.created.items():
+        print(f"created  {count:>8} {table}")
+    for table, count in report.existing.items():
+        print(f"existing {count:>8} {table}")
+    for error in report.errors:
+        print(f"row {error.row}: {error.message}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import data from CSV or JSON files.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    locations = commands.add_parser('locations', help="provinces, cities and branches")
+    locations.add_argument('path')
+    locations.add_argument('--slot-days', type=int, default=7,
+                           help="days of time slots to create for each new branch")
+    locations.add_argument('--dry-run', action='store_true', help="validate and report without writing")
+    clients = commands.add_parser('clients', help="client registrations, minors with guardians")
+    clients.add_argument('path')
+    clients.add_argument('--dry-run', action='store_true', help="validate and report without writing")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.command == 'locations':
+        report = LocationImporter(slot_days=args.slot_days).import_file(args.path, dry_run=args.dry_run)
+    else:
+        report = ClientImporter().import_file(args.path, dry_run=args.dry_run)
+    _print_report(report)
+
+if __name__ == "__main__":
+    main()
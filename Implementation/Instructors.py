@@ -1,16 +1,11 @@
-import uuid
 import psycopg2
 from psycopg2.extras import DictCursor
-import json
-from datetime import datetime
 import logging
 from typing import List, Optional, Dict
+from Database import DatabaseConnection
+from utils import generate_id
+from Audit import get_audit_writer
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 class Instructor:
@@ -27,7 +22,7 @@ class Instructor:
     def update_profile(self, **kwargs) -> bool:
         """Update instructor profile information."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor() as cur:
                     # Get current data for audit log
                     cur.execute("""
@@ -56,18 +51,11 @@ class Instructor:
                     )
                     
                     # Create audit log
-                    cur.execute("""
-                        INSERT INTO audit_logs (
-                            log_id, timestamp, table_name, action_type, 
-                            target_table, record_id, old_value, new_value
-                        ) VALUES (%s, %s, 'instructors', 'UPDATE', 'instructors', %s, %s::jsonb, %s::jsonb)
-                    """, (
-                        str(uuid.uuid4()),
-                        datetime.now(),
-                        self.user_id,
-                        json.dumps(old_data),
-                        json.dumps(update_fields)
-                    ))
+                    get_audit_writer().record(
+                        cur, 'instructors', 'UPDATE', self.user_id,
+                        old_value=old_data,
+                        new_value=update_fields
+                    )
                     
                     conn.commit()
                     
@@ -84,7 +72,7 @@ class Instructor:
     def set_branch_availability(self, branch_id: str) -> bool:
         """Add a branch to the instructor's availability."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute("""
                         INSERT INTO instructor_branch_availability (instructor_id, branch_id)
@@ -95,21 +83,13 @@ class Instructor:
                     
                     if cur.fetchone():
                         # Create audit log
-                        cur.execute("""
-                            INSERT INTO audit_logs (
-                                log_id, timestamp, table_name, action_type, 
-                                target_table, record_id, new_value
-                            ) VALUES (%s, %s, 'instructor_branch_availability', 'INSERT', 
-                                     'instructor_branch_availability', %s, %s::jsonb)
-                        """, (
-                            str(uuid.uuid4()),
-                            datetime.now(),
-                            self.user_id,
-                            json.dumps({
+                        get_audit_writer().record(
+                            cur, 'instructor_branch_availability', 'INSERT', self.user_id,
+                            new_value={
                                 'instructor_id': self.user_id,
                                 'branch_id': branch_id
-                            })
-                        ))
+                            }
+                        )
                         
                         conn.commit()
                         return True
@@ -122,7 +102,7 @@ class Instructor:
     def remove_branch_availability(self, branch_id: str) -> bool:
         """Remove a branch from the instructor's availability."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor() as cur:
                     # Get current data for audit log
                     cur.execute("""
@@ -141,21 +121,13 @@ class Instructor:
                     """, (self.user_id, branch_id))
                     
                     # Create audit log
-                    cur.execute("""
-                        INSERT INTO audit_logs (
-                            log_id, timestamp, table_name, action_type, 
-                            target_table, record_id, old_value
-                        ) VALUES (%s, %s, 'instructor_branch_availability', 'DELETE', 
-                                 'instructor_branch_availability', %s, %s::jsonb)
-                    """, (
-                        str(uuid.uuid4()),
-                        datetime.now(),
-                        self.user_id,
-                        json.dumps({
+                    get_audit_writer().record(
+                        cur, 'instructor_branch_availability', 'DELETE', self.user_id,
+                        old_value={
                             'instructor_id': self.user_id,
                             'branch_id': branch_id
-                        })
-                    ))
+                        }
+                    )
                     
                     conn.commit()
                     return True
@@ -167,7 +139,7 @@ class Instructor:
     def get_available_branches(self) -> List[Dict]:
         """Get all branches where the instructor is available."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor(cursor_factory=DictCursor) as cur:
                     cur.execute("""
                         SELECT b.* 
@@ -186,13 +158,13 @@ class Instructor:
     def get_public_offerings(self) -> List[Dict]:
         """Get all public offerings associated with this instructor."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor(cursor_factory=DictCursor) as cur:
                     cur.execute("""
-                        SELECT po.*, o.lesson_type, o.mode, o.capacity, o.duration
+                        SELECT po.*, o.lesson_type, o.mode, o.capacity
                         FROM public_offerings po
                         JOIN offerings o ON po.offering_id = o.offering_id
-                        WHERE po.instructor_id = %s
+                        WHERE o.instructor_id = %s
                     """, (self.user_id,))
                     
                     return [dict(row) for row in cur.fetchall()]
@@ -204,14 +176,15 @@ class Instructor:
     def get_bookings(self) -> List[Dict]:
         """Get all bookings for this instructor's offerings."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor(cursor_factory=DictCursor) as cur:
                     cur.execute("""
                         SELECT b.*, c.name as client_name
                         FROM bookings b
                         JOIN clients c ON b.booked_by_client_id = c.user_id
-                        JOIN public_offerings po ON b.public_offering_id = po.offering_id
-                        WHERE po.instructor_id = %s
+                        JOIN public_offerings po ON b.public_offering_id = po.public_offering_id
+                        JOIN offerings o ON po.offering_id = o.offering_id
+                        WHERE o.instructor_id = %s
                     """, (self.user_id,))
                     
                     return [dict(row) for row in cur.fetchall()]
@@ -223,9 +196,9 @@ class Instructor:
     def create_offering(self, lesson_type: str, mode: str, capacity: int, duration: int) -> Dict:
         """Create a new offering."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor(cursor_factory=DictCursor) as cur:
-                    offering_id = str(uuid.uuid4())
+                    offering_id = generate_id()
                     
                     # Create base offering
                     cur.execute("""
@@ -237,17 +210,7 @@ class Instructor:
                     offering = dict(cur.fetchone())
                     
                     # Create audit log
-                    cur.execute("""
-                        INSERT INTO audit_logs (
-                            log_id, timestamp, table_name, action_type, 
-                            target_table, record_id, new_value
-                        ) VALUES (%s, %s, 'offerings', 'INSERT', 'offerings', %s, %s::jsonb)
-                    """, (
-                        str(uuid.uuid4()),
-                        datetime.now(),
-                        offering_id,
-                        json.dumps(offering)
-                    ))
+                    get_audit_writer().record(cur, 'offerings', 'INSERT', offering_id, new_value=offering)
                     
                     conn.commit()
                     return offering
@@ -260,7 +223,7 @@ class Instructor:
                              lesson_type: str, mode: str, capacity: int) -> Dict:
         """Create a public offering from an existing offering."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.connection() as conn:
                 with conn.cursor(cursor_factory=DictCursor) as cur:
                     # Create public offering
                     cur.execute("""
@@ -277,17 +240,7 @@ class Instructor:
                     public_offering = dict(cur.fetchone())
                     
                     # Create audit log
-                    cur.execute("""
-                        INSERT INTO audit_logs (
-                            log_id, timestamp, table_name, action_type, 
-                            target_table, record_id, new_value
-                        ) VALUES (%s, %s, 'public_offerings', 'INSERT', 'public_offerings', %s, %s::jsonb)
-                    """, (
-                        str(uuid.uuid4()),
-                        datetime.now(),
-                        offering_id,
-                        json.dumps(public_offering)
-                    ))
+                    get_audit_writer().record(cur, 'public_offerings', 'INSERT', offering_id, new_value=public_offering)
                     
                     conn.commit()
                     return public_offering
@@ -301,16 +254,21 @@ class Instructor:
                 f"specialization='{self.specialization}', email='{self.email}')")
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
     # Example usage
     try:
         # Create an instructor
         instructor = Instructor(
-            user_id=str(uuid.uuid4()),
+            user_id=generate_id(),
             email="instructor@example.com",
             name="John Smith",
             phone="123-456-7890",
             specialization="Piano",
-            schedule_id=str(uuid.uuid4())
+            schedule_id=generate_id()
         )
         
         # Create an offering
@@ -325,7 +283,7 @@ if __name__ == "__main__":
         # Create a public offering
         public_offering = instructor.create_public_offering(
             offering_id=offering['offering_id'],
-            schedule_id=str(uuid.uuid4()),
+            schedule_id=generate_id(),
             lesson_type=offering['lesson_type'],
             mode=offering['mode'],
             capacity=offering['capacity']
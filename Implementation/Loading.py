@@ -0,0 +1,51 @@
+"""Named eager-loading profiles for the catalog getters.
+
+Relationships are lazy by default, so walking them over a list of objects
+costs one SELECT per object. Pass one of these profiles as ``load=`` to a
+catalog getter to fetch the relationships the caller is about to use up
+front: many-to-one paths are joined into the same query, and collections
+are fetched with one extra ``IN`` query per relationship.
+"""
+from sqlalchemy.orm import joinedload, selectinload
+from Models import Booking, PublicOffering, Offering, Branch, City, Schedule
+
+OFFERING_WITH_PUBLIC_OFFERINGS = (
+    selectinload(Offering.public_offerings),
+)
+
+PUBLIC_OFFERING_WITH_OFFERING = (
+    joinedload(PublicOffering.offering),
+)
+
+PUBLIC_OFFERING_WITH_BOOKINGS = (
+    selectinload(PublicOffering.bookings),
+)
+
+# Everything a listing page shows: the lesson, where it is held and who booked it.
+PUBLIC_OFFERING_DETAIL = (
+    joinedload(PublicOffering.offering),
+    joinedload(PublicOffering.branch).joinedload(Branch.city).joinedload(City.province),
+    selectinload(PublicOffering.bookings),
+)
+
+BOOKING_WITH_OFFERING = (
+    joinedload(Booking.public_offering).joinedload(PublicOffering.offering),
+)
+
+BOOKING_WITH_CLIENT_AND_OFFERING = (
+    joinedload(Booking.booked_by_client),
+    joinedload(Booking.booked_for_client),
+    joinedload(Booking.public_offering).joinedload(PublicOffering.offering),
+)
+
+CITY_WITH_PROVINCE = (
+    joinedload(City.province),
+)
+
+BRANCH_WITH_LOCATION = (
+    joinedload(Branch.city).joinedload(City.province),
+)
+
+SCHEDULE_WITH_TIME_SLOTS = (
+    selectinload(Schedule.time_slots),
+)
@@ -1,56 +1,163 @@
-import uuid
-import psycopg2
-from psycopg2.extras import DictCursor
-import json
-from pathlib import Path
 import logging
-from datetime import datetime
+import threading
+import time
 from singleton_decorator import singleton
+from sqlalchemy import select, union_all, func, any_, inspect
 from sqlalchemy.orm import Session
-from Database import SessionLocal
-from utils import generate_id
+from Database import SessionLocal, SessionBound, batch
+from Metrics import instrumented
+from utils import generate_id, is_valid_id
 from Models import Province, City, Branch
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
-@singleton
-class DatabaseConnection:
-    def __init__(self):
-        self.conn_params = self._load_connection_params()
-    
-    def _load_connection_params(self):
-        secrets_path = Path(__file__).parent / '.secrets'
-        with open(secrets_path, 'r') as f:
-            return json.load(f)
-    
-    def get_connection(self):
-        return psycopg2.connect(**self.conn_params)
+def branch_subtree(location_id):
+    """Select the id of every branch at or below a province, city or branch.
+
+    The hierarchy is always Province -> City -> Branch. One select per
+    level, each matching on its own indexed column, are glued together with
+    UNION ALL; at most one of them finds rows, and all run in one round trip.
+    """
+    return union_all(
+        select(Branch.location_id)
+        .join(City, Branch.parent_location_id == City.location_id)
+        .where(City.parent_location_id == location_id),
+        select(Branch.location_id).where(Branch.parent_location_id == location_id),
+        select(Branch.location_id).where(Branch.location_id == location_id),
+    )
+
+def in_branch_subtree(column, location_id):
+    """Condition: ``column`` holds the id of a branch in branch_subtree(location_id).
+
+    The subtree is gathered into an array once, so ``column`` is matched with
+    = ANY against its own index. Joined as an IN subquery, the planner tends
+    to scan the whole outer table instead.
+    """
+    subtree = branch_subtree(location_id).subquery()
+    return column == any_(func.array(select(subtree.c.location_id).scalar_subquery()))
+
+LOCATION_CACHE_MAX_AGE = 300.0  # seconds before changes made outside this process are picked up
+
+class LocationCache:
+    """In-process snapshot of every province, city and branch, indexed by id and by name.
+
+    The snapshot is loaded in one pass on first use and dropped by
+    invalidate() or once it is older than ``max_age``. Cached objects are
+    detached; get() merges them and their parent locations into the caller's
+    session without SQL, so walking up to the province is free while other
+    relationships still lazy-load normally. Lookups that are not in the
+    snapshot fall back to the database and count as misses.
+    """
+
+    def __init__(self, max_age: float = LOCATION_CACHE_MAX_AGE):
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.invalidations = 0
+        self._indexes = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        session = SessionLocal()
+        try:
+            indexes = {}
+            for model in (Province, City, Branch):
+                rows = session.query(model).all()
+                indexes[(model, 'id')] = {row.location_id: row for row in rows}
+                by_name = {}
+                for row in rows:
+                    by_name.setdefault(row.name, row)  # branch names may repeat; keep the first
+                indexes[(model, 'name')] = by_name
+            session.expunge_all()
+        finally:
+            session.close()
+        return indexes
+
+    def _current_indexes(self):
+        with self._lock:
+            if self._indexes is None or time.monotonic() - self._loaded_at > self.max_age:
+                self._indexes = self._load()
+                self._loaded_at = time.monotonic()
+                self.loads += 1
+            return self._indexes
+
+    @staticmethod
+    def _merge(session, location):
+        # An instance the session already holds may have unflushed changes;
+        # merging the snapshot onto it would overwrite them.
+        existing = session.identity_map.get(inspect(location).key)
+        if existing is not None:
+            return existing
+        return session.merge(location, load=False)
+
+    def _merge_ancestors(self, session, indexes, location):
+        # Merging the parents first lets branch.city.province resolve from the
+        # session's identity map instead of issuing a lazy load per level.
+        parent_model = {City: Province, Branch: City}.get(type(location))
+        if parent_model is None:
+            return
+        parent = indexes[(parent_model, 'id')].get(location.parent_location_id)
+        if parent is not None:
+            self._merge_ancestors(session, indexes, parent)
+            self._merge(session, parent)
+
+    def get(self, session, model, key, by='id'):
+        indexes = self._current_indexes()
+        cached = indexes[(model, by)].get(key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            self._merge_ancestors(session, indexes, cached)
+            return self._merge(session, cached)
+        with self._lock:
+            self.misses += 1
+        if by == 'id' and not is_valid_id(key):
+            return None
+        column = model.location_id if by == 'id' else model.name
+        return session.query(model).filter(column == key).first()
+
+    def invalidate(self):
+        with self._lock:
+            self._indexes = None
+            self.invalidations += 1
+
+    def stats(self):
+        indexes = self._indexes or {}
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'loads': self.loads,
+            'invalidations': self.invalidations,
+            'provinces': len(indexes.get((Province, 'id'), ())),
+            'cities': len(indexes.get((City, 'id'), ())),
+            'branches': len(indexes.get((Branch, 'id'), ())),
+        }
 
 @singleton
-class LocationCatalog:
-    def __init__(self, session: Session = None):
-        self.session = session or SessionLocal()
+@instrumented
+class LocationCatalog(SessionBound):
+    def __init__(self, session: Session = None, cache: LocationCache = None):
+        super().__init__(session)
+        self.cache = cache or LocationCache()
 
     def create_province(self, name):
         """Create a new province and add it to the catalog."""
         province_id = generate_id()
         province = Province(location_id=province_id, name=name)
         self.session.add(province)
-        self.session.commit()
+        self._commit()
+        self._after_commit(self.cache.invalidate)
         return province
 
     def get_province(self, location_id: str) -> 'Province':
         """Retrieve a province by its ID."""
-        return self.session.query(Province).filter_by(location_id=province_id).first()
+        return self.cache.get(self.session, Province, location_id)
 
     def get_province_by_name(self, name: str) -> 'Province':
         """Retrieve a province by its name."""
-        return self.session.query(Province).filter_by(name=name).first()
+        return self.cache.get(self.session, Province, name, by='name')
 
     def create_city(self, province_id, name):
         """Create a new city and add it to the catalog."""
@@ -61,38 +168,70 @@ class LocationCatalog:
         city_id = generate_id()
         city = City(location_id=city_id, name=name, parent_location_id=province_id)
         self.session.add(city)
-        self.session.commit()
+        self._commit()
+        self._after_commit(self.cache.invalidate)
         return city
 
     def get_city(self, city_id):
         """Retrieve a city by its ID."""
-        return self.session.query(City).filter_by(location_id=city_id).first()
+        return self.cache.get(self.session, City, city_id)
 
     def get_city_by_name(self, name):
         """Retrieve a city by its name."""
-        return self.session.query(City).filter_by(name=name).first()
+        return self.cache.get(self.session, City, name, by='name')
 
     def create_branch(self, city_id, name, schedule_catalog):
-        """Create a new branch and add it to the catalog."""
-        city = self.get_city(city_id)
-        if not city:
-            raise ValueError("City not found.")
-
-        branch_id = generate_id()
-        branch = Branch(location_id=branch_id, name=name, parent_location_id=city_id)
-        self.session.add(branch)
-        self.session.commit() 
-
-        schedule = schedule_catalog.create_schedule(branch_id, "branch")
-        branch.schedule_id = schedule.schedule_id 
-
-        self.session.commit() 
+        """Create a new branch and its schedule in one transaction."""
+        with batch(self.session):
+            city = self.get_city(city_id)
+            if not city:
+                raise ValueError("City not found.")
+
+            branch_id = generate_id()
+            branch = Branch(location_id=branch_id, name=name, parent_location_id=city_id)
+            self.session.add(branch)
+
+            schedule = schedule_catalog.create_schedule(branch_id, "branch")
+            branch.schedule_id = schedule.schedule_id
+            self._commit()
+            self._after_commit(self.cache.invalidate)
         return branch
 
     def get_branch(self, branch_id):
         """Retrieve a branch by its ID."""
-        return self.session.query(Branch).filter_by(location_id=branch_id).first()
+        return self.cache.get(self.session, Branch, branch_id)
 
     def get_branch_by_name(self, name):
         """Retrieve a branch by its name."""
-        return self.session.query(Branch).filter_by(name=name).first()
+        return self.cache.get(self.session, Branch, name, by='name')
+
+    def get_cities_in_province(self, province_id, load=()):
+        """Retrieve every city of a province."""
+        if not is_valid_id(province_id):
+            return []
+        return self.session.query(City).options(*load).filter(City.parent_location_id == province_id).all()
+
+    def get_branches_in_city(self, city_id, load=()):
+        """Retrieve every branch of a city."""
+        if not is_valid_id(city_id):
+            return []
+        return self.session.query(Branch).options(*load).filter(Branch.parent_location_id == city_id).all()
+
+    def get_branches_in_province(self, province_id, load=()):
+        """Retrieve every branch in every city of a province in one query."""
+        if not is_valid_id(province_id):
+            return []
+        return (
+            self.session.query(Branch)
+            .options(*load)
+            .join(City, Branch.parent_location_id == City.location_id)
+            .filter(City.parent_location_id == province_id)
+            .all()
+        )
+
+    def get_branches_under(self, location_id, load=()):
+        """Retrieve every branch at or below a province, city or branch ID."""
+        if not is_valid_id(location_id):
+            return []
+        return (self.session.query(Branch).options(*load)
+                .filter(in_branch_subtree(Branch.location_id, location_id)).all())
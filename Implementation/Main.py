@@ -1,4 +1,6 @@
+import logging
 import sys
+from Database import BatchFailed
 from System import System, generate_id
 from Models import Client, Administrator, Instructor, Booking
 from OCL_testing import OCLTests
@@ -60,14 +62,17 @@ def add_instructor(user_catalog):
     user_catalog.add_user(instructor)
     print("Instructor added successfully!")
 
-def add_province_and_cities(location_catalog):
+def add_province_and_cities(system):
     print("\n--- Add Province and Cities ---")
     province_name = input("Enter province name: ")
     city_names = input("Enter city names, separated by commas: ").split(',')
 
-    province = location_catalog.create_province(province_name)
-    for city_name in city_names:
-        location_catalog.create_city(province.location_id, city_name.strip())
+    # One transaction for the province and all of its cities
+    location_catalog = system.location_catalog
+    with system.batch():
+        province = location_catalog.create_province(province_name)
+        for city_name in city_names:
+            location_catalog.create_city(province.location_id, city_name.strip())
     print("Province and cities added successfully.")
 
 def create_booking(booking_catalog, user_catalog):
@@ -81,12 +86,11 @@ def create_booking(booking_catalog, user_catalog):
         print("Client not found.")
         return
     
-    booking = Booking(
-        booking_id=generate_id(),
-        booked_by_client_id=client_id,
-        public_offering_id=offering_id
-    )
-    booking_catalog.add_booking(booking)
+    try:
+        booking_catalog.add_booking(client_id, offering_id, [client_id])
+    except ValueError as e:
+        print(f"Booking failed: {e}")
+        return
     print("Booking created successfully.")
 
 def ocl_test_mode():
@@ -96,33 +100,41 @@ def ocl_test_mode():
 def main():
     system = System()
     user_catalog = system.user_catalog
-    location_catalog = system.location_catalog
     schedule_catalog = system.schedule_catalog
     booking_catalog = system.booking_catalog
 
-    session = system.create_session()
-
     while True:
         display_menu()
         choice = input("Select an option: ")
 
-        if choice == '1':
-            setup_admin_user(user_catalog)
-        elif choice == '2':
-            add_client(user_catalog)
-        elif choice == '3':
-            add_instructor(user_catalog)
-        elif choice == '4':
-            add_province_and_cities(location_catalog)
-        elif choice == '5':
-            create_booking(booking_catalog, user_catalog)
-        elif choice == '6':
-            ocl_test_mode(session)
-        elif choice == '0':
+        if choice == '6':
+            ocl_test_mode()
+            continue
+        if choice == '0':
             print("Exiting program.")
             sys.exit()
-        else:
-            print("Invalid choice. Please select again.")
+
+        # Each action gets its own unit of work, so QUERY_BUDGET applies to it.
+        try:
+            with system.unit_of_work():
+                if choice == '1':
+                    setup_admin_user(user_catalog)
+                elif choice == '2':
+                    add_client(user_catalog)
+                elif choice == '3':
+                    add_instructor(user_catalog)
+                elif choice == '4':
+                    add_province_and_cities(system)
+                elif choice == '5':
+                    create_booking(booking_catalog, user_catalog)
+                else:
+                    print("Invalid choice. Please select again.")
+        except BatchFailed:
+            print("None of the changes of this action were saved.")
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     main()
@@ -0,0 +1,263 @@
+"""In-process latency metrics for SQL statements and catalog methods.
+
+Three sources feed one registry:
+
+* SQLAlchemy statements, through engine events (instrument_engine, hooked up by
+  Database.get_engine);
+* raw psycopg2 statements, through the connection handed out by
+  DatabaseConnection.connection() (InstrumentedConnection);
+* catalog methods, through the @instrumented class decorator.
+
+Statements slower than SLOW_QUERY_SECONDS are logged to the
+``Metrics.slow_queries`` logger. render() returns everything in the
+Prometheus text exposition format; set METRICS_FILE to have it written out
+when the process exits.
+"""
+import atexit
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+slow_query_logger = logging.getLogger(__name__ + '.slow_queries')
+
+SLOW_QUERY_SECONDS = float(os.environ.get('SLOW_QUERY_MS') or 200) / 1000.0
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+class Histogram:
+    """Fixed-bucket histogram; buckets are upper bounds, as in Prometheus."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._buckets = {}
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._counters = {}    # (name, labels) -> int
+
+    def describe(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self._help[name] = help_text
+        self._buckets[name] = buckets
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self._buckets.get(name, LATENCY_BUCKETS))
+            histogram.observe(value)
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """Return {(name, labels): {'count', 'sum', 'buckets'}} plus counters, for tests and reports."""
+        with self._lock:
+            histograms = {key: {'count': h.count, 'sum': h.sum, 'buckets': list(h.counts)}
+                          for key, h in self._histograms.items()}
+            return histograms, dict(self._counters)
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = sorted((key, (h.buckets, list(h.counts), h.sum, h.count))
+                                for key, h in self._histograms.items())
+            counters = sorted(self._counters.items())
+        lines = []
+        described = set()
+
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), (buckets, counts, total, count) in histograms:
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {total}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        for (name, labels), value in counters:
+            header(name, 'counter')
+            lines.append(f"{name}{_labels(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+registry = MetricsRegistry()
+registry.describe('db_statement_seconds', "SQL statement latency in seconds.")
+registry.describe('db_statement_rows', "Rows returned or affected per SQL statement.", ROW_BUCKETS)
+registry.describe('catalog_method_seconds', "Catalog method latency in seconds.")
+registry.describe('db_slow_statements_total', "SQL statements slower than the slow-query threshold.")
+registry.describe('catalog_method_errors_total', "Catalog method calls that raised.")
+
+def render():
+    return registry.render()
+
+def _operation(statement):
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else ''
+
+_captures = contextvars.ContextVar('statement_captures', default=())
+
+@contextmanager
+def capture_statements():
+    """Collect (source, statement, parameters) for every statement run inside the block."""
+    captured = []
+    token = _captures.set(_captures.get() + (captured,))
+    try:
+        yield captured
+    finally:
+        _captures.reset(token)
+
+def record_statement(source, statement, parameters, seconds, rows):
+    for captured in _captures.get():
+        captured.append((source, statement, parameters))
+    operation = _operation(statement)
+    registry.observe('db_statement_seconds', seconds, source=source, operation=operation)
+    if rows is not None and rows >= 0:
+        registry.observe('db_statement_rows', rows, source=source, operation=operation)
+    if seconds >= SLOW_QUERY_SECONDS:
+        registry.increment('db_slow_statements_total', source=source, operation=operation)
+        slow_query_logger.warning(
+            f"{seconds * 1000:.1f} ms ({source}, {rows} rows): {' '.join(statement.split())[:2000]} "
+            f"params={str(parameters)[:500]}"
+        )
+
+# SQLAlchemy
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info['query_started'].pop()
+    record_statement('sqlalchemy', statement, parameters, seconds, cursor.rowcount)
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get('query_started') if exception_context.connection else None
+    if started:
+        started.pop()
+
+def instrument_engine(engine):
+    from sqlalchemy import event
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+# psycopg2
+
+class InstrumentedCursor:
+    """Times execute()/executemany() on a psycopg2 cursor; everything else passes through."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._cursor.__exit__(*exc_info)
+
+    def _timed(self, method, statement, parameters):
+        started = time.perf_counter()
+        try:
+            return method(statement, parameters)
+        finally:
+            text = statement.decode('utf-8', 'replace') if isinstance(statement, bytes) else str(statement)
+            record_statement('psycopg2', text, parameters, time.perf_counter() - started, self._cursor.rowcount)
+
+    def execute(self, statement, parameters=None):
+        return self._timed(self._cursor.execute, statement, parameters)
+
+    def executemany(self, statement, parameters):
+        return self._timed(self._cursor.executemany, statement, parameters)
+
+class InstrumentedConnection:
+    """psycopg2 connection whose cursors are InstrumentedCursors."""
+
+    def __init__(self, connection):
+        self.raw = connection
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self.raw.cursor(*args, **kwargs))
+
+# Catalog methods
+
+def timed(catalog, method):
+    """Decorator recording the latency (and failures) of one catalog method."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                registry.increment('catalog_method_errors_total', catalog=catalog, method=method)
+                raise
+            finally:
+                registry.observe('catalog_method_seconds', time.perf_counter() - started,
+                                 catalog=catalog, method=method)
+        return wrapper
+    return decorator
+
+def instrumented(cls):
+    """Class decorator timing every public method of a catalog.
+
+    Apply it beneath @singleton so the wrapped class is the one being timed.
+    """
+    for name, attribute in list(vars(cls).items()):
+        if not name.startswith('_') and callable(attribute):
+            setattr(cls, name, timed(cls.__name__, name)(attribute))
+    return cls
+
+def _write_on_exit():
+    path = os.environ.get('METRICS_FILE')
+    if path:
+        with open(path, 'w') as f:
+            f.write(render())
+
+atexit.register(_write_on_exit)
@@ -1,107 +1,148 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, Date, DateTime, Index
+from sqlalchemy.dialects.postgresql import BIT, UUID
 from sqlalchemy.orm import relationship
 from Database import Base
 
+# Keys are stored as native 16-byte uuid columns but handled as strings in Python.
+Key = UUID(as_uuid=False)
+
 class Administrator(Base):
     __tablename__ = 'administrators'
-    user_id = Column(String, primary_key=True)
+    user_id = Column(Key, primary_key=True)
     email = Column(String, unique=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     name = Column(String, nullable=False)
 
 class Instructor(Base):
     __tablename__ = 'instructors'
-    user_id = Column(String, primary_key=True)
+    user_id = Column(Key, primary_key=True)
     email = Column(String, unique=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     name = Column(String, nullable=False)
     specialization = Column(String, nullable=False)
     phone = Column(String, nullable=False)
-    schedule_id = Column(String, ForeignKey('schedules.schedule_id'))
+    schedule_id = Column(Key, ForeignKey('schedules.schedule_id'))
 
     schedule = relationship("Schedule", foreign_keys=[schedule_id])
 
 class Client(Base):
     __tablename__ = 'clients'
-    user_id = Column(String, primary_key=True)
+    user_id = Column(Key, primary_key=True)
     email = Column(String, unique=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     name = Column(String, nullable=False)
     age = Column(Integer)
-    guardian_id = Column(String, ForeignKey('clients.user_id'))
-    schedule_id = Column(String, ForeignKey('schedules.schedule_id'))
+    guardian_id = Column(Key, ForeignKey('clients.user_id'))
+    schedule_id = Column(Key, ForeignKey('schedules.schedule_id'))
 
     schedule = relationship("Schedule", foreign_keys=[schedule_id])
 
 class Booking(Base):
     __tablename__ = 'bookings'
-    booking_id = Column(String, primary_key=True)
-    booked_by_client_id = Column(String, ForeignKey('clients.user_id'))
-    public_offering_id = Column(String, ForeignKey('public_offerings.public_offering_id'))
-    booked_for_client_id = Column(String, ForeignKey('clients.user_id'))
+    booking_id = Column(Key, primary_key=True)
+    booked_by_client_id = Column(Key, ForeignKey('clients.user_id'))
+    public_offering_id = Column(Key, ForeignKey('public_offerings.public_offering_id'))
+    booked_for_client_id = Column(Key, ForeignKey('clients.user_id'))
 
     public_offering = relationship("PublicOffering", back_populates="bookings")
     booked_by_client = relationship("Client", foreign_keys=[booked_by_client_id])
     booked_for_client = relationship("Client", foreign_keys=[booked_for_client_id])
 
+    __table_args__ = (
+        # Per-client listings are paged by booking_id, so the key rides along in the index.
+        Index('ix_bookings_booked_for_client_id', 'booked_for_client_id', 'booking_id'),
+        Index('ix_bookings_booked_by_client_id', 'booked_by_client_id', 'booking_id'),
+        Index('ix_bookings_public_offering_id', 'public_offering_id'),
+    )
+
 class Schedule(Base):
     __tablename__ = 'schedules'
-    schedule_id = Column(String, primary_key=True)
-    schedule_owner_id = Column(String, nullable=False)
+    schedule_id = Column(Key, primary_key=True)
+    schedule_owner_id = Column(Key, nullable=False)
     schedule_owner_type = Column(String, nullable=False)
 
     time_slots = relationship("TimeSlot", back_populates="schedule", cascade="all, delete-orphan")
+    availability = relationship("ScheduleDay", back_populates="schedule", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index('ix_schedules_schedule_owner_id', 'schedule_owner_id', 'schedule_id'),
+    )
 
 class TimeSlot(Base):
     __tablename__ = 'time_slots'
-    schedule_id = Column(String, ForeignKey('schedules.schedule_id'), primary_key=True)
+    schedule_id = Column(Key, ForeignKey('schedules.schedule_id'), primary_key=True)
     start_time = Column(DateTime, primary_key=True)
     end_time = Column(DateTime, nullable=False)
     is_reserved = Column(Boolean, default=False)
 
     schedule = relationship("Schedule", back_populates="time_slots")
 
+class ScheduleDay(Base):
+    # One day of a schedule as a bit string: character i is the 30-minute slot
+    # starting i * 30 minutes after midnight, '1' when reserved. See Availability.
+    __tablename__ = 'schedule_availability'
+    schedule_id = Column(Key, ForeignKey('schedules.schedule_id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    reserved = Column(BIT(48), nullable=False)
+
+    schedule = relationship("Schedule", back_populates="availability")
+
 class Offering(Base):
     __tablename__ = 'offerings'
-    offering_id = Column(String, primary_key=True)
-    instructor_id = Column(String, ForeignKey('instructors.user_id'))
+    offering_id = Column(Key, primary_key=True)
+    instructor_id = Column(Key, ForeignKey('instructors.user_id'), index=True)
     lesson_type = Column(String, nullable=False)
     mode = Column(String, nullable=False)
     capacity = Column(Integer, nullable=False)
 
     public_offerings = relationship("PublicOffering", back_populates="offering")
 
+    __table_args__ = (
+        Index('ix_offerings_lesson_type_mode', 'lesson_type', 'mode'),
+    )
+
 class PublicOffering(Base):
     __tablename__ = 'public_offerings'
-    public_offering_id = Column(String, primary_key=True)
-    offering_id = Column(String, ForeignKey('offerings.offering_id'))
+    public_offering_id = Column(Key, primary_key=True)
+    offering_id = Column(Key, ForeignKey('offerings.offering_id'), index=True)
+    branch_id = Column(Key, ForeignKey('branches.location_id'))
+    start_time = Column(DateTime)
+    end_time = Column(DateTime)
     max_clients = Column(Integer, nullable=False)
+    seats_taken = Column(Integer, nullable=False, default=0)
 
     offering = relationship("Offering", back_populates="public_offerings")
+    branch = relationship("Branch")
     bookings = relationship("Booking", back_populates="public_offering")
 
+    __table_args__ = (
+        # Search results are ordered by (start_time, public_offering_id) for keyset paging.
+        Index('ix_public_offerings_start_time', 'start_time', 'public_offering_id'),
+        Index('ix_public_offerings_branch_start_time', 'branch_id', 'start_time'),
+    )
+
 class Province(Base):
     __tablename__ = 'provinces'
-    location_id = Column(String, primary_key=True)
+    location_id = Column(Key, primary_key=True)
     name = Column(String, unique=True, nullable=False)
 
     cities = relationship("City", back_populates="province", cascade="all, delete-orphan")
 
 class City(Base):
     __tablename__ = 'cities'
-    location_id = Column(String, primary_key=True)
+    location_id = Column(Key, primary_key=True)
     name = Column(String, unique=True, nullable=False)
-    parent_location_id = Column(String, ForeignKey('provinces.location_id'))
+    parent_location_id = Column(Key, ForeignKey('provinces.location_id'), index=True)
 
     province = relationship("Province", back_populates="cities")
     branches = relationship("Branch", back_populates="city", cascade="all, delete-orphan")
 
 class Branch(Base):
     __tablename__ = 'branches'
-    location_id = Column(String, primary_key=True)
+    location_id = Column(Key, primary_key=True)
     name = Column(String, nullable=False)
-    schedule_id = Column(String, ForeignKey('schedules.schedule_id'))
-    parent_location_id = Column(String, ForeignKey('cities.location_id'))
+    schedule_id = Column(Key, ForeignKey('schedules.schedule_id'))
+    parent_location_id = Column(Key, ForeignKey('cities.location_id'), index=True)
 
     city = relationship("City", back_populates="branches")
     schedule = relationship("Schedule")
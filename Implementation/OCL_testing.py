@@ -1,27 +1,30 @@
 from datetime import datetime, timedelta
-from Models import Client, Instructor, Branch, Offering, Booking
+from Models import Client, Instructor, Branch, City, Offering, PublicOffering, Booking
+from Constraints import ConstraintValidator, Interval, find_overlaps
 
 class OCLTests:
     @staticmethod
     def unique_offering_per_location():
         """Ensure offerings are unique per location and time slot."""
         # Hardcoded example data
-        branch1 = Branch(location_id="1", name="Branch 1", city="City A")
-        branch2 = Branch(location_id="2", name="Branch 2", city="City B")
-        offering1 = Offering(offering_id="1", location=branch1, start_time=datetime(2023, 12, 1, 10, 0), end_time=datetime(2023, 12, 1, 11, 0))
-        offering2 = Offering(offering_id="2", location=branch1, start_time=datetime(2023, 12, 1, 10, 30), end_time=datetime(2023, 12, 1, 11, 30))
-        offering3 = Offering(offering_id="3", location=branch2, start_time=datetime(2023, 12, 1, 10, 0), end_time=datetime(2023, 12, 1, 11, 0))
+        branch1 = Branch(location_id="1", name="Branch 1", city=City(location_id="A", name="City A"))
+        branch2 = Branch(location_id="2", name="Branch 2", city=City(location_id="B", name="City B"))
+        offering1 = PublicOffering(public_offering_id="1", branch=branch1, start_time=datetime(2023, 12, 1, 10, 0), end_time=datetime(2023, 12, 1, 11, 0))
+        offering2 = PublicOffering(public_offering_id="2", branch=branch1, start_time=datetime(2023, 12, 1, 10, 30), end_time=datetime(2023, 12, 1, 11, 30))
+        offering3 = PublicOffering(public_offering_id="3", branch=branch2, start_time=datetime(2023, 12, 1, 10, 0), end_time=datetime(2023, 12, 1, 11, 0))
         
         offerings = [offering1, offering2, offering3]
 
         # OCL Test
-        for i, o1 in enumerate(offerings):
-            for o2 in offerings[i+1:]:
-                if o1.location == o2.location and not (o1.end_time <= o2.start_time or o2.end_time <= o1.start_time):
-                    print(f"Failed: Offering conflict at location {o1.location.name} and time slot {o1.start_time} - {o1.end_time}")
-                    return False
-        print("Passed: All offerings have unique locations per time slot.")
-        return True
+        passed = True
+        for branch in dict.fromkeys(offering.branch for offering in offerings):
+            intervals = [Interval(o, o.start_time, o.end_time) for o in offerings if o.branch is branch]
+            for o1, _ in find_overlaps(intervals):
+                print(f"Failed: Offering conflict at location {branch.name} and time slot {o1.start} - {o1.end}")
+                passed = False
+        if passed:
+            print("Passed: All offerings have unique locations per time slot.")
+        return passed
 
     @staticmethod
     def underage_must_have_adult_guardian():
@@ -66,19 +69,36 @@ class OCLTests:
         """Ensure clients do not have multiple bookings on the same day and time slot."""
         # Hardcoded example data
         client = Client(user_id="1", name="Client A")
-        booking1 = Booking(booking_id="1", client=client, public_offering=Offering(start_time=datetime(2023, 12, 1, 10, 0), end_time=datetime(2023, 12, 1, 11, 0)))
-        booking2 = Booking(booking_id="2", client=client, public_offering=Offering(start_time=datetime(2023, 12, 1, 10, 30), end_time=datetime(2023, 12, 1, 11, 30)))
+        booking1 = Booking(booking_id="1", booked_for_client=client, public_offering=PublicOffering(start_time=datetime(2023, 12, 1, 10, 0), end_time=datetime(2023, 12, 1, 11, 0)))
+        booking2 = Booking(booking_id="2", booked_for_client=client, public_offering=PublicOffering(start_time=datetime(2023, 12, 1, 10, 30), end_time=datetime(2023, 12, 1, 11, 30)))
         
-        client.bookings = [booking1, booking2]
+        bookings = [booking1, booking2]
 
         # OCL Test
-        for i, b1 in enumerate(client.bookings):
-            for b2 in client.bookings[i+1:]:
-                if not (b1.public_offering.end_time <= b2.public_offering.start_time or b2.public_offering.end_time <= b1.public_offering.start_time):
-                    print(f"Failed: Client {client.name} has overlapping bookings at {b1.public_offering.start_time} - {b1.public_offering.end_time}")
-                    return False
-        print("Passed: No overlapping bookings for any client.")
-        return True
+        intervals = [Interval(b, b.public_offering.start_time, b.public_offering.end_time) for b in bookings]
+        overlaps = find_overlaps(intervals)
+        for b1, _ in overlaps:
+            print(f"Failed: Client {client.name} has overlapping bookings at {b1.start} - {b1.end}")
+        if not overlaps:
+            print("Passed: No overlapping bookings for any client.")
+        return not overlaps
+
+    @staticmethod
+    def audit_database():
+        """Check both overlap constraints against every branch and client in the database."""
+        results = ConstraintValidator().audit()
+        for violation in results['unique_offering_per_location']:
+            print(f"Failed: Offering conflict at branch {violation.group} between offerings "
+                  f"{violation.first.key} ({violation.first.start} - {violation.first.end}) and "
+                  f"{violation.second.key} ({violation.second.start} - {violation.second.end})")
+        for violation in results['no_overlapping_bookings']:
+            print(f"Failed: Client {violation.group} has overlapping bookings "
+                  f"{violation.first.key} ({violation.first.start} - {violation.first.end}) and "
+                  f"{violation.second.key} ({violation.second.start} - {violation.second.end})")
+        total = sum(len(violations) for violations in results.values())
+        if not total:
+            print("Passed: No overlapping offerings or bookings in the database.")
+        return total == 0
 
     @staticmethod
     def run_ocl_test(test_number):
@@ -95,6 +115,9 @@ class OCLTests:
         elif test_number == '4':
             print("--- Testing No Overlapping Bookings ---")
             return OCLTests.no_overlapping_bookings()
+        elif test_number == '5':
+            print("--- Auditing Offerings and Bookings in Database ---")
+            return OCLTests.audit_database()
         else:
             print("Invalid test number.")
             return False
@@ -106,10 +129,11 @@ class OCLTests:
         print("2. Test Underage Client Guardian")
         print("3. Test Offering City in Instructor Availability")
         print("4. Test No Overlapping Bookings")
-        print("5. Exit OCL Tests")
+        print("5. Audit Offerings and Bookings in Database")
+        print("6. Exit OCL Tests")
         
         choice = input("Select an OCL test to run: ")
-        if choice == '5':
+        if choice == '6':
             return
         OCLTests.run_ocl_test(choice)
         print()
@@ -1,16 +1,28 @@
-from utils import generate_id
+from utils import generate_id, is_valid_id
 from singleton_decorator import singleton
-from sqlalchemy.orm import Session
-from Database import SessionLocal
-from Models import Offering, PublicOffering, Booking  # Assuming Booking is used for associated bookings
+from sqlalchemy import update
+from sqlalchemy.orm import Session, contains_eager
+from Database import SessionBound, current_session
+from Metrics import instrumented
+from Models import Offering, PublicOffering, Booking, Branch  # Assuming Booking is used for associated bookings
+from Location import in_branch_subtree
+from Availability import reserve_range
+from Pagination import keyset_page, DEFAULT_PAGE_SIZE
+from Loading import PUBLIC_OFFERING_WITH_BOOKINGS
+
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
 
 @singleton
-class OfferingCatalog:
+@instrumented
+class OfferingCatalog(SessionBound):
     def __init__(self, session: Session = None):
-        self.session = session or SessionLocal()
+        super().__init__(session)
 
     def create_offering(self, instructor_id, lesson_type, mode, capacity):
         """Creates a new offering and stores it in the database."""
+        if not is_valid_id(instructor_id):
+            raise ValueError("Instructor not found.")
         offering_id = generate_id()
         offering = Offering(
             offering_id=offering_id,
@@ -20,62 +32,165 @@ class OfferingCatalog:
             capacity=capacity
         )
         self.session.add(offering)
-        self.session.commit()
+        self._commit()
         return offering
 
-    def get_offering(self, offering_id):
+    def get_offering(self, offering_id, load=()):
         """Retrieves an offering from the database by ID."""
-        return self.session.query(Offering).filter_by(offering_id=offering_id).first()
+        if not is_valid_id(offering_id):
+            return None
+        return self.session.query(Offering).options(*load).filter_by(offering_id=offering_id).first()
+
+    def get_offerings_by_instructor(self, instructor_id, load=()):
+        """Retrieves every offering an instructor teaches."""
+        if not is_valid_id(instructor_id):
+            return []
+        return self.session.query(Offering).options(*load).filter_by(instructor_id=instructor_id).all()
 
-    def create_public_offering(self, offering_id, max_clients):
+    def create_public_offering(self, offering_id, max_clients, branch_id=None, start_time=None, end_time=None):
         """Creates a new public offering based on an existing offering."""
         offering = self.get_offering(offering_id)
         if not offering:
             raise ValueError("Offering not found.")
+        if branch_id is not None and not is_valid_id(branch_id):
+            raise ValueError("Branch not found.")
 
         public_offering_id = generate_id()
         public_offering = PublicOffering(
             public_offering_id=public_offering_id,
             offering_id=offering_id,
+            branch_id=branch_id,
+            start_time=start_time,
+            end_time=end_time,
             max_clients=max_clients
         )
         self.session.add(public_offering)
-        self.session.commit()
+        self._commit()
         return public_offering
 
-    def get_public_offering(self, public_offering_id):
-        """Retrieves a public offering from the database by ID."""
-        return self.session.query(PublicOffering).filter_by(public_offering_id=public_offering_id).first()
+    def get_public_offering(self, public_offering_id, load=()):
+        """Retrieves a public offering from the database by ID.
 
-    def get_all_public_offerings(self):
+        ``load`` is a loading profile from Loading, e.g. PUBLIC_OFFERING_WITH_BOOKINGS.
+        """
+        if not is_valid_id(public_offering_id):
+            return None
+        return (self.session.query(PublicOffering).options(*load)
+                .filter_by(public_offering_id=public_offering_id).first())
+
+    def get_all_public_offerings(self, load=()):
         """Retrieves all public offerings from the database."""
-        return self.session.query(PublicOffering).all()
+        return self.session.query(PublicOffering).options(*load).all()
+
+    def get_public_offerings_page(self, page_size=DEFAULT_PAGE_SIZE, token=None, load=()):
+        """Retrieves one page of public offerings and the token for the next page."""
+        return keyset_page(self.session.query(PublicOffering).options(*load),
+                           [PublicOffering.public_offering_id], token, page_size)
+
+    def get_public_offerings_in_location(self, location_id, load=()):
+        """Retrieves every public offering held at or below a province, city or branch."""
+        if not is_valid_id(location_id):
+            return []
+        return (
+            self.session.query(PublicOffering)
+            .options(*load)
+            .filter(in_branch_subtree(PublicOffering.branch_id, location_id))
+            .order_by(PublicOffering.start_time)
+            .all()
+        )
+
+    def search_public_offerings(self, city_id=None, branch_id=None, lesson_type=None, mode=None,
+                                instructor_id=None, start=None, end=None, min_seats=1,
+                                page_size=SEARCH_PAGE_SIZE, token=None, load=()):
+        """Search public offerings, ordered by start time, one page at a time.
 
-class PublicOfferingService:
+        Every filter is optional. ``start``/``end`` keep offerings starting in
+        [start, end); ``min_seats`` keeps offerings with at least that many
+        free seats. Returns ``(offerings, next_token)``; pass ``next_token``
+        back as ``token`` to fetch the following page. It is None on the last page.
+        The offering is always loaded; ``load`` adds further relationships.
+        """
+        if any(key is not None and not is_valid_id(key) for key in (city_id, branch_id, instructor_id)):
+            return [], None
+        query = (
+            self.session.query(PublicOffering)
+            .join(PublicOffering.offering)
+            .options(contains_eager(PublicOffering.offering), *load)
+            .filter(PublicOffering.start_time.isnot(None))
+        )
+        if branch_id is not None:
+            query = query.filter(PublicOffering.branch_id == branch_id)
+        if city_id is not None:
+            query = (query.join(Branch, PublicOffering.branch_id == Branch.location_id)
+                     .filter(Branch.parent_location_id == city_id))
+        if lesson_type is not None:
+            query = query.filter(Offering.lesson_type == lesson_type)
+        if mode is not None:
+            query = query.filter(Offering.mode == mode)
+        if instructor_id is not None:
+            query = query.filter(Offering.instructor_id == instructor_id)
+        if start is not None:
+            query = query.filter(PublicOffering.start_time >= start)
+        if end is not None:
+            query = query.filter(PublicOffering.start_time < end)
+        if min_seats:
+            query = query.filter(PublicOffering.max_clients - PublicOffering.seats_taken >= min_seats)
+        return keyset_page(query, [PublicOffering.start_time, PublicOffering.public_offering_id],
+                           token, page_size, max_page_size=MAX_SEARCH_PAGE_SIZE)
+
+class PublicOfferingService(SessionBound):
     def __init__(self, public_offering_id, session=None):
-        self.session = session or SessionLocal()
-        self.public_offering = self.session.query(PublicOffering).filter_by(public_offering_id=public_offering_id).first()
+        super().__init__(session or current_session())
+        if not is_valid_id(public_offering_id):
+            raise ValueError("Public offering not found.")
+        self.public_offering = (
+            self.session.query(PublicOffering)
+            .options(*PUBLIC_OFFERING_WITH_BOOKINGS)
+            .filter_by(public_offering_id=public_offering_id)
+            .first()
+        )
 
     def add_booking(self, booking_id):
         """Add a booking to the public offering."""
+        if not is_valid_id(booking_id):
+            return
         booking = self.session.query(Booking).filter_by(booking_id=booking_id).first()
         if booking and booking.public_offering_id == self.public_offering.public_offering_id:
             self.public_offering.bookings.append(booking)
-            self.session.commit()
+            self._commit()
 
     def reserve_timeslot(self, timeslot):
-        """Reserve a time slot for this offering."""
+        """Reserve a time slot for this offering, in time_slots and in the schedule's availability masks."""
         if timeslot.is_reserved:
             raise ValueError("Time slot already reserved.")
+        if not reserve_range(self.session, timeslot.schedule_id, timeslot.start_time, timeslot.end_time):
+            self._rollback()
+            raise ValueError("Time slot already reserved.")
         timeslot.is_reserved = True
         timeslot.reserved_by_public_offering_id = self.public_offering.public_offering_id
-        self.session.commit()
+        self._commit()
 
     def get_client_ids(self):
         """Get all client IDs associated with this public offering."""
         return [booking.booked_for_client_id for booking in self.public_offering.bookings]
 
     def adjust_capacity(self, amount):
-        """Adjust the capacity of the public offering."""
-        self.public_offering.max_clients += amount
-        self.session.commit()
+        """Adjust the capacity of the public offering.
+
+        The capacity can never drop below the seats already taken; the check
+        and the change happen in one conditional UPDATE so concurrent bookings
+        cannot slip past it.
+        """
+        result = self.session.execute(
+            update(PublicOffering)
+            .where(
+                PublicOffering.public_offering_id == self.public_offering.public_offering_id,
+                PublicOffering.max_clients + amount >= PublicOffering.seats_taken,
+            )
+            .values(max_clients=PublicOffering.max_clients + amount)
+            .execution_options(synchronize_session='fetch')
+        )
+        if result.rowcount != 1:
+            self._rollback()
+            raise ValueError("Capacity cannot drop below the seats already taken.")
+        self._commit()
@@ -0,0 +1,67 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+class InvalidPageToken(ValueError):
+    """Raised when a continuation token cannot be decoded."""
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+def _decode_value(value):
+    """Decode one key value; raises TypeError or ValueError on anything encode_token cannot produce."""
+    if isinstance(value, dict):
+        if set(value) != {'dt'}:
+            raise ValueError(f"Unexpected key value {value!r}.")
+        return datetime.fromisoformat(value['dt'])
+    if value is not None and not isinstance(value, (str, int, float)):
+        raise TypeError(f"Unexpected key value {value!r}.")
+    return value
+
+def encode_token(values) -> str:
+    """Pack the sort key of the last row on a page into an opaque URL-safe token."""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_token(token: str, length: int = None) -> list:
+    """Unpack a token made by encode_token; with ``length``, the key must have that many values.
+
+    Anything else, including well-formed JSON of the wrong shape, raises InvalidPageToken.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(values, list) or (length is not None and len(values) != length):
+            raise ValueError("Not a key of the expected length.")
+        return [_decode_value(v) for v in values]
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+        raise InvalidPageToken(f"Invalid page token: {token!r}") from e
+
+def keyset_page(query, order_by, token=None, page_size=DEFAULT_PAGE_SIZE, max_page_size=MAX_PAGE_SIZE):
+    """Return one page of ``query`` and the token for the next one.
+
+    ``order_by`` lists the mapped columns that define the order; together they
+    must be unique and non-null (end with the primary key). Rather than using
+    OFFSET, each page resumes strictly after the previous page's last key, so
+    the cost per page stays constant however deep the caller pages. Returns
+    ``(rows, next_token)``; ``next_token`` is None on the last page.
+    """
+    page_size = max(1, min(page_size, max_page_size))
+    if token is not None:
+        key = decode_token(token, len(order_by))
+        query = query.filter(tuple_(*order_by) > tuple_(*key))
+
+    # Fetch one extra row to learn whether another page follows.
+    rows = query.order_by(*order_by).limit(page_size + 1).all()
+    page = rows[:page_size]
+    next_token = None
+    if len(rows) > page_size:
+        next_token = encode_token([getattr(page[-1], column.key) for column in order_by])
+    return page, next_token
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+THREAD = 'thread'    # bcrypt releases the GIL, so threads already hash in parallel
+PROCESS = 'process'  # isolates hashing from the serving process entirely
+DEFAULT_ROUNDS = 12
+
+def _hash(password: bytes, rounds: int) -> bytes:
+    import bcrypt
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+def _check(password: bytes, hashed: bytes) -> bool:
+    import bcrypt
+    return bcrypt.checkpw(password, hashed)
+
+def _as_bytes(value) -> bytes:
+    return value.encode('utf-8') if isinstance(value, str) else value
+
+class PasswordHasher:
+    """Runs bcrypt hashing and verification on a bounded worker pool.
+
+    ``max_workers`` hashes run at once; at most ``max_concurrent`` may be in
+    flight (running or queued) before submit_* calls wait for a free slot, so
+    a registration burst cannot pile up unbounded work.
+    """
+
+    def __init__(self, mode=THREAD, max_workers=None, max_concurrent=None, rounds=DEFAULT_ROUNDS):
+        if mode not in (THREAD, PROCESS):
+            raise ValueError(f"Unknown hashing mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_concurrent = max_concurrent or self.max_workers * 4
+        self.rounds = rounds
+        executor_class = ThreadPoolExecutor if mode == THREAD else ProcessPoolExecutor
+        self._executor = executor_class(max_workers=self.max_workers)
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+
+    def _submit(self, fn, *args):
+        """Submit work for a slot the caller has already acquired."""
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def submit_hash(self, password):
+        """Queue a hash and return a Future resolving to the bcrypt hash bytes."""
+        self._slots.acquire()
+        return self._submit(_hash, _as_bytes(password), self.rounds)
+
+    def submit_check(self, password, hashed):
+        """Queue a verification and return a Future resolving to True or False."""
+        self._slots.acquire()
+        return self._submit(_check, _as_bytes(password), _as_bytes(hashed))
+
+    def hash(self, password) -> bytes:
+        return self.submit_hash(password).result()
+
+    def check(self, password, hashed) -> bool:
+        return self.submit_check(password, hashed).result()
+
+    def hash_many(self, passwords):
+        """Hash a batch of passwords in parallel, preserving order."""
+        futures = [self.submit_hash(password) for password in passwords]
+        return [future.result() for future in futures]
+
+    async def _acquire_async(self):
+        # Waiting for a slot must not block the event loop.
+        if self._slots.acquire(blocking=False):
+            return
+        waiter = asyncio.ensure_future(asyncio.to_thread(self._slots.acquire))
+        try:
+            await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            # The waiting thread cannot be stopped and still takes the slot,
+            # so hand it back as soon as it does.
+            waiter.add_done_callback(lambda _: self._slots.release())
+            raise
+
+    async def hash_async(self, password) -> bytes:
+        await self._acquire_async()
+        return await asyncio.wrap_future(self._submit(_hash, _as_bytes(password), self.rounds))
+
+    async def check_async(self, password, hashed) -> bool:
+        await self._acquire_async()
+        return await asyncio.wrap_future(self._submit(_check, _as_bytes(password), _as_bytes(hashed)))
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+_default_hasher = None
+_default_lock = threading.Lock()
+
+def configure_hasher(**kwargs) -> PasswordHasher:
+    """Replace the process-wide hasher, e.g. configure_hasher(mode='process', max_workers=8)."""
+    global _default_hasher
+    with _default_lock:
+        previous, _default_hasher = _default_hasher, PasswordHasher(**kwargs)
+    if previous:
+        previous.shutdown(wait=False)
+    return _default_hasher
+
+def get_hasher() -> PasswordHasher:
+    """Return the process-wide hasher, creating a thread-pool one on first use."""
+    global _default_hasher
+    with _default_lock:
+        if _default_hasher is None:
+            _default_hasher = PasswordHasher()
+        return _default_hasher
@@ -1,22 +1,23 @@
 -- DROP EXISTING TABLES (if any) for a clean setup
-DROP TABLE IF EXISTS time_slots, schedules, bookings, public_offerings, offerings, branches, cities, provinces, administrators, instructors, clients, audit_logs CASCADE;
+DROP TABLE IF EXISTS schedule_availability, time_slots, schedules, bookings, public_offerings, offerings, branches, cities, provinces, administrators, instructors, clients, audit_logs CASCADE;
 
 -- Provinces table (no dependencies)
 CREATE TABLE provinces (
-    location_id CHAR(36) PRIMARY KEY,
+    location_id UUID PRIMARY KEY,
     name VARCHAR(255) UNIQUE NOT NULL
 );
 
 -- Cities table (depends on Provinces)
 CREATE TABLE cities (
-    location_id CHAR(36) PRIMARY KEY,
+    location_id UUID PRIMARY KEY,
     name VARCHAR(255) UNIQUE NOT NULL,
-    parent_location_id CHAR(36) REFERENCES provinces(location_id)
+    parent_location_id UUID REFERENCES provinces(location_id)
 );
+CREATE INDEX ix_cities_parent_location_id ON cities (parent_location_id);
 
 -- Administrators table (no dependencies)
 CREATE TABLE administrators (
-    user_id CHAR(36) PRIMARY KEY,
+    user_id UUID PRIMARY KEY,
     email VARCHAR(255) UNIQUE NOT NULL,
     hashed_password VARCHAR(255) NOT NULL,
     name VARCHAR(255) NOT NULL
@@ -24,73 +25,115 @@ CREATE TABLE administrators (
 
 -- Schedules table (no dependencies)
 CREATE TABLE schedules (
-    schedule_id CHAR(36) PRIMARY KEY,
-    schedule_owner_id CHAR(36) NOT NULL,
+    schedule_id UUID PRIMARY KEY,
+    schedule_owner_id UUID NOT NULL,
     schedule_owner_type VARCHAR(50) NOT NULL
 );
+CREATE INDEX ix_schedules_schedule_owner_id ON schedules (schedule_owner_id, schedule_id);
 
 -- Instructors table (references Schedules)
 CREATE TABLE instructors (
-    user_id CHAR(36) PRIMARY KEY,
+    user_id UUID PRIMARY KEY,
     email VARCHAR(255) UNIQUE NOT NULL,
     hashed_password VARCHAR(255) NOT NULL,
     name VARCHAR(255) NOT NULL,
     specialization VARCHAR(255),
     phone VARCHAR(20),
-    schedule_id CHAR(36),
+    schedule_id UUID,
     FOREIGN KEY (schedule_id) REFERENCES schedules (schedule_id)
 );
 
 -- Clients table (references Schedules and self-referencing for guardian_id)
 CREATE TABLE clients (
-    user_id CHAR(36) PRIMARY KEY,
+    user_id UUID PRIMARY KEY,
     email VARCHAR(255) UNIQUE NOT NULL,
     hashed_password VARCHAR(255) NOT NULL,
     name VARCHAR(255) NOT NULL,
     age INT,
-    guardian_id CHAR(36),
-    schedule_id CHAR(36),
+    guardian_id UUID,
+    schedule_id UUID,
     FOREIGN KEY (guardian_id) REFERENCES clients (user_id),
     FOREIGN KEY (schedule_id) REFERENCES schedules (schedule_id)
 );
 
 -- Branches table (depends on Cities and Schedules)
 CREATE TABLE branches (
-    location_id CHAR(36) PRIMARY KEY,
+    location_id UUID PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
-    schedule_id CHAR(36) REFERENCES schedules(schedule_id),
-    parent_location_id CHAR(36) REFERENCES cities(location_id)
+    schedule_id UUID REFERENCES schedules(schedule_id),
+    parent_location_id UUID REFERENCES cities(location_id)
 );
+CREATE INDEX ix_branches_parent_location_id ON branches (parent_location_id);
 
 -- TimeSlots table (depends on Schedules)
 CREATE TABLE time_slots (
-    schedule_id CHAR(36) NOT NULL REFERENCES schedules(schedule_id),
+    schedule_id UUID NOT NULL REFERENCES schedules(schedule_id),
     start_time TIMESTAMP NOT NULL,
     end_time TIMESTAMP NOT NULL,
     is_reserved BOOLEAN DEFAULT FALSE,
     PRIMARY KEY (schedule_id, start_time)
 );
 
+-- Reserved slots per schedule per day (depends on Schedules): character i of
+-- reserved is the 30-minute slot starting i * 30 minutes after midnight, 1 when
+-- reserved. Every day with time slots has a row; a missing day has no slots,
+-- so nothing on it is free. See Availability.py.
+CREATE TABLE schedule_availability (
+    schedule_id UUID NOT NULL REFERENCES schedules(schedule_id),
+    day DATE NOT NULL,
+    reserved BIT(48) NOT NULL,
+    PRIMARY KEY (schedule_id, day)
+);
+
 -- Offerings table (depends on Instructors)
 CREATE TABLE offerings (
-    offering_id CHAR(36) PRIMARY KEY,
-    instructor_id CHAR(36) REFERENCES instructors(user_id),
+    offering_id UUID PRIMARY KEY,
+    instructor_id UUID REFERENCES instructors(user_id),
     lesson_type VARCHAR(255) NOT NULL,
     mode VARCHAR(50) NOT NULL,
     capacity INT NOT NULL
 );
+CREATE INDEX ix_offerings_instructor_id ON offerings (instructor_id);
+CREATE INDEX ix_offerings_lesson_type_mode ON offerings (lesson_type, mode);
 
 -- PublicOfferings table (depends on Offerings)
 CREATE TABLE public_offerings (
-    public_offering_id CHAR(36) PRIMARY KEY,
-    offering_id CHAR(36) REFERENCES offerings(offering_id),
-    max_clients INT NOT NULL
+    public_offering_id UUID PRIMARY KEY,
+    offering_id UUID REFERENCES offerings(offering_id),
+    branch_id UUID REFERENCES branches(location_id),
+    start_time TIMESTAMP,
+    end_time TIMESTAMP,
+    max_clients INT NOT NULL,
+    seats_taken INT NOT NULL DEFAULT 0,  -- kept in step with bookings by BookingCatalog
+    CHECK (end_time > start_time),
+    CHECK (seats_taken >= 0 AND seats_taken <= max_clients)
 );
+CREATE INDEX ix_public_offerings_offering_id ON public_offerings (offering_id);
+-- Search results are ordered by (start_time, public_offering_id) for keyset paging
+CREATE INDEX ix_public_offerings_start_time ON public_offerings (start_time, public_offering_id);
+CREATE INDEX ix_public_offerings_branch_start_time ON public_offerings (branch_id, start_time);
 
 -- Bookings table (depends on Clients and PublicOfferings)
 CREATE TABLE bookings (
-    booking_id CHAR(36) PRIMARY KEY,
-    booked_by_client_id CHAR(36) REFERENCES clients(user_id),
-    public_offering_id CHAR(36) REFERENCES public_offerings(public_offering_id),
-    booked_for_client_id CHAR(36) REFERENCES clients(user_id)
+    booking_id UUID PRIMARY KEY,
+    booked_by_client_id UUID REFERENCES clients(user_id),
+    public_offering_id UUID REFERENCES public_offerings(public_offering_id),
+    booked_for_client_id UUID REFERENCES clients(user_id)
+);
+-- Per-client listings are paged by booking_id, so the key rides along in the index
+CREATE INDEX ix_bookings_booked_for_client_id ON bookings (booked_for_client_id, booking_id);
+CREATE INDEX ix_bookings_booked_by_client_id ON bookings (booked_by_client_id, booking_id);
+CREATE INDEX ix_bookings_public_offering_id ON bookings (public_offering_id);
+
+-- Audit log (written by Admins, Instructors and Clients through Audit.AuditLogWriter)
+CREATE TABLE audit_logs (
+    log_id UUID PRIMARY KEY,
+    timestamp TIMESTAMP NOT NULL,
+    table_name VARCHAR(255) NOT NULL,
+    actor_id UUID,
+    action_type VARCHAR(50) NOT NULL,
+    target_table VARCHAR(255) NOT NULL,
+    record_id UUID,
+    old_value JSONB,
+    new_value JSONB
 );
@@ -0,0 +1,13 @@
+-- Where and when a public offering takes place, for databases created from an
+-- older DDL-342-project.sql (new databases already have these columns).
+-- Apply with: python postgres_setup.py migrate
+-- Existing public offerings keep NULL times and branch until they are scheduled.
+
+ALTER TABLE public_offerings
+    ADD COLUMN IF NOT EXISTS branch_id CHAR(36) REFERENCES branches (location_id),
+    ADD COLUMN IF NOT EXISTS start_time TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS end_time TIMESTAMP;
+
+-- Same name PostgreSQL gives the unnamed check in DDL-342-project.sql.
+ALTER TABLE public_offerings DROP CONSTRAINT IF EXISTS public_offerings_check;
+ALTER TABLE public_offerings ADD CONSTRAINT public_offerings_check CHECK (end_time > start_time);
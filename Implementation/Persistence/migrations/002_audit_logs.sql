@@ -0,0 +1,16 @@
+-- The audit log written through Audit.AuditLogWriter, for databases created from
+-- an older DDL-342-project.sql that has no audit_logs table.
+-- Apply with: python postgres_setup.py migrate
+-- Ids start out as CHAR(36) like every other key; 005_native_uuid_keys.sql converts them.
+
+CREATE TABLE IF NOT EXISTS audit_logs (
+    log_id CHAR(36) PRIMARY KEY,
+    timestamp TIMESTAMP NOT NULL,
+    table_name VARCHAR(255) NOT NULL,
+    actor_id CHAR(36),
+    action_type VARCHAR(50) NOT NULL,
+    target_table VARCHAR(255) NOT NULL,
+    record_id CHAR(36),
+    old_value JSONB,
+    new_value JSONB
+);
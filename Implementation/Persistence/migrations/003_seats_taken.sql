@@ -0,0 +1,20 @@
+-- The seat counter BookingCatalog keeps in step with bookings, for databases
+-- created from an older DDL-342-project.sql. Apply with: python postgres_setup.py migrate
+-- Existing offerings start from their current number of bookings, not from 0.
+
+ALTER TABLE public_offerings ADD COLUMN IF NOT EXISTS seats_taken INT NOT NULL DEFAULT 0;
+
+UPDATE public_offerings po
+SET seats_taken = counts.booked
+FROM (
+    SELECT public_offering_id, count(*) AS booked
+    FROM bookings
+    GROUP BY public_offering_id
+) counts
+WHERE counts.public_offering_id = po.public_offering_id;
+
+-- NOT VALID: offerings that are already overbooked keep their bookings, but no
+-- new booking can take them (or any other offering) past max_clients.
+ALTER TABLE public_offerings DROP CONSTRAINT IF EXISTS public_offerings_check1;
+ALTER TABLE public_offerings
+    ADD CONSTRAINT public_offerings_check1 CHECK (seats_taken >= 0 AND seats_taken <= max_clients) NOT VALID;
@@ -0,0 +1,26 @@
+-- Secondary indexes for the catalog access paths, for databases created from an
+-- older DDL-342-project.sql (new databases already have them).
+-- CONCURRENTLY keeps the tables writable while the indexes build, so this file
+-- runs outside a transaction, one statement at a time: python postgres_setup.py migrate
+-- migrate: no-transaction
+
+-- Location hierarchy: LocationCatalog.get_cities_in_province / get_branches_*
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cities_parent_location_id ON cities (parent_location_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_branches_parent_location_id ON branches (parent_location_id);
+
+-- ScheduleCatalog.get_schedules_by_owner(_page)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_schedules_schedule_owner_id ON schedules (schedule_owner_id, schedule_id);
+
+-- Instructor.get_public_offerings / get_bookings and search by instructor or lesson
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_offerings_instructor_id ON offerings (instructor_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_offerings_lesson_type_mode ON offerings (lesson_type, mode);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_public_offerings_offering_id ON public_offerings (offering_id);
+
+-- OfferingCatalog.search_public_offerings, ordered by (start_time, public_offering_id)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_public_offerings_start_time ON public_offerings (start_time, public_offering_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_public_offerings_branch_start_time ON public_offerings (branch_id, start_time);
+
+-- BookingCatalog listings (paged by booking_id) and bookings of one public offering
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bookings_booked_for_client_id ON bookings (booked_for_client_id, booking_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bookings_booked_by_client_id ON bookings (booked_by_client_id, booking_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bookings_public_offering_id ON bookings (public_offering_id);
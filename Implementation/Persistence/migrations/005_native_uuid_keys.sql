@@ -0,0 +1,78 @@
+-- Store every key as a native 16-byte uuid instead of a 36-character string, for
+-- databases created from an older DDL-342-project.sql (new databases already are).
+-- Each ALTER rewrites its table and rebuilds its indexes under an exclusive lock,
+-- so run it in a maintenance window: python postgres_setup.py migrate
+-- Existing ids keep their values; ids created from now on are time-ordered (utils.generate_id).
+
+-- Foreign keys must match the type of the key they reference, so drop them first.
+ALTER TABLE cities DROP CONSTRAINT IF EXISTS cities_parent_location_id_fkey;
+ALTER TABLE instructors DROP CONSTRAINT IF EXISTS instructors_schedule_id_fkey;
+ALTER TABLE clients DROP CONSTRAINT IF EXISTS clients_guardian_id_fkey;
+ALTER TABLE clients DROP CONSTRAINT IF EXISTS clients_schedule_id_fkey;
+ALTER TABLE branches DROP CONSTRAINT IF EXISTS branches_schedule_id_fkey;
+ALTER TABLE branches DROP CONSTRAINT IF EXISTS branches_parent_location_id_fkey;
+ALTER TABLE time_slots DROP CONSTRAINT IF EXISTS time_slots_schedule_id_fkey;
+ALTER TABLE offerings DROP CONSTRAINT IF EXISTS offerings_instructor_id_fkey;
+ALTER TABLE public_offerings DROP CONSTRAINT IF EXISTS public_offerings_offering_id_fkey;
+ALTER TABLE public_offerings DROP CONSTRAINT IF EXISTS public_offerings_branch_id_fkey;
+ALTER TABLE bookings DROP CONSTRAINT IF EXISTS bookings_booked_by_client_id_fkey;
+ALTER TABLE bookings DROP CONSTRAINT IF EXISTS bookings_public_offering_id_fkey;
+ALTER TABLE bookings DROP CONSTRAINT IF EXISTS bookings_booked_for_client_id_fkey;
+
+-- CHAR(36) pads with blanks; going through text strips them before the cast.
+ALTER TABLE provinces
+    ALTER COLUMN location_id TYPE uuid USING location_id::text::uuid;
+ALTER TABLE cities
+    ALTER COLUMN location_id TYPE uuid USING location_id::text::uuid,
+    ALTER COLUMN parent_location_id TYPE uuid USING parent_location_id::text::uuid;
+ALTER TABLE administrators
+    ALTER COLUMN user_id TYPE uuid USING user_id::text::uuid;
+ALTER TABLE schedules
+    ALTER COLUMN schedule_id TYPE uuid USING schedule_id::text::uuid,
+    ALTER COLUMN schedule_owner_id TYPE uuid USING schedule_owner_id::text::uuid;
+ALTER TABLE instructors
+    ALTER COLUMN user_id TYPE uuid USING user_id::text::uuid,
+    ALTER COLUMN schedule_id TYPE uuid USING schedule_id::text::uuid;
+ALTER TABLE clients
+    ALTER COLUMN user_id TYPE uuid USING user_id::text::uuid,
+    ALTER COLUMN guardian_id TYPE uuid USING guardian_id::text::uuid,
+    ALTER COLUMN schedule_id TYPE uuid USING schedule_id::text::uuid;
+ALTER TABLE branches
+    ALTER COLUMN location_id TYPE uuid USING location_id::text::uuid,
+    ALTER COLUMN schedule_id TYPE uuid USING schedule_id::text::uuid,
+    ALTER COLUMN parent_location_id TYPE uuid USING parent_location_id::text::uuid;
+ALTER TABLE time_slots
+    ALTER COLUMN schedule_id TYPE uuid USING schedule_id::text::uuid;
+ALTER TABLE offerings
+    ALTER COLUMN offering_id TYPE uuid USING offering_id::text::uuid,
+    ALTER COLUMN instructor_id TYPE uuid USING instructor_id::text::uuid;
+ALTER TABLE public_offerings
+    ALTER COLUMN public_offering_id TYPE uuid USING public_offering_id::text::uuid,
+    ALTER COLUMN offering_id TYPE uuid USING offering_id::text::uuid,
+    ALTER COLUMN branch_id TYPE uuid USING branch_id::text::uuid;
+ALTER TABLE bookings
+    ALTER COLUMN booking_id TYPE uuid USING booking_id::text::uuid,
+    ALTER COLUMN booked_by_client_id TYPE uuid USING booked_by_client_id::text::uuid,
+    ALTER COLUMN public_offering_id TYPE uuid USING public_offering_id::text::uuid,
+    ALTER COLUMN booked_for_client_id TYPE uuid USING booked_for_client_id::text::uuid;
+ALTER TABLE audit_logs
+    ALTER COLUMN log_id TYPE uuid USING log_id::text::uuid,
+    ALTER COLUMN actor_id TYPE uuid USING actor_id::text::uuid,
+    ALTER COLUMN record_id TYPE uuid USING record_id::text::uuid;
+
+ALTER TABLE cities ADD FOREIGN KEY (parent_location_id) REFERENCES provinces (location_id);
+ALTER TABLE instructors ADD FOREIGN KEY (schedule_id) REFERENCES schedules (schedule_id);
+ALTER TABLE clients ADD FOREIGN KEY (guardian_id) REFERENCES clients (user_id);
+ALTER TABLE clients ADD FOREIGN KEY (schedule_id) REFERENCES schedules (schedule_id);
+ALTER TABLE branches ADD FOREIGN KEY (schedule_id) REFERENCES schedules (schedule_id);
+ALTER TABLE branches ADD FOREIGN KEY (parent_location_id) REFERENCES cities (location_id);
+ALTER TABLE time_slots ADD FOREIGN KEY (schedule_id) REFERENCES schedules (schedule_id);
+ALTER TABLE offerings ADD FOREIGN KEY (instructor_id) REFERENCES instructors (user_id);
+ALTER TABLE public_offerings ADD FOREIGN KEY (offering_id) REFERENCES offerings (offering_id);
+ALTER TABLE public_offerings ADD FOREIGN KEY (branch_id) REFERENCES branches (location_id);
+ALTER TABLE bookings ADD FOREIGN KEY (booked_by_client_id) REFERENCES clients (user_id);
+ALTER TABLE bookings ADD FOREIGN KEY (public_offering_id) REFERENCES public_offerings (public_offering_id);
+ALTER TABLE bookings ADD FOREIGN KEY (booked_for_client_id) REFERENCES clients (user_id);
+
+-- The rewrite discards planner statistics.
+ANALYZE;
@@ -0,0 +1,22 @@
+-- Per-day availability masks (see Availability.py), backfilled from the reserved
+-- time_slots of an existing database: python postgres_setup.py migrate
+-- Character i of reserved is the 30-minute slot starting i * 30 minutes after
+-- midnight; set_bit counts from the left, so it lines up with Availability.to_bits.
+
+CREATE TABLE IF NOT EXISTS schedule_availability (
+    schedule_id UUID NOT NULL REFERENCES schedules(schedule_id),
+    day DATE NOT NULL,
+    reserved BIT(48) NOT NULL,
+    PRIMARY KEY (schedule_id, day)
+);
+
+-- Only days with a reserved slot get a row; a missing day has nothing reserved.
+INSERT INTO schedule_availability AS a (schedule_id, day, reserved)
+SELECT schedule_id,
+       start_time::date,
+       bit_or(set_bit(CAST(0 AS bit(48)),
+                      floor(extract(epoch FROM start_time::time) / 1800)::int, 1))
+FROM time_slots
+WHERE is_reserved
+GROUP BY schedule_id, start_time::date
+ON CONFLICT (schedule_id, day) DO UPDATE SET reserved = a.reserved | EXCLUDED.reserved;
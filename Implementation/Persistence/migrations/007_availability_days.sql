@@ -0,0 +1,8 @@
+-- Every day that has time slots gets a schedule_availability row, reserved or
+-- not: a missing day now means the schedule has no slots then, and nothing on
+-- it is free (see Availability.py). Apply with: python postgres_setup.py migrate
+
+INSERT INTO schedule_availability (schedule_id, day, reserved)
+SELECT DISTINCT schedule_id, start_time::date, CAST(0 AS bit(48))
+FROM time_slots
+ON CONFLICT (schedule_id, day) DO NOTHING;
@@ -1,5 +1,6 @@
 import psycopg2
 import json
+import re
 from pathlib import Path
 import logging
 import sys
@@ -30,6 +31,7 @@ def get_admin_connection():
     
     # Create a copy of secrets and modify for admin connection
     admin_params = secrets.copy()
+    admin_params.pop('dbname', None)  # psycopg2 refuses both dbname and database
     admin_params['database'] = 'postgres'  # Connect to default postgres database
     
     try:
@@ -43,6 +45,7 @@ def get_admin_connection():
 def get_db_connection(dbname):
     """Create a connection to the specified database"""
     secrets = load_secrets()
+    secrets.pop('dbname', None)
     secrets['database'] = dbname
     
     try:
@@ -108,13 +111,100 @@ def execute_ddl():
                 logger.error(f"Error executing DDL: {e}")
                 raise
 
+# Everything a ';' can hide in: quoted strings and identifiers, comments and $tag$ bodies.
+_SQL_TOKEN = re.compile(r"""
+    '(?:''|[^'])*'
+  | "(?:""|[^"])*"
+  | --[^\n]*
+  | /\*.*?\*/
+  | (?P<tag>\$[A-Za-z_0-9]*\$).*?(?P=tag)
+  | ;
+""", re.VERBOSE | re.DOTALL)
+
+def split_statements(sql):
+    """Split a SQL script on the semicolons that end statements.
+
+    Semicolons inside strings, quoted identifiers, comments and
+    dollar-quoted bodies are left alone. Comment-only pieces are dropped.
+    """
+    statements, start = [], 0
+    for match in _SQL_TOKEN.finditer(sql):
+        if match.group() == ';':
+            statements.append(sql[start:match.start()])
+            start = match.end()
+    statements.append(sql[start:])
+    code_only = [_SQL_TOKEN.sub(lambda m: '' if m.group().startswith(('--', '/*')) else m.group(), s).strip()
+                 for s in statements]
+    return [s.strip() for s, code in zip(statements, code_only) if code]
+
+def run_migrations(baseline=False):
+    """Apply the files in migrations/ that have not been applied yet, in name order.
+
+    With ``baseline`` the files are only recorded as applied; a database just
+    built from DDL-342-project.sql already contains every migration.
+
+    Each file runs in its own transaction, unless it contains the line
+    ``-- migrate: no-transaction`` (needed for CREATE INDEX CONCURRENTLY). Such
+    a file runs one statement at a time in autocommit mode, so its statements
+    must be idempotent.
+    """
+    secrets = load_secrets()
+    migrations_dir = Path(__file__).parent / 'migrations'
+
+    conn = get_db_connection(secrets.get('dbname'))
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    name VARCHAR(255) PRIMARY KEY,
+                    applied_at TIMESTAMP NOT NULL DEFAULT now()
+                )
+            """)
+            cursor.execute("SELECT name FROM schema_migrations")
+            applied = {row[0] for row in cursor.fetchall()}
+
+            for path in sorted(migrations_dir.glob('*.sql')):
+                if path.name in applied:
+                    continue
+                sql = path.read_text()
+                if baseline:
+                    cursor.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (path.name,))
+                    continue
+                logger.info(f"Applying migration {path.name}...")
+                if '-- migrate: no-transaction' in sql:
+                    for statement in split_statements(sql):
+                        cursor.execute(statement)
+                    cursor.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (path.name,))
+                else:
+                    cursor.execute("BEGIN")
+                    try:
+                        cursor.execute(sql)
+                        cursor.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (path.name,))
+                        cursor.execute("COMMIT")
+                    except Exception:
+                        cursor.execute("ROLLBACK")
+                        raise
+    finally:
+        conn.close()
+
 def main():
+    if sys.argv[1:] == ['migrate']:
+        try:
+            run_migrations()
+            logger.info("Migrations applied successfully!")
+        except Exception as e:
+            logger.error(f"Migration failed: {e}")
+            sys.exit(1)
+        return
+
     try:
         # Setup database
         setup_database()
         
         # Execute DDL
         execute_ddl()
+        run_migrations(baseline=True)
         
         logger.info("Database setup completed successfully!")
         
@@ -1,37 +1,60 @@
-import uuid
-import psycopg2
-from psycopg2.extras import DictCursor
-import json
 from datetime import datetime, timedelta
-from utils import generate_id
+from utils import generate_id, is_valid_id
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from Database import SessionLocal  # Import session management from Database.py
-from Models import Schedule, TimeSlot, Client, Branch, Instructor  
+from Database import SessionBound  # Import session management from Database.py
+from Metrics import instrumented
+from Models import Schedule, ScheduleDay, TimeSlot, Client, Branch, Instructor
+from Pagination import keyset_page, DEFAULT_PAGE_SIZE
+from Availability import (Availability, SLOT_LENGTH, common_free_windows, from_bits,
+                          reserve_range, release_range)
 
-class ScheduleCatalog:
-    def __init__(self, session: Session):
-        self.session = session
+BULK_SLOT_BATCH_SIZE = 500  # schedules per INSERT ... SELECT statement
 
-from datetime import datetime, timedelta
-from utils import generate_id
-from sqlalchemy.orm import Session
-from Database import SessionLocal  # Import session management from Database.py
-from Models import Schedule, TimeSlot, Client  
+# Two set-based statements per batch: every schedule id is crossed with every
+# 30-minute start in the horizon, and with every day of it for the availability
+# masks. Existing slots and masks are left untouched.
+_BULK_INSERT_SLOTS = text("""
+    INSERT INTO time_slots (schedule_id, start_time, end_time, is_reserved)
+    SELECT s.schedule_id, g.start_time, g.start_time + interval '30 minutes', FALSE
+    FROM unnest(CAST(:schedule_ids AS uuid[])) AS s(schedule_id)
+    CROSS JOIN generate_series(
+        CAST(:start AS timestamp),
+        CAST(:end AS timestamp) - interval '30 minutes',
+        interval '30 minutes'
+    ) AS g(start_time)
+    ON CONFLICT (schedule_id, start_time) DO NOTHING
+""")
 
-class ScheduleCatalog:
-    def __init__(self, session: Session):
-        self.session = session
+_BULK_OPEN_DAYS = text("""
+    INSERT INTO schedule_availability (schedule_id, day, reserved)
+    SELECT s.schedule_id, CAST(d.day AS date), CAST(0 AS bit(48))
+    FROM unnest(CAST(:schedule_ids AS uuid[])) AS s(schedule_id)
+    CROSS JOIN generate_series(
+        CAST(:start AS timestamp),
+        CAST(:end AS timestamp) - interval '1 day',
+        interval '1 day'
+    ) AS d(day)
+    ON CONFLICT (schedule_id, day) DO NOTHING
+""")
+
+@instrumented
+class ScheduleCatalog(SessionBound):
+    def __init__(self, session: Session = None):
+        super().__init__(session)
 
     def create_schedule(self, owner_id, owner_type):
         # Verify the owner exists based on owner_type
+        if owner_type not in ('client', 'branch', 'instructor'):
+            raise ValueError("Invalid owner type specified.")
+        if not is_valid_id(owner_id):
+            raise ValueError(f"The specified {owner_type} does not exist in the database.")
         if owner_type == 'client':
             owner = self.session.query(Client).filter_by(user_id=owner_id).first()
         elif owner_type == 'branch':
             owner = self.session.query(Branch).filter_by(location_id=owner_id).first()
-        elif owner_type == 'instructor':
-            owner = self.session.query(Instructor).filter_by(user_id=owner_id).first()
         else:
-            raise ValueError("Invalid owner type specified.")
+            owner = self.session.query(Instructor).filter_by(user_id=owner_id).first()
 
         if not owner:
             raise ValueError(f"The specified {owner_type} does not exist in the database.")
@@ -42,64 +65,147 @@ class ScheduleCatalog:
             schedule_owner_type=owner_type
         )
         self.session.add(schedule)
-        self.session.commit()
+        self._commit()
         return schedule
 
-    def get_schedule(self, schedule_id):
-        """Retrieves a schedule by its ID."""
-        return self.session.query(Schedule).filter_by(schedule_id=schedule_id).first()
+    def get_schedule(self, schedule_id, load=()):
+        """Retrieves a schedule by its ID; pass load=SCHEDULE_WITH_TIME_SLOTS to fetch its slots too."""
+        if not is_valid_id(schedule_id):
+            return None
+        return self.session.query(Schedule).options(*load).filter_by(schedule_id=schedule_id).first()
 
-    def get_schedules_by_owner(self, schedule_owner_id):
+    def get_schedules_by_owner(self, schedule_owner_id, load=()):
         """Retrieves all schedules for a specific owner ID."""
-        return self.session.query(Schedule).filter_by(schedule_owner_id=schedule_owner_id).all()
+        if not is_valid_id(schedule_owner_id):
+            return []
+        return self.session.query(Schedule).options(*load).filter_by(schedule_owner_id=schedule_owner_id).all()
+
+    def get_schedules_by_owner_page(self, schedule_owner_id, page_size=DEFAULT_PAGE_SIZE, token=None, load=()):
+        """Retrieves one page of an owner's schedules and the token for the next page."""
+        if not is_valid_id(schedule_owner_id):
+            return [], None
+        query = self.session.query(Schedule).options(*load).filter_by(schedule_owner_id=schedule_owner_id)
+        return keyset_page(query, [Schedule.schedule_id], token, page_size)
 
     def generate_time_slots(self, schedule):
-        """Generates time slots for the next week in 30-minute increments for a given schedule."""
-        today = datetime.now()
-        end_date = today + timedelta(days=7)
-        current_time = today.replace(hour=0, minute=0, second=0, microsecond=0)
-        
+        """Generates time slots for the next week in 30-minute increments for a given schedule.
+
+        They cover eight whole days from today's midnight, so the week ahead
+        is complete whatever the time now, and every day gets its availability mask.
+        """
+        start_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        end_date = start_date + timedelta(days=8)
+        current_time = start_date
+
         while current_time < end_date:
             start_time = current_time
-            end_time = start_time + timedelta(minutes=30)
+            end_time = start_time + SLOT_LENGTH
             time_slot = TimeSlot(
                 schedule_id=schedule.schedule_id,
                 start_time=start_time,
                 end_time=end_time,
                 is_reserved=False
             )
-            self.session.add(time_slot) 
+            self.session.add(time_slot)
             current_time = end_time
-        
-        self.session.commit() 
 
+        self.session.execute(_BULK_OPEN_DAYS, {'schedule_ids': [schedule.schedule_id],
+                                               'start': start_date, 'end': end_date})
+        self._commit()
 
+    def generate_time_slots_bulk(self, schedules, start_date=None, days=7,
+                                 progress_callback=None, batch_size=BULK_SLOT_BATCH_SIZE):
+        """Generates 30-minute time slots for many schedules with set-based inserts.
 
-    def get_schedule(self, schedule_id):
-        """Retrieves a schedule by its ID."""
-        return self.session.query(Schedule).filter_by(schedule_id=schedule_id).first()
+        ``schedules`` may hold Schedule objects or schedule ids. Slots cover
+        ``days`` whole days starting at midnight of ``start_date`` (today by
+        default). Slots that already exist are skipped, so re-running over an
+        overlapping horizon is safe. Each day also gets its availability mask,
+        with nothing reserved. ``progress_callback(done, total)`` is
+        called after each batch of schedules. Returns the number of new slots.
+        """
+        schedule_ids = list(dict.fromkeys(
+            s if isinstance(s, str) else s.schedule_id for s in schedules
+        ))
+        if not schedule_ids or days <= 0:
+            return 0
 
-    def get_schedules_by_owner(self, schedule_owner_id):
-        """Retrieves all schedules for a specific owner ID."""
-        return self.session.query(Schedule).filter_by(schedule_owner_id=schedule_owner_id).all()
+        start_date = start_date or datetime.now()
+        start = datetime(start_date.year, start_date.month, start_date.day)
+        end = start + timedelta(days=days)
 
-    def generate_time_slots(self, schedule):
-        """Generates time slots for the next week in 30-minute increments for a given schedule."""
-        today = datetime.now()
-        end_date = today + timedelta(days=7)
-        current_time = today.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        while current_time < end_date:
-            start_time = current_time
-            end_time = start_time + timedelta(minutes=30)
-            time_slot = TimeSlot(
-                schedule_id=schedule.schedule_id,
-                start_time=start_time,
-                end_time=end_time,
-                is_reserved=False
-            )
-            self.session.add(time_slot) 
-            current_time = end_time
-        
-        self.session.commit()  
+        inserted = 0
+        total = len(schedule_ids)
+        for offset in range(0, total, batch_size):
+            batch = schedule_ids[offset:offset + batch_size]
+            params = {'schedule_ids': batch, 'start': start, 'end': end}
+            inserted += self.session.execute(_BULK_INSERT_SLOTS, params).rowcount
+            self.session.execute(_BULK_OPEN_DAYS, params)
+            if progress_callback:
+                progress_callback(min(offset + batch_size, total), total)
+
+        self._commit()
+        return inserted
+
+    def get_availabilities(self, schedule_ids, start, end):
+        """Loads the reserved-slot masks of several schedules for the days [start, end) touches.
+
+        One query for all of them; returns {schedule_id: Availability}. Days
+        without time slots have no mask and are never free.
+        Malformed ids get an Availability with no days.
+        """
+        schedule_ids = list(dict.fromkeys(schedule_ids))
+        availabilities = {schedule_id: Availability(schedule_id) for schedule_id in schedule_ids}
+        valid_ids = [schedule_id for schedule_id in schedule_ids if is_valid_id(schedule_id)]
+        if not valid_ids:
+            return availabilities
+        rows = (
+            self.session.query(ScheduleDay.schedule_id, ScheduleDay.day, ScheduleDay.reserved)
+            .filter(ScheduleDay.schedule_id.in_(valid_ids),
+                    ScheduleDay.day >= start.date(),
+                    ScheduleDay.day <= end.date())
+            .all()
+        )
+        for row in rows:
+            availabilities[row.schedule_id].days[row.day] = from_bits(row.reserved)
+        return availabilities
+
+    def get_availability(self, schedule_id, start, end):
+        """Loads one schedule's reserved-slot masks for the days [start, end) touches."""
+        return self.get_availabilities([schedule_id], start, end)[schedule_id]
+
+    def get_time_slots(self, schedule_id, start, end):
+        """Builds the 30-minute TimeSlot objects of [start, end) from the availability masks."""
+        return self.get_availability(schedule_id, start, end).time_slots(start, end)
+
+    def is_free(self, schedule_id, start, end):
+        return self.get_availability(schedule_id, start, end).is_free(start, end)
+
+    def reserve(self, schedule_id, start, end):
+        """Reserves [start, end) of a schedule; raises ValueError if any slot of it is taken or missing."""
+        if not is_valid_id(schedule_id):
+            raise ValueError("The schedule does not exist.")
+        if not reserve_range(self.session, schedule_id, start, end):
+            self._rollback()
+            raise ValueError("The schedule is not free for the whole time range.")
+        self._commit()
+
+    def release(self, schedule_id, start, end):
+        """Frees [start, end) of a schedule."""
+        if not is_valid_id(schedule_id):
+            return
+        release_range(self.session, schedule_id, start, end)
+        self._commit()
+
+    def find_common_free_windows(self, schedule_ids, duration, start, end, limit=10):
+        """Finds the earliest windows of ``duration`` in [start, end) that are free on every schedule.
 
+        Pass the instructor's, the branch's and the booked clients' schedule
+        ids to place a public offering. Only time inside every schedule's
+        time slots counts. Their masks are fetched in one query
+        and intersected as one bitset (see Availability.common_free_windows).
+        Returns up to ``limit`` (start, end) pairs, earliest first; windows
+        starting 30 minutes apart may overlap.
+        """
+        availabilities = self.get_availabilities(schedule_ids, start, end)
+        return common_free_windows(availabilities.values(), duration, start, end, limit)
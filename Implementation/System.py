@@ -1,7 +1,7 @@
-import bcrypt
 from singleton_decorator import singleton
 from utils import generate_id
-from Database import SessionLocal
+from Passwords import get_hasher
+from Database import ScopedSession, SessionBound, unit_of_work, batch
 from Users import UserCatalog
 from Offerings import OfferingCatalog
 from Bookings import BookingCatalog
@@ -11,27 +11,48 @@ from Models import Client, Administrator, Instructor
 from sqlalchemy.exc import SQLAlchemyError
 
 def hash_password(password: str) -> bytes:
-    """Hashes a password using bcrypt."""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    """Hashes a password using bcrypt on the shared hashing pool."""
+    return get_hasher().hash(password)
 
 def check_password(provided_password: str, stored_hashed_password: bytes) -> bool:
     """Checks if the provided password matches the stored hashed password."""
-    return bcrypt.checkpw(provided_password.encode('utf-8'), stored_hashed_password)
+    return get_hasher().check(provided_password, stored_hashed_password)
 
 @singleton
-class System:
+class System(SessionBound):
     def __init__(self):
-        self.session = SessionLocal()
-
-        self.user_catalog = UserCatalog(self.session)
-        self.offering_catalog = OfferingCatalog(self.session)
-        self.booking_catalog = BookingCatalog(self.session)
-        self.location_catalog = LocationCatalog(self.session)
-        self.schedule_catalog = ScheduleCatalog(self.session)
+        super().__init__()
+        # Catalogs resolve the current scoped session on every call, so one
+        # System can serve requests from many threads or asyncio tasks.
+        self.user_catalog = UserCatalog()
+        self.offering_catalog = OfferingCatalog()
+        self.booking_catalog = BookingCatalog()
+        self.location_catalog = LocationCatalog()
+        self.schedule_catalog = ScheduleCatalog()
+
+    def unit_of_work(self):
+        """Context manager giving the enclosed catalog calls their own session and transaction."""
+        return unit_of_work()
+
+    def batch(self):
+        """Context manager committing every enclosed catalog call in one transaction.
+
+        Without it each catalog call commits on its own, as before:
+
+            with system.batch():
+                province = system.location_catalog.create_province("Quebec")
+                for name in ("Montreal", "Laval"):
+                    system.location_catalog.create_city(province.location_id, name)
+        """
+        return batch()
 
     def close_session(self):
-        """Close the session to free up resources."""
-        self.session.close()
+        """Close the calling thread's session to free up resources."""
+        ScopedSession.remove()
+
+    def search_public_offerings(self, **criteria):
+        """Search bookable public offerings; see OfferingCatalog.search_public_offerings."""
+        return self.offering_catalog.search_public_offerings(**criteria)
 
     # Registration actions
     def register_client(self, email, password, **kwargs):
@@ -49,10 +70,10 @@ class System:
                 **kwargs
             )
             self.session.add(client)
-            self.session.commit()
+            self._commit()
             return client
         except SQLAlchemyError as e:
-            self.session.rollback()
+            self._rollback()
             print(f"Error registering client: {e}")
             return None
 
@@ -71,10 +92,10 @@ class System:
                 **kwargs
             )
             self.session.add(instructor)
-            self.session.commit()
+            self._commit()
             return instructor
         except SQLAlchemyError as e:
-            self.session.rollback()
+            self._rollback()
             print(f"Error registering instructor: {e}")
             return None
 
@@ -93,10 +114,10 @@ class System:
                 **kwargs
             )
             self.session.add(admin)
-            self.session.commit()
+            self._commit()
             return admin
         except SQLAlchemyError as e:
-            self.session.rollback()
+            self._rollback()
             print(f"Error registering administrator: {e}")
             return None
 
@@ -1,13 +1,51 @@
-from utils import generate_id
+from utils import generate_id, is_valid_id, LRUCache
 from singleton_decorator import singleton
 from Bookings import Booking
+from sqlalchemy import select, literal
 from sqlalchemy.orm import Session 
+from Database import SessionBound
+from Metrics import instrumented
 from Models import Client, Instructor, Administrator
 
+USER_CACHE_SIZE = 10000
+
+# Lookup order matches the historical client -> instructor -> administrator probe.
+USER_MODELS = {'client': Client, 'instructor': Instructor, 'administrator': Administrator}
+
 @singleton
-class UserCatalog:
-    def __init__(self, session: Session):
-        self.session = session
+@instrumented
+class UserCatalog(SessionBound):
+    def __init__(self, session: Session = None, cache_size: int = USER_CACHE_SIZE):
+        super().__init__(session)
+        # user_id -> user type and email -> (user type, user_id); only hits are cached
+        self._types_by_id = LRUCache(cache_size)
+        self._ids_by_email = LRUCache(cache_size)
+
+    def _remember(self, user):
+        user_type = next(t for t, model in USER_MODELS.items() if isinstance(user, model))
+        self._types_by_id.put(user.user_id, user_type)
+        self._ids_by_email.put(user.email, (user_type, user.user_id))
+
+    def _forget(self, user):
+        self._types_by_id.pop(user.user_id)
+        self._ids_by_email.pop(user.email)
+
+    def _resolve(self, column, value):
+        """Find a user of any type in one round trip.
+
+        Outer-joins the three user tables onto a single probe row, so the
+        database answers with at most one indexed lookup per table.
+        """
+        # The probe column needs the key's type; an untyped literal comes back as text.
+        probe = select(literal(value, type_=getattr(Client, column).type).label('value')).subquery()
+        query = self.session.query(*USER_MODELS.values()).select_from(probe)
+        for model in USER_MODELS.values():
+            query = query.outerjoin(model, getattr(model, column) == probe.c.value)
+        row = query.first()
+        user = next((candidate for candidate in row if candidate is not None), None) if row else None
+        if user:
+            self._remember(user)
+        return user
 
     def add_user(self, user):
         print(f"Adding user of type: {type(user)}")
@@ -20,16 +58,31 @@ class UserCatalog:
             self.session.add(user)
         else:
             raise ValueError("Unknown user type")
-        self.session.commit()
+        self._commit()
+        self._remember(user)
 
     def get_user_by_id(self, user_id):
-        # Retrieve user by ID from each table since there is no common User table
-        user = self.session.query(Client).filter_by(user_id=user_id).first()
-        if not user:
-            user = self.session.query(Instructor).filter_by(user_id=user_id).first()
-        if not user:
-            user = self.session.query(Administrator).filter_by(user_id=user_id).first()
-        return user
+        # There is no common User table: a cached user type turns this into a
+        # primary-key get, otherwise all three tables are probed in one query.
+        if not is_valid_id(user_id):
+            return None
+        user_type = self._types_by_id.get(user_id)
+        if user_type:
+            user = self.session.get(USER_MODELS[user_type], user_id)
+            if user:
+                return user
+            self._types_by_id.pop(user_id)
+        return self._resolve('user_id', user_id)
+
+    def get_user_by_email(self, email):
+        cached = self._ids_by_email.get(email)
+        if cached:
+            user_type, user_id = cached
+            user = self.session.get(USER_MODELS[user_type], user_id)
+            if user and user.email == email:
+                return user
+            self._ids_by_email.pop(email)
+        return self._resolve('email', email)
 
     def get_client_by_email(self, email):
         return self.session.query(Client).filter(Client.email == email).first()
@@ -42,12 +95,13 @@ class UserCatalog:
         user = self.get_user_by_id(user_id)
         if user:
             self.session.delete(user)
-            self.session.commit()
+            self._commit()
+            self._forget(user)
 
     def login(self, email, password):
         """Authenticate a user based on email and password."""
         # Try logging in as client, then instructor, then administrator
-        user = self.get_client_by_email(email) or self.get_instructor_by_email(email)  # Adjust with additional logic for `Administrator` if needed
+        user = self.get_user_by_email(email)
         if user and user.hashed_password == password:
             return user
         return None
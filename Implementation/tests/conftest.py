@@ -0,0 +1,53 @@
+"""Fixtures for the tests, which run against the database the app is configured for.
+
+    cd Implementation && python -m pytest tests
+
+The connection comes from DATABASE_URL or .secrets, as for the app; every
+test is skipped when that database cannot be reached. Tests only touch rows
+whose names or emails start with their own tag, and remove them afterwards.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Database import SessionLocal  # noqa: E402
+from utils import generate_id  # noqa: E402
+
+_DELETE_TAGGED = [
+    "DELETE FROM time_slots WHERE schedule_id IN (SELECT schedule_id FROM branches WHERE name LIKE :tag)",
+    "DELETE FROM schedule_availability WHERE schedule_id IN (SELECT schedule_id FROM branches WHERE name LIKE :tag)",
+    "CREATE TEMP TABLE tagged_schedules ON COMMIT DROP AS SELECT schedule_id FROM branches WHERE name LIKE :tag",
+    "DELETE FROM branches WHERE name LIKE :tag",
+    "DELETE FROM schedules WHERE schedule_id IN (SELECT schedule_id FROM tagged_schedules)",
+    "DELETE FROM cities WHERE name LIKE :tag",
+    "DELETE FROM provinces WHERE name LIKE :tag",
+    "DELETE FROM clients WHERE email LIKE :tag AND guardian_id IS NOT NULL",
+    "DELETE FROM clients WHERE email LIKE :tag",
+]
+
+@pytest.fixture
+def session():
+    session = SessionLocal()
+    try:
+        session.execute(text("SELECT 1"))
+    except OperationalError as e:
+        session.close()
+        pytest.skip(f"database not reachable: {e.orig}")
+    yield session
+    session.rollback()
+    session.close()
+
+@pytest.fixture
+def tag(session):
+    """A prefix unique to the test; tagged locations and clients are deleted afterwards."""
+    tag = f"test-{generate_id()[-12:]}"
+    yield tag
+    session.rollback()
+    for statement in _DELETE_TAGGED:
+        session.execute(text(statement), {'tag': f"{tag}%"})
+    session.commit()
@@ -0,0 +1,48 @@
+import threading
+from contextlib import contextmanager
+
+import psycopg2
+from sqlalchemy import text
+
+from Audit import ASYNC, STRICT, AuditLogWriter, configure_audit, get_audit_writer
+from Database import DatabaseConnection
+from utils import generate_id
+
+def test_configure_audit_replaces_the_shared_writer():
+    try:
+        writer = configure_audit(mode=ASYNC)
+        assert get_audit_writer() is writer
+        assert writer.mode == ASYNC
+    finally:
+        configure_audit(mode=STRICT)
+
+def test_failed_async_batch_is_kept_and_written_later(session, monkeypatch):
+    db = DatabaseConnection()
+    writer = AuditLogWriter(mode=ASYNC, max_attempts=1, retry_interval=0.0, flush_interval=0.05)
+    real_connection = db.connection
+    worker_calls = []
+
+    @contextmanager
+    def first_worker_write_fails():
+        if threading.current_thread().name == 'audit-log-writer':
+            worker_calls.append(1)
+            if len(worker_calls) == 1:
+                raise psycopg2.OperationalError("database went away")
+        with real_connection() as conn:
+            yield conn
+
+    monkeypatch.setattr(db, 'connection', first_worker_write_fails)
+    record_id = generate_id()
+    try:
+        with db.connection() as conn:
+            with conn.cursor() as cur:
+                writer.record(cur, 'tests', 'INSERT', record_id, new_value={'n': 1})
+        writer.flush()
+
+        assert writer.metrics()['pending_retry'] == 0
+        assert session.execute(text("SELECT count(*) FROM audit_logs WHERE record_id = :id"),
+                               {'id': record_id}).scalar() == 1
+    finally:
+        writer.close()
+        session.execute(text("DELETE FROM audit_logs WHERE record_id = :id"), {'id': record_id})
+        session.commit()
@@ -0,0 +1,72 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from Availability import Availability, common_free_windows
+from Location import LocationCatalog
+from Scheduling import ScheduleCatalog
+
+HOUR = timedelta(hours=1)
+
+def test_day_without_a_mask_is_never_free():
+    monday, tuesday = datetime(2030, 1, 7), datetime(2030, 1, 8)
+    availability = Availability('schedule', {monday.date(): 0})
+
+    assert availability.is_free(monday, monday + HOUR)
+    assert not availability.is_free(tuesday, tuesday + HOUR)
+    assert availability.time_slots(tuesday, tuesday + HOUR) == []
+    windows = common_free_windows([availability], HOUR, monday, monday + timedelta(days=2), limit=100)
+    assert windows and all(end <= tuesday for _, end in windows)
+
+def _branch_schedule(session, tag):
+    locations = LocationCatalog.__wrapped__(session)
+    province = locations.create_province(f"{tag} Province")
+    city = locations.create_city(province.location_id, f"{tag} City")
+    branch = locations.create_branch(city.location_id, f"{tag} Branch", ScheduleCatalog(session))
+    return branch.schedule_id
+
+def test_free_windows_stay_inside_generated_slots(session, tag):
+    schedules = ScheduleCatalog(session)
+    schedule_id = _branch_schedule(session, tag)
+    day = datetime(2030, 1, 7)
+    horizon = (day, day + timedelta(days=3))
+
+    assert schedules.find_common_free_windows([schedule_id], HOUR, *horizon) == []
+
+    schedules.generate_time_slots_bulk([schedule_id], start_date=day, days=1)
+    windows = schedules.find_common_free_windows([schedule_id], HOUR, *horizon, limit=100)
+    assert len(windows) == 47
+    assert all(end <= day + timedelta(days=1) for _, end in windows)
+
+def test_generate_time_slots_writes_the_masks(session, tag):
+    schedules = ScheduleCatalog(session)
+    schedule_id = _branch_schedule(session, tag)
+    schedule = schedules.get_schedule(schedule_id)
+
+    schedules.generate_time_slots(schedule)
+
+    today = datetime.combine(date.today(), datetime.min.time())
+    availability = schedules.get_availability(schedule_id, today, today + timedelta(days=8))
+    assert availability.days == {(today + timedelta(days=i)).date(): 0 for i in range(8)}
+
+def test_reserve_keeps_time_slots_in_step(session, tag):
+    schedules = ScheduleCatalog(session)
+    schedule_id = _branch_schedule(session, tag)
+    day = datetime(2030, 1, 7)
+    schedules.generate_time_slots_bulk([schedule_id], start_date=day, days=1)
+    start = day + timedelta(hours=9)
+
+    def reserved_slots():
+        return session.execute(text("SELECT count(*) FROM time_slots WHERE schedule_id = :id AND is_reserved"),
+                               {'id': schedule_id}).scalar()
+
+    schedules.reserve(schedule_id, start, start + HOUR)
+    assert reserved_slots() == 2
+    assert not schedules.is_free(schedule_id, start, start + HOUR)
+
+    schedules.release(schedule_id, start, start + HOUR)
+    assert reserved_slots() == 0
+
+    with pytest.raises(ValueError):
+        schedules.reserve(schedule_id, start + timedelta(days=1), start + timedelta(days=1) + HOUR)
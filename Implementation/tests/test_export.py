@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+
+import Export
+from Location import LocationCatalog
+from Scheduling import ScheduleCatalog
+
+def _branch_with_slots(session, tag):
+    locations = LocationCatalog.__wrapped__(session)
+    province = locations.create_province(f"{tag} Province")
+    city = locations.create_city(province.location_id, f"{tag} City")
+    branch = locations.create_branch(city.location_id, f"{tag} Branch", ScheduleCatalog(session))
+    ScheduleCatalog(session).generate_time_slots_bulk([branch.schedule_id], start_date=datetime(2030, 1, 7), days=1)
+    return branch.location_id
+
+def _interrupt_after(batches, monkeypatch):
+    write = Export._CsvWriter.write
+    calls = []
+
+    def failing_write(self, rows):
+        calls.append(1)
+        if len(calls) > batches:
+            raise RuntimeError("interrupted")
+        write(self, rows)
+
+    monkeypatch.setattr(Export._CsvWriter, 'write', failing_write)
+    return lambda: monkeypatch.setattr(Export._CsvWriter, 'write', write)
+
+def test_resumed_export_matches_a_full_one(session, tag, tmp_path, monkeypatch):
+    branch_id = _branch_with_slots(session, tag)
+    monkeypatch.setattr(Export, 'CHECKPOINT_EVERY_BATCHES', 2)
+    full, resumed, checkpoint = tmp_path / 'full.csv', tmp_path / 'resumed.csv', tmp_path / 'export.ckpt'
+    Export.export('time_slots', 'csv', full, branch_id=branch_id, batch_size=10, session=session)
+
+    restore = _interrupt_after(3, monkeypatch)
+    with pytest.raises(RuntimeError):
+        Export.export('time_slots', 'csv', resumed, branch_id=branch_id, checkpoint=checkpoint,
+                      batch_size=10, session=session)
+    restore()
+    assert checkpoint.exists()
+    rows = Export.export('time_slots', 'csv', resumed, branch_id=branch_id, checkpoint=checkpoint,
+                         batch_size=10, session=session)
+
+    assert rows == 48
+    assert resumed.read_bytes() == full.read_bytes()
+    assert not checkpoint.exists()
+
+def test_missing_output_starts_the_export_again(session, tag, tmp_path, monkeypatch):
+    branch_id = _branch_with_slots(session, tag)
+    monkeypatch.setattr(Export, 'CHECKPOINT_EVERY_BATCHES', 2)
+    output, checkpoint = tmp_path / 'slots.csv', tmp_path / 'export.ckpt'
+
+    restore = _interrupt_after(3, monkeypatch)
+    with pytest.raises(RuntimeError):
+        Export.export('time_slots', 'csv', output, branch_id=branch_id, checkpoint=checkpoint,
+                      batch_size=10, session=session)
+    restore()
+    output.unlink()
+    rows = Export.export('time_slots', 'csv', output, branch_id=branch_id, checkpoint=checkpoint,
+                         batch_size=10, session=session)
+
+    assert rows == 48
+    assert len(output.read_text().splitlines()) == 49
+
+def test_checkpoint_offset_is_a_byte_position(tmp_path):
+    path = tmp_path / 'rows.ndjson'
+    writer = Export._NdjsonWriter(path, ['name'], resume=False)
+    writer.write([("Montréal",), ("Québec",)])
+    offset = writer.checkpoint()
+    writer.close()
+
+    assert offset == path.stat().st_size
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from Bookings import BookingCatalog
+from Location import LocationCatalog
+from Models import Branch
+from Offerings import OfferingCatalog, PublicOfferingService
+from Scheduling import ScheduleCatalog
+from Users import UserCatalog
+
+BAD_ID = "nope"
+START = datetime(2030, 1, 7, 9)
+END = START + timedelta(hours=2)
+
+def _catalogs(session):
+    return {
+        'users': UserCatalog.__wrapped__(session),
+        'bookings': BookingCatalog.__wrapped__(session),
+        'offerings': OfferingCatalog.__wrapped__(session),
+        'schedules': ScheduleCatalog(session),
+        'locations': LocationCatalog.__wrapped__(session),
+    }
+
+# (catalog, call, expected result) for every public method that takes an id.
+RETURNS = [
+    ('users', lambda c: c.get_user_by_id(BAD_ID), None),
+    ('users', lambda c: c.remove_user(BAD_ID), None),
+    ('bookings', lambda c: c.get_booking_by_id(BAD_ID), None),
+    ('bookings', lambda c: c.remove_booking(BAD_ID), None),
+    ('bookings', lambda c: c.get_all_bookings_for_client(BAD_ID), []),
+    ('bookings', lambda c: c.get_all_bookings_by_client(BAD_ID), []),
+    ('bookings', lambda c: c.get_bookings_for_public_offering(BAD_ID), []),
+    ('bookings', lambda c: c.get_bookings_for_client_page(BAD_ID), ([], None)),
+    ('bookings', lambda c: c.get_bookings_by_client_page(BAD_ID), ([], None)),
+    ('offerings', lambda c: c.get_offering(BAD_ID), None),
+    ('offerings', lambda c: c.get_offerings_by_instructor(BAD_ID), []),
+    ('offerings', lambda c: c.get_public_offering(BAD_ID), None),
+    ('offerings', lambda c: c.get_public_offerings_in_location(BAD_ID), []),
+    ('offerings', lambda c: c.search_public_offerings(city_id=BAD_ID), ([], None)),
+    ('offerings', lambda c: c.search_public_offerings(branch_id=BAD_ID), ([], None)),
+    ('offerings', lambda c: c.search_public_offerings(instructor_id=BAD_ID), ([], None)),
+    ('schedules', lambda c: c.get_schedule(BAD_ID), None),
+    ('schedules', lambda c: c.get_schedules_by_owner(BAD_ID), []),
+    ('schedules', lambda c: c.get_schedules_by_owner_page(BAD_ID), ([], None)),
+    ('schedules', lambda c: c.get_availability(BAD_ID, START, END).days, {}),
+    ('schedules', lambda c: c.get_time_slots(BAD_ID, START, END), []),
+    ('schedules', lambda c: c.release(BAD_ID, START, END), None),
+    ('locations', lambda c: c.get_province(BAD_ID), None),
+    ('locations', lambda c: c.get_city(BAD_ID), None),
+    ('locations', lambda c: c.get_branch(BAD_ID), None),
+    ('locations', lambda c: c.get_cities_in_province(BAD_ID), []),
+    ('locations', lambda c: c.get_branches_in_city(BAD_ID), []),
+    ('locations', lambda c: c.get_branches_in_province(BAD_ID), []),
+    ('locations', lambda c: c.get_branches_under(BAD_ID), []),
+]
+
+RAISES = [
+    ('bookings', lambda c: c.add_booking(BAD_ID, BAD_ID, [BAD_ID])),
+    ('offerings', lambda c: c.create_offering(BAD_ID, 'yoga', 'group', 10)),
+    ('offerings', lambda c: c.create_public_offering(BAD_ID, 10)),
+    ('schedules', lambda c: c.create_schedule(BAD_ID, 'client')),
+    ('schedules', lambda c: c.reserve(BAD_ID, START, END)),
+    ('locations', lambda c: c.create_city(BAD_ID, "Nowhere")),
+    ('locations', lambda c: c.create_branch(BAD_ID, "Nowhere", ScheduleCatalog())),
+]
+
+@pytest.mark.parametrize('catalog, call, expected', RETURNS)
+def test_malformed_id_finds_nothing(session, catalog, call, expected):
+    assert call(_catalogs(session)[catalog]) == expected
+    session.execute(text("SELECT 1"))  # the transaction was not aborted
+
+@pytest.mark.parametrize('catalog, call', RAISES)
+def test_malformed_id_is_rejected(session, catalog, call):
+    with pytest.raises(ValueError):
+        call(_catalogs(session)[catalog])
+    session.execute(text("SELECT 1"))  # the transaction was not aborted
+
+def test_public_offering_service_rejects_malformed_id(session):
+    with pytest.raises(ValueError):
+        PublicOfferingService(BAD_ID, session=session)
+
+def test_location_cache_miss_with_malformed_id(session):
+    cache = LocationCatalog.__wrapped__(session).cache
+    assert cache.get(session, Branch, BAD_ID) is None
+    assert cache.misses == 1
+    session.execute(text("SELECT 1"))  # the transaction was not aborted
@@ -0,0 +1,65 @@
+from Database import SessionLocal
+from Imports import ClientImporter, LocationImporter
+from Models import Branch, City, Client, Province
+
+def test_location_import_on_explicit_session(session, tag):
+    records = [
+        {'province': f"{tag} Province", 'city': f"{tag} City", 'branch': f"{tag} Downtown"},
+        {'province': f"{tag} Province", 'city': f"{tag} City", 'branch': f"{tag} Uptown"},
+    ]
+    report = LocationImporter(session=session, slot_days=1).import_records(records)
+
+    assert report.errors == []
+    assert report.created == {'provinces': 1, 'cities': 1, 'branches': 2, 'time_slots': 96}
+    other = SessionLocal()
+    try:
+        assert other.query(Province).filter_by(name=f"{tag} Province").count() == 1
+        assert other.query(City).filter_by(name=f"{tag} City").count() == 1
+        assert other.query(Branch).filter(Branch.name.like(f"{tag}%")).count() == 2
+    finally:
+        other.close()
+
+def _client(email, age, guardian_email=''):
+    return {'email': email, 'password': 'secret', 'name': 'Test Client', 'age': str(age),
+            'guardian_email': guardian_email}
+
+def test_minor_of_rejected_guardian_is_not_imported(session, tag):
+    # The minor comes first and names the adult, who is rejected afterwards
+    # because the adult's own guardian is not a client.
+    adult, minor = f"{tag}-adult@example.com", f"{tag}-minor@example.com"
+    records = [_client(minor, 12, adult), _client(adult, 30, f"{tag}-nobody@example.com")]
+
+    report = ClientImporter(session=session).import_records(records)
+
+    assert report.created == {'clients': 0}
+    assert sorted(error.row for error in report.errors) == [1, 2]
+    assert session.query(Client).filter(Client.email.like(f"{tag}%")).count() == 0
+
+def test_client_import_on_explicit_session(session, tag):
+    parent = f"{tag}-parent@example.com"
+    records = [_client(parent, 40), _client(f"{tag}-child@example.com", 10, parent)]
+
+    report = ClientImporter(session=session).import_records(records)
+
+    assert report.errors == []
+    assert report.created == {'clients': 2}
+    other = SessionLocal()
+    try:
+        parent = other.query(Client).filter_by(email=parent).one()
+        child = other.query(Client).filter_by(email=f"{tag}-child@example.com").one()
+        assert child.guardian_id == parent.user_id
+    finally:
+        other.close()
+
+def test_client_import_falls_back_to_row_by_row_on_explicit_session(session, tag, monkeypatch):
+    taken = f"{tag}-taken@example.com"
+    ClientImporter(session=session).import_records([_client(taken, 30)])
+    # Pretend the email was registered after the duplicate check, so the bulk insert fails.
+    monkeypatch.setattr(ClientImporter, '_existing_users', lambda self, emails: {})
+
+    report = ClientImporter(session=session).import_records(
+        [_client(taken, 30), _client(f"{tag}-new@example.com", 30)])
+
+    assert report.created == {'clients': 1}
+    assert [error.row for error in report.errors] == [1]
+    assert session.query(Client).filter(Client.email.like(f"{tag}%")).count() == 2
@@ -0,0 +1,15 @@
+from Location import LocationCache, LocationCatalog
+from Models import Province
+
+def test_get_returns_the_instance_the_session_already_holds(session, tag):
+    province_id = LocationCatalog.__wrapped__(session).create_province(f"{tag} Province").location_id
+    cache = LocationCache()
+    cache.get(session, Province, province_id)  # load the snapshot before the change
+    province = session.get(Province, province_id)
+    province.name = f"{tag} Renamed"
+
+    found = cache.get(session, Province, province_id)
+
+    assert found is province
+    assert found.name == f"{tag} Renamed"
+    assert found in session.dirty
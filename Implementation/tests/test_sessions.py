@@ -0,0 +1,35 @@
+import gc
+import threading
+
+from Database import ScopedSession, unit_of_work
+from Location import LocationCatalog
+from Users import UserCatalog
+
+def _thread_sessions():
+    return [key for key in ScopedSession.registry.registry if key[0] == 'thread']
+
+def test_auto_committed_call_releases_the_thread_session(session, tag):
+    province = LocationCatalog().create_province(f"{tag} Province")
+
+    assert not ScopedSession.registry.has()
+    assert province.name == f"{tag} Province"
+
+def test_unit_of_work_keeps_its_session_until_the_end(session, tag):
+    with unit_of_work() as unit:
+        LocationCatalog().create_province(f"{tag} Province")
+        assert ScopedSession() is unit
+
+def test_sessions_of_finished_threads_are_closed(session):
+    before = len(_thread_sessions())
+
+    def lookup():
+        UserCatalog().get_user_by_email("nobody@example.com")
+
+    threads = [threading.Thread(target=lookup) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    gc.collect()
+
+    assert len(_thread_sessions()) <= before
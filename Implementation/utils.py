@@ -1,5 +1,94 @@
+import os
+import time
 import uuid
+import threading
+from collections import OrderedDict
+
+_RAND_B_MASK = (1 << 62) - 1
+_COUNTER_MAX = 0xFFF
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+def _uuid7_tick():
+    """Next (milliseconds, counter) pair; strictly increasing within this process."""
+    global _uuid7_last_ms, _uuid7_counter
+    now_ms = time.time_ns() // 1_000_000
+    with _uuid7_lock:
+        if now_ms > _uuid7_last_ms:
+            # Start low in the counter range so a burst within one millisecond has room to count up.
+            _uuid7_last_ms, _uuid7_counter = now_ms, int.from_bytes(os.urandom(2), 'big') >> 5
+        elif _uuid7_counter < _COUNTER_MAX:
+            _uuid7_counter += 1
+        else:
+            # Counter exhausted (or the clock went back): borrow the next millisecond.
+            _uuid7_last_ms, _uuid7_counter = _uuid7_last_ms + 1, 0
+        return _uuid7_last_ms, _uuid7_counter
+
+def uuid7(unix_ts_ms: int = None, rand: int = None) -> uuid.UUID:
+    """Builds a time-ordered UUID (RFC 9562 version 7).
+
+    The top 48 bits are the Unix time in milliseconds, so newer ids sort after
+    older ones and inserts land at the right-hand edge of primary key indexes.
+    Ids made by this process in the same millisecond stay ordered through a
+    12-bit counter. Pass ``unix_ts_ms`` and ``rand`` (74 random bits) to build
+    a reproducible id instead.
+    """
+    if unix_ts_ms is None:
+        unix_ts_ms, rand_a = _uuid7_tick()
+        rand_b = int.from_bytes(os.urandom(8), 'big') & _RAND_B_MASK
+    else:
+        if rand is None:
+            rand = int.from_bytes(os.urandom(10), 'big')
+        rand_a, rand_b = (rand >> 62) & _COUNTER_MAX, rand & _RAND_B_MASK
+    value = ((unix_ts_ms & 0xFFFF_FFFF_FFFF) << 80) | (0x7 << 76) | (rand_a << 64) | (0b10 << 62) | rand_b
+    return uuid.UUID(int=value)
 
 def generate_id() -> str:
-    """Generates a random UUID for database IDs."""
-    return str(uuid.uuid4())  # Return UUID as a string
+    """Generates a time-ordered UUID for database IDs."""
+    return str(uuid7())  # Return UUID as a string
+
+def is_valid_id(value) -> bool:
+    """Whether ``value`` can be a database ID; keys are native UUIDs, so anything else finds nothing."""
+    try:
+        uuid.UUID(str(value))
+    except ValueError:
+        return False
+    return True
+
+class LRUCache:
+    """Bounded, thread-safe mapping that evicts the least recently used entry."""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)